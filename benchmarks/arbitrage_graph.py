@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+📈 ARBITRAGE GRAPH BENCHMARK
+Dense and incremental negative-cycle detection on synthetic markets (no network).
+
+Every token has a fair price; each directed pair is quoted at fair value minus
+a spread, so the market is arbitrage-free until a few edges are mispriced.
+Reports dense find_cycles() time, how many injected mispricings it recovers,
+best_triangles() time, and the cost of keeping cycles current with single-edge
+set_rate() updates compared with a dense pass per update.
+
+    python benchmarks/arbitrage_graph.py [token counts...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core.arbitrage_graph import ArbitrageGraph
+
+SPREAD = 0.003        # Quoted rate = fair * (1 - SPREAD)
+HOP_COST = 0.001
+INJECTED = 5          # Mispriced edges per market
+MISPRICING = 0.02     # ... each quoted this much above fair
+UPDATES = 200         # Single-edge updates in the incremental run
+DENSE_SAMPLES = 3     # Dense passes timed for the per-update comparison
+
+
+def market(n: int, rng: np.random.Generator):
+    prices = np.exp(rng.uniform(-8, 8, n))
+    rates = prices[:, None] / prices[None, :] * (1 - SPREAD)
+    np.fill_diagonal(rates, 0.0)
+    return [f"Token{i:05d}" for i in range(n)], rates
+
+
+def inject(rates: np.ndarray, count: int, rng: np.random.Generator):
+    n = rates.shape[0]
+    edges = set()
+    while len(edges) < count:
+        i, j = rng.integers(0, n, 2)
+        if i != j:
+            edges.add((int(i), int(j)))
+    for i, j in edges:
+        rates[i, j] *= (1 + MISPRICING) / (1 - SPREAD)  # fair * 1.02
+    return edges
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(n: int) -> dict:
+    rng = np.random.default_rng(n)
+    tokens, rates = market(n, rng)
+    edges = inject(rates, INJECTED, rng)
+
+    graph = ArbitrageGraph(hop_cost=HOP_COST, capacity=n)
+    _, load_ms = timed(graph.load, tokens, rates)
+    cycles, dense_ms = timed(graph.find_cycles, 2 * INJECTED)
+    hops = {(a, b) for c in cycles for a, b in zip(c["cycle"], c["cycle"][1:] + c["cycle"][:1])}
+    _, triangles_ms = timed(graph.best_triangles, tokens[0])
+
+    # Live updates: requotes drift a little; every 20th is a fresh mispricing
+    incremental = []
+    for k in range(UPDATES):
+        i, j = (int(x) for x in rng.choice(n, 2, replace=False))
+        fair = rates[i, j] / (1 - SPREAD)
+        rate = fair * (1 + MISPRICING) if k % 20 == 0 else fair * (1 - SPREAD * rng.uniform(0.5, 1.5))
+        _, ms = timed(graph.set_rate, tokens[i], tokens[j], rate)
+        incremental.append(ms)
+
+    dense = [timed(graph.find_cycles, 2 * INJECTED)[1] for _ in range(DENSE_SAMPLES)]
+    stats = graph.stats()
+    return {
+        "tokens": n, "edges": stats["edges"], "load_ms": load_ms, "dense_ms": dense_ms,
+        "found": len(cycles), "recovered": len(edges & hops), "triangles_ms": triangles_ms,
+        "update_p50_ms": float(np.median(incremental)), "update_max_ms": max(incremental),
+        "dense_per_update_ms": float(np.median(dense)), "fallbacks": stats["dense_fallbacks"],
+        "known": stats["known_cycles"],
+    }
+
+
+def main(counts):
+    print(f"spread {SPREAD:.1%}, hop cost {HOP_COST:.1%}, {INJECTED} edges mispriced +{MISPRICING:.0%}, "
+          f"{UPDATES} single-edge updates")
+    print(f"{'tokens':>7} {'edges':>9} {'load ms':>8} {'dense ms':>9} {'found':>6} {'recovered':>9} "
+          f"{'tri ms':>7} {'upd p50':>8} {'upd max':>8} {'dense/upd':>10} {'known':>6}")
+    for n in counts:
+        r = run(n)
+        print(f"{r['tokens']:>7} {r['edges']:>9} {r['load_ms']:>8.1f} {r['dense_ms']:>9.1f} {r['found']:>6} "
+              f"{r['recovered']:>6}/{INJECTED:<2} {r['triangles_ms']:>7.1f} {r['update_p50_ms']:>8.2f} "
+              f"{r['update_max_ms']:>8.1f} {r['dense_per_update_ms']:>10.1f} {r['known']:>6}")
+
+
+if __name__ == "__main__":
+    counts = [int(a) for a in sys.argv[1:]] or [250, 1000, 2000]
+    main(counts)
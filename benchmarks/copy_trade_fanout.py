@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+📈 COPY-TRADE FAN-OUT BENCHMARK
+Leader trade -> last follower fill latency for CopyTrading.copy_trade against
+local Jupiter and RPC stubs with injected latency. Follower orders are netted
+into one swap, so latency and request counts should not grow with followers.
+
+    python benchmarks/copy_trade_fanout.py [follower counts...]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from loguru import logger
+
+import core.quote_cache as quote_cache_module
+from core.copy_trading import CopyTrading
+from core.http_client import http_client
+
+PORT = 18765
+QUOTE_MS = 80    # Jupiter /quote
+SWAP_MS = 40     # Jupiter /swap (per follower: different userPublicKey)
+SEND_MS = 30     # RPC sendTransaction
+STUB_PROCESSES = 4
+ENDPOINTS = ("quote", "swap", "send")
+CALLS = None  # multiprocessing.Array shared by all stub processes
+
+
+def count(endpoint: str):
+    with CALLS.get_lock():
+        CALLS[ENDPOINTS.index(endpoint)] += 1
+
+
+async def quote(request):
+    count("quote")
+    await asyncio.sleep(QUOTE_MS / 1000)
+    amount = int(request.query["amount"])
+    return web.json_response({"inAmount": str(amount), "outAmount": str(amount * 1000),
+                              "otherAmountThreshold": str(amount * 990)})
+
+
+async def swap(request):
+    count("swap")
+    await asyncio.sleep(SWAP_MS / 1000)
+    return web.json_response({"swapTransaction": "AAAA"})
+
+
+async def rpc(request):
+    count("send")
+    await asyncio.sleep(SEND_MS / 1000)
+    return web.json_response({"jsonrpc": "2.0", "id": 1, "result": "5igSignature"})
+
+
+def serve_stubs(calls):
+    global CALLS
+    CALLS = calls
+    app = web.Application()
+    app.router.add_get("/quote", quote)
+    app.router.add_post("/swap", swap)
+    app.router.add_post("/rpc", rpc)
+    web.run_app(app, host="127.0.0.1", port=PORT, reuse_port=True, print=None, access_log=None)
+
+
+async def execute(side: str, token: str, amount: float, quote_response: dict) -> dict:
+    """What the netted copy swap does: build it from the shared wallet, then send it"""
+    async with http_client.post(f"http://127.0.0.1:{PORT}/swap",
+                                json={"quoteResponse": quote_response, "userPublicKey": "BotWallet"}) as resp:
+        tx = (await resp.json())["swapTransaction"]
+    async with http_client.post(f"http://127.0.0.1:{PORT}/rpc",
+                                json={"method": "sendTransaction", "params": [tx]}) as resp:
+        signature = (await resp.json())["result"]
+    return {"success": True, "signature": signature, "outAmount": quote_response["outAmount"]}
+
+
+async def run(followers: int) -> dict:
+    copy = CopyTrading()
+    for fid in range(1, followers + 1):
+        copy.set_copy_target(fid, 0, percentage=50 + fid % 50)
+    quote_cache_module.quote_cache.invalidate()
+    with CALLS.get_lock():
+        CALLS[:] = [0] * len(ENDPOINTS)
+
+    start = time.perf_counter()
+    result = await copy.copy_trade(0, f"Token{followers}", 1.0, execute)
+    elapsed = time.perf_counter() - start
+    return {"followers": followers, "filled": result["filled"], "elapsed_ms": elapsed * 1000,
+            **dict(zip(ENDPOINTS, CALLS[:]))}
+
+
+async def main(counts):
+    logger.remove()
+    quote_cache_module.JUPITER_QUOTE_URL = f"http://127.0.0.1:{PORT}/quote"
+    print(f"stub latency: quote {QUOTE_MS} ms, swap {SWAP_MS} ms, send {SEND_MS} ms")
+    print(f"{'followers':>9} {'filled':>7} {'last fill ms':>13} {'quotes':>7} {'swaps':>6} {'sends':>6}")
+    for n in counts:
+        r = await run(n)
+        print(f"{r['followers']:>9} {r['filled']:>7} {r['elapsed_ms']:>13.0f} "
+              f"{r['quote']:>7} {r['swap']:>6} {r['send']:>6}")
+
+    await http_client.close()
+
+
+if __name__ == "__main__":
+    counts = [int(a) for a in sys.argv[1:]] or [10, 100, 1000]
+    CALLS = multiprocessing.Array("i", len(ENDPOINTS))
+    stubs = [multiprocessing.Process(target=serve_stubs, args=(CALLS,), daemon=True)
+             for _ in range(STUB_PROCESSES)]
+    for stub in stubs:
+        stub.start()
+    time.sleep(1.0)  # Let the stub servers bind
+    try:
+        asyncio.run(main(counts))
+    finally:
+        for stub in stubs:
+            stub.terminate()
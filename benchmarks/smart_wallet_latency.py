@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+📈 SMART WALLET ALERT LATENCY BENCHMARK
+Simulates wallet activity against PollScheduler (no network) and reports how
+long it takes from an on-chain move to the poll that sees it, as the number
+of tracked wallets grows. Adaptive scheduling is compared with a fixed
+round-robin interval that spends the same request budget.
+
+Time is compressed by SCALE so a run takes seconds; reported latencies are
+converted back to real-world seconds.
+
+    python benchmarks/smart_wallet_latency.py [wallet counts...]
+"""
+
+import asyncio
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from core.wallet_scheduler import PollScheduler
+
+SCALE = 500            # 1 simulated second = 500 real seconds
+RATE = 5               # Real Helius request budget (requests/second)
+MIN_INTERVAL = 5       # Real seconds
+MAX_INTERVAL = 3600
+HALF_LIFE = 6 * 3600   # Scheduler defaults, in real seconds
+PRIOR_GAP = 6 * 3600
+RUN_SECONDS = 12       # Wall-clock length of each simulation (~1.7 real hours)
+HOT_FRACTION = 0.05    # Share of wallets that trade often
+HOT_GAP = 300          # Mean real seconds between moves for hot wallets
+COLD_GAP = 4 * 3600    # ... and for everyone else
+
+
+def make_activity(wallets, start):
+    """Poisson move times (simulated clock) for each wallet"""
+    activity = {}
+    for i, wallet in enumerate(wallets):
+        gap = (HOT_GAP if i < len(wallets) * HOT_FRACTION else COLD_GAP) / SCALE
+        t, times = start, []
+        while True:
+            t += random.expovariate(1 / gap)
+            if t > start + RUN_SECONDS:
+                break
+            times.append(t)
+        activity[wallet] = times
+    return activity
+
+
+async def simulate(n_wallets: int, adaptive: bool):
+    wallets = [f"wallet{i:06d}" for i in range(n_wallets)]
+    start = time.monotonic()
+    activity = make_activity(wallets, start)
+    last_poll = {w: start for w in wallets}
+    latencies = []
+
+    async def poll(wallet):
+        now = time.monotonic()
+        times = activity[wallet]
+        lo = bisect.bisect_right(times, last_poll[wallet])
+        hi = bisect.bisect_right(times, now)
+        latencies.extend(now - t for t in times[lo:hi])
+        last_poll[wallet] = now
+        return hi - lo
+
+    if adaptive:
+        min_i, max_i = MIN_INTERVAL, MAX_INTERVAL
+    else:
+        # Fixed interval that spends exactly the budget
+        min_i = max_i = max(MIN_INTERVAL, n_wallets / RATE)
+    scheduler = PollScheduler(poll, rate=RATE * SCALE, shards=4,
+                              min_interval=min_i / SCALE, max_interval=max_i / SCALE,
+                              half_life=HALF_LIFE / SCALE, prior_gap=PRIOR_GAP / SCALE,
+                              per_shard_inflight=64)
+    for wallet in wallets:
+        scheduler.add(wallet)
+    scheduler.start()
+    await asyncio.sleep(RUN_SECONDS)
+    await scheduler.stop()
+
+    moves = sum(len(t) for t in activity.values())
+    latencies.sort()
+    pick = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * SCALE if latencies else 0.0
+    return {
+        "wallets": n_wallets,
+        "mode": "adaptive" if adaptive else "fixed",
+        "polls": scheduler.stats()["polls"],
+        "moves": moves,
+        "seen": len(latencies),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+    }
+
+
+async def main(counts):
+    logger.remove()
+    print(f"{'wallets':>8} {'mode':>9} {'polls':>7} {'moves':>6} {'seen':>6} {'p50 s':>8} {'p95 s':>8}")
+    for n in counts:
+        for adaptive in (False, True):
+            r = await simulate(n, adaptive)
+            print(f"{r['wallets']:>8} {r['mode']:>9} {r['polls']:>7} {r['moves']:>6} {r['seen']:>6} "
+                  f"{r['p50']:>8.1f} {r['p95']:>8.1f}")
+
+
+if __name__ == "__main__":
+    random.seed(7)
+    counts = [int(a) for a in sys.argv[1:]] or [100, 1000, 5000]
+    asyncio.run(main(counts))
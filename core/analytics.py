@@ -4,40 +4,157 @@ Deep insights into trading performance
 """
 
 from typing import Dict, List
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+
+class TradeStore:
+    """Append-only columnar trade table with a per-user row index"""
+
+    def __init__(self, capacity: int = 4096):
+        self.size = 0
+        self._capacity = capacity
+        self._columns = {
+            "timestamp": np.empty(capacity, dtype=np.float64),
+            "user_id": np.empty(capacity, dtype=np.int64),
+            "token": np.empty(capacity, dtype=np.int32),
+            "amount": np.empty(capacity, dtype=np.float64),
+            "profit": np.empty(capacity, dtype=np.float64),
+            "fee": np.empty(capacity, dtype=np.float64),
+            "tier": np.empty(capacity, dtype=np.int8),
+        }
+        # Strings are interned once so each row stays fixed-width
+        self._token_ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._tier_ids: Dict[str, int] = {}
+        self._tiers: List[str] = []
+        # Per-user row ids: a growable buffer and its used length
+        self._user_rows: Dict[int, np.ndarray] = {}
+        self._user_counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def bytes_per_trade(self) -> int:
+        # Column storage plus the 8-byte row id in the user index
+        return sum(col.itemsize for col in self._columns.values()) + 8
+
+    @staticmethod
+    def _intern(value, ids: Dict[str, int], names: List[str]) -> int:
+        key = value or ""
+        idx = ids.get(key)
+        if idx is None:
+            idx = ids[key] = len(names)
+            names.append(key)
+        return idx
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, col in self._columns.items():
+            grown = np.empty(self._capacity, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self._columns[name] = grown
+
+    def append(self, user_id: int, token: str, amount: float, profit: float,
+               fee: float, tier: str, timestamp: float) -> int:
+        if self.size == self._capacity:
+            self._grow()
+        row = self.size
+        cols = self._columns
+        cols["timestamp"][row] = timestamp
+        cols["user_id"][row] = user_id
+        cols["token"][row] = self._intern(token, self._token_ids, self._tokens)
+        cols["amount"][row] = amount
+        cols["profit"][row] = profit
+        cols["fee"][row] = fee
+        cols["tier"][row] = self._intern(tier, self._tier_ids, self._tiers)
+        self._index(user_id, row)
+        self.size += 1
+        return row
+
+    def _index(self, user_id: int, row: int):
+        rows = self._user_rows.get(user_id)
+        count = self._user_counts.get(user_id, 0)
+        if rows is None or count == len(rows):
+            grown = np.empty(max(8, count * 2), dtype=np.int64)
+            if rows is not None:
+                grown[:count] = rows
+            rows = self._user_rows[user_id] = grown
+        rows[count] = row
+        self._user_counts[user_id] = count + 1
+
+    def user_rows(self, user_id: int) -> np.ndarray:
+        """Read-only view of a user's row ids, oldest first (no copy)"""
+        rows = self._user_rows.get(user_id)
+        if rows is None:
+            return np.empty(0, dtype=np.int64)
+        view = rows[:self._user_counts[user_id]]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name: str, rows: np.ndarray = None) -> np.ndarray:
+        col = self._columns[name][:self.size]
+        return col if rows is None else col[rows]
+
 
 class AdvancedAnalytics:
     """Comprehensive trading analytics"""
-    
+
     def __init__(self):
-        self.trades_history = []
-    
+        self.trades = TradeStore()
+
     def record_trade_analytics(self, trade_data: Dict):
         """Record detailed trade data"""
-        self.trades_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "token": trade_data.get("token"),
-            "amount": trade_data.get("amount"),
-            "profit": trade_data.get("profit"),
-            "fee": trade_data.get("fee"),
-            "tier": trade_data.get("tier")
-        })
-    
+        self.trades.append(
+            user_id=int(trade_data.get("user_id") or 0),
+            token=trade_data.get("token"),
+            amount=float(trade_data.get("amount") or 0.0),
+            profit=float(trade_data.get("profit") or 0.0),
+            fee=float(trade_data.get("fee") or 0.0),
+            tier=trade_data.get("tier"),
+            timestamp=datetime.now().timestamp()
+        )
+
     def get_user_analytics(self, user_id: int) -> Dict:
         """Generate comprehensive user analytics"""
-        user_trades = [t for t in self.trades_history if t.get("user_id") == user_id]
-        
-        if not user_trades:
+        rows = self.trades.user_rows(user_id)
+
+        if not len(rows):
             return {"error": "No trade history"}
-        
-        profits = [t['profit'] for t in user_trades]
-        
+
+        profits = self.trades.column("profit", rows)
+        fees = self.trades.column("fee", rows)
+        return {"total_trades": int(len(profits)), **self._metrics(profits, fees)}
+
+    @staticmethod
+    def _metrics(profits: np.ndarray, fees: np.ndarray) -> Dict:
+        """Vectorized performance metrics over one user's trades (oldest first)"""
+        wins = profits > 0
+        gross_win = profits[wins].sum()
+        gross_loss = -profits[profits < 0].sum()
+
+        # Drawdown on the cumulative P&L curve, starting from zero
+        equity = np.concatenate(([0.0], np.cumsum(profits)))
+        drawdown = np.maximum.accumulate(equity) - equity
+
+        std = profits.std(ddof=1) if len(profits) > 1 else 0.0
+        downside_std = np.sqrt(np.mean(np.minimum(profits, 0.0) ** 2))
+        mean = profits.mean()
+
         return {
-            "total_trades": len(user_trades),
-            "winning_trades": len([p for p in profits if p > 0]),
-            "win_rate": len([p for p in profits if p > 0]) / len(profits) * 100,
-            "avg_profit": sum(profits) / len(profits),
-            "best_trade": max(profits),
-            "worst_trade": min(profits)
+            "winning_trades": int(wins.sum()),
+            "win_rate": float(wins.mean() * 100),
+            "avg_profit": float(mean),
+            "total_profit": float(profits.sum()),
+            "total_fees": float(fees.sum()),
+            "best_trade": float(profits.max()),
+            "worst_trade": float(profits.min()),
+            "max_drawdown": float(drawdown.max()),
+            # None when there are no losses: the ratio is unbounded (and inf is not valid JSON)
+            "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else None,
+            # Per-trade Sharpe / Sortino style ratios (no risk-free rate)
+            "sharpe_ratio": float(mean / std) if std > 0 else 0.0,
+            "sortino_ratio": float(mean / downside_std) if downside_std > 0 else 0.0
         }
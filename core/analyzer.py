@@ -1,24 +1,147 @@
 """Token analysis and rug detection"""
-import aiohttp
 import asyncio
-from typing import Dict
+import json
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
 from loguru import logger
+from core.http_client import http_client
+
+RUGCHECK_ENDPOINTS = (
+    "https://api.rugcheck.xyz/v2/tokens/{token}/report/summary",
+    "https://api.rugcheck.xyz/v1/tokens/verify/solana/{token}",
+)
+
+# Source lookup outcomes
+FOUND, NOT_FOUND, FAILED = "found", "not_found", "failed"
+
+
+class AnalysisCache:
+    """Token -> analysis with expiry, written behind to a JSON file so restarts start warm"""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 300, negative_ttl: float = 60,
+                 save_delay: float = 5.0):
+        self.path = path or os.getenv("TOKEN_ANALYSIS_CACHE", "data/token_analysis.json")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl  # Unknown tokens get indexed soon; recheck sooner
+        self.save_delay = save_delay
+        self._entries: Dict[str, Tuple[float, Dict]] = {}  # token -> (expires_at unix, result)
+        self._save_handle = None
+        self._save_task: Optional[asyncio.Future] = None  # The one write in flight
+        self._write_lock = threading.Lock()  # Background writes and flush() share the tmp path
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                now = time.time()
+                self._entries = {token: (expires, result) for token, (expires, result)
+                                 in json.load(f).items() if expires > now}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable analysis cache {self.path}: {e}")
+
+    def get(self, token: str) -> Optional[Dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[token]
+            return None
+        return entry[1]
+
+    def put(self, token: str, result: Dict, negative: bool = False):
+        self._entries[token] = (time.time() + (self.negative_ttl if negative else self.ttl), result)
+        self._schedule_save()
+
+    def _schedule_save(self):
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(dict(self._entries))
+            return
+        self._save_handle = loop.call_later(self.save_delay, self._save_now)
+
+    def _save_now(self):
+        self._save_handle = None
+        if self._save_task is not None and not self._save_task.done():
+            # Previous write still running; try again after another delay
+            self._schedule_save()
+            return
+        now = time.time()
+        snapshot = {token: entry for token, entry in self._entries.items() if entry[0] > now}
+        self._entries = snapshot
+        self._save_task = asyncio.ensure_future(asyncio.to_thread(self._write, snapshot))
+
+    def _write(self, entries: Dict):
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Analysis cache save failed: {e}")
+
+    def flush(self):
+        """Write pending entries now (shutdown)"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._write({t: e for t, e in self._entries.items() if e[0] > time.time()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class TokenAnalyzer:
-    def __init__(self, rugcheck_key: str, helius_key: str):
+    def __init__(self, rugcheck_key: str, helius_key: str, cache: Optional[AnalysisCache] = None):
         self.rugcheck_key = rugcheck_key
         self.helius_key = helius_key
-        self.session: aiohttp.ClientSession = None
-    
+        self.cache = cache if cache is not None else AnalysisCache()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Requests go through the shared pooled client; nothing to open
         return self
-    
+
     async def __aexit__(self, *args):
-        await self.session.close()
-    
+        self.cache.flush()
+
     async def full_analysis(self, token_address: str) -> Dict:
-        """Comprehensive token analysis"""
+        """Comprehensive token analysis (cached; concurrent callers share one lookup)"""
+        cached = self.cache.get(token_address)
+        if cached is not None:
+            return dict(cached)
+
+        pending = self._inflight.get(token_address)
+        if pending is None:
+            pending = self._inflight[token_address] = asyncio.ensure_future(self._analyze(token_address))
+            pending.add_done_callback(lambda _: self._inflight.pop(token_address, None))
+        return dict(await asyncio.shield(pending))
+
+    async def analyze_many(self, tokens: Iterable[str], concurrency: int = 8) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield (token, analysis) pairs in completion order"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(token: str) -> Tuple[str, Dict]:
+            async with semaphore:
+                return token, await self.full_analysis(token)
+
+        tasks = [asyncio.ensure_future(run(token)) for token in dict.fromkeys(tokens)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _analyze(self, token_address: str) -> Dict:
         result = {
             'is_safe': False,
             'risk_score': 100,
@@ -31,100 +154,123 @@ class TokenAnalyzer:
             'top10_percentage': 100,
             'is_honeypot': True,
             'buy_tax': 99,
-            'sell_tax': 99
+            'sell_tax': 99,
+            'sources': []
         }
-        
+
         try:
-            # Try RugCheck v2 API
-            rugcheck_data = await self._rugcheck_scan(token_address)
+            # All sources at once; each one that answers fills in what it knows
+            (rug_status, rugcheck_data), (helius_status, asset) = await asyncio.gather(
+                self._rugcheck_scan(token_address), self._helius_analysis(token_address)
+            )
+
+            if asset:
+                result['sources'].append('helius')
+                token_info = asset.get('token_info', {})
+                if 'mint_authority' in token_info:
+                    result['mint_authority'] = bool(token_info['mint_authority'])
+                if 'freeze_authority' in token_info:
+                    result['freeze_authority'] = bool(token_info['freeze_authority'])
+
             if rugcheck_data:
+                result['sources'].append('rugcheck')
                 result['risk_score'] = rugcheck_data.get('score', 100)
                 result['is_safe'] = result['risk_score'] < 50
-                
+
                 token_data = rugcheck_data.get('token', {})
-                result['mint_authority'] = token_data.get('mintAuthority') is not None
-                result['freeze_authority'] = token_data.get('freezeAuthority') is not None
-                
+                if 'mintAuthority' in token_data:
+                    result['mint_authority'] = token_data.get('mintAuthority') is not None
+                if 'freezeAuthority' in token_data:
+                    result['freeze_authority'] = token_data.get('freezeAuthority') is not None
+
                 risks = rugcheck_data.get('risks', [])
                 if risks:
                     result['danger_reason'] = risks[0].get('description', 'Unknown risk')
-                
+
                 markets = rugcheck_data.get('markets', [])
                 if markets:
                     liq = sum(m.get('liquidityA', 0) + m.get('liquidityB', 0) for m in markets)
                     result['liquidity_usd'] = liq
-                
+
                 file_meta = rugcheck_data.get('fileMeta', {})
                 result['holder_count'] = file_meta.get('holder', 0)
-                
+
                 top_holders = rugcheck_data.get('topHolders', [])
                 if top_holders:
                     result['top10_percentage'] = sum(h.get('pct', 0) for h in top_holders[:10])
-            
+
             # Calculate safety
             result['safety_score'] = max(0, 100 - result['risk_score'])
-            
+
             # Critical overrides
             if result['risk_score'] > 70:
                 result['is_safe'] = False
                 result['danger_reason'] = result['danger_reason'] or "High risk score"
-            
+
             if result['top10_percentage'] > 50:
                 result['is_safe'] = False
                 result['danger_reason'] = "Whale concentration >50%"
-            
+
+            if rug_status == FOUND:
+                self.cache.put(token_address, result)
+            elif rug_status == NOT_FOUND and helius_status != FAILED:
+                result['danger_reason'] = result['danger_reason'] or "Token not indexed by RugCheck"
+                self.cache.put(token_address, result, negative=True)
+            # Transient failures are not cached so the next call retries
+
         except Exception as e:
             logger.error(f"Analysis error: {e}")
             result['danger_reason'] = f"Analysis failed: {str(e)}"
-        
+
         return result
-    
-    async def _rugcheck_scan(self, token: str) -> Dict:
-        """Scan with RugCheck v2 API"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.rugcheck_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Try multiple endpoints
-            endpoints = [
-                f"https://api.rugcheck.xyz/v2/tokens/{token}/report/summary",
-                f"https://api.rugcheck.xyz/v1/tokens/verify/solana/{token}",
-            ]
-            
-            for url in endpoints:
-                try:
-                    async with self.session.get(url, headers=headers) as resp:
-                        if resp.status == 200:
-                            return await resp.json()
-                        elif resp.status == 404:
-                            continue  # Try next endpoint
-                except:
-                    continue
-            
-            logger.warning(f"All RugCheck endpoints failed for {token}")
-            return {}
-                    
-        except Exception as e:
-            logger.error(f"RugCheck error: {e}")
-            return {}
-    
-    async def _helius_analysis(self, token: str) -> Dict:
+
+    async def _rugcheck_scan(self, token: str) -> Tuple[str, Dict]:
+        """Scan with RugCheck (v2 and v1 queried together, v2 preferred)"""
+        headers = {
+            "Authorization": f"Bearer {self.rugcheck_key}",
+            "Content-Type": "application/json"
+        }
+
+        async def fetch(url: str) -> Tuple[str, Dict]:
+            try:
+                async with http_client.get(url, headers=headers) as resp:
+                    if resp.status == 200:
+                        return FOUND, await resp.json()
+                    if resp.status == 404:
+                        return NOT_FOUND, {}
+                    return FAILED, {}
+            except Exception as e:
+                logger.debug(f"RugCheck {url} failed: {e}")
+                return FAILED, {}
+
+        results = await asyncio.gather(*(fetch(url.format(token=token)) for url in RUGCHECK_ENDPOINTS))
+        for status, data in results:
+            if status == FOUND:
+                return status, data
+
+        statuses = {status for status, _ in results}
+        if statuses == {NOT_FOUND}:
+            return NOT_FOUND, {}
+        logger.warning(f"All RugCheck endpoints failed for {token}")
+        return FAILED, {}
+
+    async def _helius_analysis(self, token: str) -> Tuple[str, Dict]:
         """Get token data from Helius"""
         try:
-            async with self.session.post(
+            async with http_client.post(
                 f"https://mainnet.helius-rpc.com/?api-key={self.helius_key}",
                 json={
                     "jsonrpc": "2.0",
                     "id": 1,
                     "method": "getAsset",
-                    "params": [token]
+                    "params": {"id": token}
                 }
             ) as resp:
                 if resp.status == 200:
                     data = await resp.json()
-                    return data.get('result', {})
+                    if data.get('result'):
+                        return FOUND, data['result']
+                    return NOT_FOUND, {}
         except Exception as e:
             logger.error(f"Helius error: {e}")
-        return {}
+        return FAILED, {}
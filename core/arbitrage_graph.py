@@ -0,0 +1,337 @@
+"""
+🕸️ ARBITRAGE GRAPH
+Token-pair price graph in log space with negative-cycle (arbitrage) detection
+"""
+
+import math
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+EPS = 1e-12  # Float noise below this is not an improvement
+
+
+def pred_cycles(pred: List[int]) -> List[List[int]]:
+    """All cycles of a predecessor array (each node has at most one pred), in forward order"""
+    state = [0] * len(pred)  # 0 unseen, 1 on the current walk, 2 done
+    cycles = []
+    for start in range(len(pred)):
+        if state[start]:
+            continue
+        path, node = [], start
+        while node != -1 and state[node] == 0:
+            state[node] = 1
+            path.append(node)
+            node = pred[node]
+        if node != -1 and state[node] == 1:
+            cycles.append(path[path.index(node):][::-1])  # pred points backwards
+        for p in path:
+            state[p] = 2
+    return cycles
+
+
+def canonical(cycle: List[int]) -> Tuple[int, ...]:
+    """Rotation-independent key for a cycle"""
+    i = cycle.index(min(cycle))
+    return tuple(cycle[i:] + cycle[:i])
+
+
+class ArbitrageGraph:
+    """
+    Dense matrix W[i, j] = -log(rate i -> j) + hop_cost, inf where there is no
+    quote. A cycle whose weights sum below zero returns more than it started
+    with after paying hop_cost (fees, gas, slippage allowance) on every hop.
+
+    find_cycles() runs a vectorized Bellman-Ford over the whole matrix.
+    set_rate() keeps the known cycles current edge by edge: a cheaper edge
+    can only create cycles through itself, so an SPFA from its head back to
+    its tail is enough; a dearer edge can only break cycles that use it.
+    """
+
+    def __init__(self, hop_cost: float = 0.001, capacity: int = 64,
+                 max_cycles: int = 256, spfa_budget: int = 20):
+        self.hop_cost = -math.log(1 - hop_cost)  # Fraction lost per hop, in log space
+        self.tokens: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._weights = np.full((capacity, capacity), np.inf)
+        self._updated = np.zeros((capacity, capacity))  # Monotonic time of each edge's quote
+        self.venues: Dict[Tuple[int, int], str] = {}
+        self.cycles: Dict[Tuple[int, ...], List[int]] = {}  # Known negative cycles
+        self.max_cycles = max_cycles
+        self.spfa_budget = spfa_budget  # Relaxations per node before SPFA gives up for a dense pass
+        self._stats = {"edge_updates": 0, "incremental_checks": 0, "dense_runs": 0,
+                       "dense_fallbacks": 0, "cycles_found": 0}
+
+    @property
+    def n(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._weights[:self.n, :self.n]
+
+    def add_token(self, token: str) -> int:
+        if token in self.index:
+            return self.index[token]
+        if self.n == self._weights.shape[0]:
+            weights = np.full((self.n * 2, self.n * 2), np.inf)
+            weights[:self.n, :self.n] = self._weights
+            updated = np.zeros_like(weights)
+            updated[:self.n, :self.n] = self._updated
+            self._weights, self._updated = weights, updated
+        self.index[token] = self.n
+        self.tokens.append(token)
+        return self.index[token]
+
+    def rate(self, src: str, dst: str) -> float:
+        """Quoted rate src -> dst (0.0 if unknown)"""
+        i, j = self.index.get(src), self.index.get(dst)
+        if i is None or j is None:
+            return 0.0
+        return math.exp(-(self._weights[i, j] - self.hop_cost))
+
+    def _set_weight(self, i: int, j: int, weight: float) -> float:
+        old = self._weights[i, j]
+        self._weights[i, j] = weight
+        self._stats["edge_updates"] += 1
+        return old
+
+    def set_rate(self, src: str, dst: str, rate: float, venue: str = "",
+                 search: bool = True) -> List[Dict]:
+        """
+        Record that 1 unit of src buys `rate` units of dst and return the cycles
+        this edge just made profitable. search=False only stores the edge (bulk
+        loads followed by find_cycles()).
+        """
+        i, j = self.add_token(src), self.add_token(dst)
+        if i == j:
+            return []
+        weight = -math.log(rate) + self.hop_cost if rate > 0 else np.inf
+        old = self._set_weight(i, j, weight)
+        self._updated[i, j] = time.monotonic()
+        if venue:
+            self.venues[(i, j)] = venue
+        self._revalidate((i, j))
+        if not search or not weight < old - EPS:
+            return []
+        return [self.describe(c) for c in self._record(self._cycle_through(i, j))]
+
+    def remove_edge(self, src: str, dst: str):
+        i, j = self.index.get(src), self.index.get(dst)
+        if i is None or j is None:
+            return
+        self._set_weight(i, j, np.inf)
+        self._updated[i, j] = 0.0
+        self.venues.pop((i, j), None)
+        self._revalidate((i, j))
+
+    def expire(self, max_age: float) -> int:
+        """Drop edges whose quote is older than max_age seconds"""
+        updated = self._updated[:self.n, :self.n]
+        stale = np.argwhere((updated > 0) & (updated < time.monotonic() - max_age))
+        for i, j in stale.tolist():
+            self.remove_edge(self.tokens[i], self.tokens[j])
+        return len(stale)
+
+    def load(self, tokens: List[str], rates: np.ndarray):
+        """
+        Bulk-replace the edges between `tokens` from a rate matrix
+        (rates[i, j] = units of tokens[j] per unit of tokens[i], 0 = no quote).
+        Known cycles are dropped; call find_cycles() afterwards.
+        """
+        idx = np.array([self.add_token(t) for t in tokens])
+        with np.errstate(divide="ignore"):
+            weights = np.where(rates > 0, -np.log(np.where(rates > 0, rates, 1.0)) + self.hop_cost, np.inf)
+        np.fill_diagonal(weights, np.inf)
+        block = np.ix_(idx, idx)
+        self._weights[block] = weights
+        self._updated[block] = np.where(np.isfinite(weights), time.monotonic(), 0.0)
+        self._stats["edge_updates"] += int(np.isfinite(weights).sum())
+        self.cycles.clear()
+
+    def cycle_weight(self, cycle: List[int]) -> float:
+        W = self._weights
+        return float(sum(W[a, b] for a, b in zip(cycle, cycle[1:] + cycle[:1])))
+
+    def _revalidate(self, edge: Tuple[int, int]):
+        """Forget known cycles through `edge` that are no longer profitable"""
+        for key, cycle in list(self.cycles.items()):
+            if edge in zip(cycle, cycle[1:] + cycle[:1]) and not self.cycle_weight(cycle) < -EPS:
+                del self.cycles[key]
+
+    def _record(self, found: Iterable[List[int]]) -> List[List[int]]:
+        new = []
+        for cycle in found:
+            key = canonical(cycle)
+            if key in self.cycles or not self.cycle_weight(cycle) < -EPS:
+                continue
+            self.cycles[key] = list(key)
+            new.append(list(key))
+        self._stats["cycles_found"] += len(new)
+        while len(self.cycles) > self.max_cycles:
+            # Keep the most profitable ones
+            worst = max(self.cycles, key=lambda k: self.cycle_weight(self.cycles[k]))
+            del self.cycles[worst]
+        return new
+
+    def _cycle_through(self, u: int, v: int) -> List[List[int]]:
+        """
+        SPFA from v looking for a path back to u with dist(v ~> u) + W[u, v] < 0.
+        Stops at the first such path. A negative cycle elsewhere that SPFA runs
+        into is returned instead; if the relaxation budget runs out, a dense
+        pass takes over.
+        """
+        self._stats["incremental_checks"] += 1
+        W = self.weights
+        n = self.n
+        w_uv = W[u, v]
+        dist = np.full(n, np.inf)
+        dist[v] = 0.0
+        pred = [-1] * n
+        queue = deque([v])
+        queued = np.zeros(n, dtype=bool)
+        queued[v] = True
+        budget = self.spfa_budget * n
+        relaxations = 0
+
+        while queue:
+            x = queue.popleft()
+            queued[x] = False
+            candidate = dist[x] + W[x]
+            improved = np.flatnonzero(candidate < dist - EPS)
+            if not len(improved):
+                continue
+            dist[improved] = candidate[improved]
+            for y in improved.tolist():
+                pred[y] = x
+            relaxations += len(improved)
+
+            if dist[u] + w_uv < -EPS:
+                return [self._walk_back(pred, u, v)]
+            if dist[v] < -EPS:
+                # Back at the start without using u -> v: some other negative cycle
+                return pred_cycles(pred)[:1]
+            if relaxations > budget:
+                cycles = pred_cycles(pred)
+                if cycles:
+                    return cycles
+                self._stats["dense_fallbacks"] += 1
+                return self._bellman_ford(self.weights.copy())
+
+            for y in improved.tolist():
+                if y != u and not queued[y]:  # Paths through u would just be longer cycles
+                    queued[y] = True
+                    queue.append(y)
+        return []
+
+    @staticmethod
+    def _walk_back(pred: List[int], u: int, v: int) -> List[int]:
+        """Cycle v -> ... -> u -> v from SPFA predecessors (or the loop met on the way)"""
+        path, seen, node = [], set(), u
+        while node != v:
+            if node in seen:
+                return path[path.index(node):][::-1]
+            seen.add(node)
+            path.append(node)
+            node = pred[node]
+        return [v] + path[::-1]
+
+    def _bellman_ford(self, W: np.ndarray) -> List[List[int]]:
+        """
+        Bellman-Ford from a virtual source tied to every node, relaxing all
+        edges per iteration as one matrix operation. Stops once the
+        predecessor graph closes a loop (always a negative cycle) or nothing
+        improves.
+        """
+        n = W.shape[0]
+        dist = np.zeros(n)
+        pred = np.full(n, -1)
+        columns = np.arange(n)
+        candidate = np.empty((n, n))
+        for _ in range(n):
+            np.add(dist[:, None], W, out=candidate)
+            best = candidate.argmin(axis=0)
+            best_dist = candidate[best, columns]
+            improved = best_dist < dist - EPS
+            if not improved.any():
+                return []
+            dist[improved] = best_dist[improved]
+            pred[improved] = best[improved]
+            cycles = pred_cycles(pred.tolist())
+            if cycles:
+                return cycles
+        return []
+
+    def find_cycles(self, limit: int = 10) -> List[Dict]:
+        """
+        Dense search for up to `limit` profitable cycles. After each pass the
+        weakest hop of every cycle found is masked, so the next pass can surface
+        different cycles. These are profitable cycles, not a guaranteed best
+        one (that is NP-hard); best_triangles() covers short loops exhaustively.
+        """
+        self._stats["dense_runs"] += 1
+        W = self.weights.copy()
+        np.fill_diagonal(W, np.inf)
+        found: Dict[Tuple[int, ...], List[int]] = {}
+        while len(found) < limit:
+            cycles = [c for c in self._bellman_ford(W) if canonical(c) not in found]
+            if not cycles:
+                break
+            for cycle in cycles:
+                found[canonical(cycle)] = cycle
+                hops = list(zip(cycle, cycle[1:] + cycle[:1]))
+                a, b = max(hops, key=lambda hop: W[hop])
+                W[a, b] = np.inf
+        self._record(found.values())
+        return sorted((self.describe(c) for c in found.values()),
+                      key=lambda o: o["profit_pct"], reverse=True)[:limit]
+
+    def best_triangles(self, anchor: str, limit: int = 5) -> List[Dict]:
+        """Most profitable anchor -> X -> Y -> anchor loops, scored in one n x n pass"""
+        a = self.index.get(anchor)
+        if a is None:
+            return []
+        W = self.weights
+        total = W[a, :, None] + W + W[None, :, a]
+        total[a, :] = np.inf
+        total[:, a] = np.inf
+        np.fill_diagonal(total, np.inf)
+        flat = np.argsort(total, axis=None)[:limit]
+        triangles = []
+        for x, y in zip(*np.unravel_index(flat, total.shape)):
+            if total[x, y] < -EPS:
+                triangles.append(self.describe([a, int(x), int(y)]))
+        self._record(t["cycle"] for t in triangles)
+        return triangles
+
+    def describe(self, cycle: List[int], anchor: str = "") -> Dict:
+        """Readable cycle, rotated to start at `anchor` when it passes through it"""
+        start = self.index.get(anchor)
+        if start in cycle:
+            k = cycle.index(start)
+            cycle = cycle[k:] + cycle[:k]
+        hops = list(zip(cycle, cycle[1:] + cycle[:1]))
+        weight = self.cycle_weight(cycle)
+        gross = weight - self.hop_cost * len(hops)
+        return {
+            "cycle": list(cycle),
+            "path": [self.tokens[i] for i in cycle] + [self.tokens[cycle[0]]],
+            "venues": [self.venues.get(hop, "") for hop in hops],
+            "rates": [math.exp(-(self._weights[hop] - self.hop_cost)) for hop in hops],
+            "hops": len(hops),
+            "gross_pct": (math.exp(-gross) - 1) * 100,
+            "profit_pct": (math.exp(-weight) - 1) * 100,  # After hop_cost on every hop
+        }
+
+    def opportunities(self, min_profit_pct: float = 0.0, anchor: str = "") -> List[Dict]:
+        """Known profitable cycles, best first"""
+        described = (self.describe(c, anchor) for c in self.cycles.values())
+        return sorted((o for o in described if o["profit_pct"] >= min_profit_pct),
+                      key=lambda o: o["profit_pct"], reverse=True)
+
+    def stats(self) -> Dict:
+        return {**self._stats, "tokens": self.n,
+                "edges": int(np.isfinite(self.weights).sum()),
+                "known_cycles": len(self.cycles)}
@@ -1,8 +1,12 @@
 """Auto-trading logic with profit taking"""
 import asyncio
-from typing import Dict, List
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
 from datetime import datetime
 from loguru import logger
+from core.concurrency import bounded_gather
+from core.notifier import notifier, PRIORITY_TRADE, PRIORITY_MARKETING
 
 class AutoTrader:
     def __init__(self, sniper, db, fee_manager, channel_id: str):
@@ -12,6 +16,10 @@ class AutoTrader:
         self.channel_id = channel_id
         self.active_positions: Dict[int, Dict] = {}
         self.monitoring = False
+        self.check_interval = 10  # Seconds between cycles
+        self.price_concurrency = 16  # Max token lookups in flight per cycle
+        self.price_deadline = 8.0  # Lookups still running after this are retried next cycle
+        self.last_cycle: Dict = {}
     
     async def add_position(self, trade_id: int, token: str, entry_price: float, 
                           amount: float, user_id: int):
@@ -34,13 +42,68 @@ class AutoTrader:
         
         while self.monitoring:
             try:
-                for trade_id, position in list(self.active_positions.items()):
-                    await self._check_position(trade_id, position)
-                await asyncio.sleep(10)  # Check every 10 seconds
+                await self._run_cycle()
+                await asyncio.sleep(self.check_interval)
             except Exception as e:
                 logger.error(f"Monitor error: {e}")
                 await asyncio.sleep(5)
     
+    async def _run_cycle(self):
+        """Price each held token once, then evaluate every position in it"""
+        started = time.perf_counter()
+        
+        by_token: Dict[str, List[Tuple[int, Dict]]] = defaultdict(list)
+        for trade_id, position in list(self.active_positions.items()):
+            by_token[position['token']].append((trade_id, position))
+        
+        # Quote the largest holding per token so the price reflects realistic size
+        jobs = {
+            token: (lambda token=token, amount=max(p['amount'] for _, p in group):
+                    self._get_token_price(token, amount))
+            for token, group in by_token.items()
+        }
+        prices = await bounded_gather(jobs, limit=self.price_concurrency, deadline=self.price_deadline)
+        
+        evaluated = 0
+        unpriced = 0
+        for token, group in by_token.items():
+            price = prices['results'].get(token, 0.0)
+            if price <= 0:
+                # A failed or empty quote is a missed lookup, not a -100% position
+                unpriced += token in prices['results']
+                continue
+            for trade_id, position in group:
+                if trade_id not in self.active_positions:
+                    continue
+                await self._evaluate_position(trade_id, position, price * position['amount'])
+                evaluated += 1
+        
+        duration = time.perf_counter() - started
+        self.last_cycle = {
+            'duration_ms': duration * 1000,
+            'tokens': len(by_token),
+            'positions': evaluated,
+            'positions_per_sec': evaluated / duration if duration > 0 else 0.0,
+            'missed_tokens': len(prices['missed']) + len(prices['errors']) + unpriced,
+            'finished': datetime.now().isoformat()
+        }
+        if prices['missed']:
+            logger.warning(f"{len(prices['missed'])} token prices missed the {self.price_deadline}s deadline")
+    
+    async def _get_token_price(self, token: str, amount: float) -> float:
+        """SOL value per token unit"""
+        if amount <= 0:
+            return 0.0
+        value = await self.sniper.get_token_value(token, amount)
+        return value / amount
+    
+    def stats(self) -> Dict:
+        """Cycle duration and throughput of the last monitoring pass"""
+        return {
+            'active_positions': len(self.active_positions),
+            **self.last_cycle
+        }
+    
     async def _check_position(self, trade_id: int, position: Dict):
         """Check position and execute sells"""
         try:
@@ -48,6 +111,15 @@ class AutoTrader:
                 position['token'], 
                 position['amount']
             )
+            if current_value <= 0:
+                return
+            await self._evaluate_position(trade_id, position, current_value)
+        except Exception as e:
+            logger.error(f"Position check error: {e}")
+    
+    async def _evaluate_position(self, trade_id: int, position: Dict, current_value: float):
+        """Apply stop-loss / take-profit rules to a priced position"""
+        try:
             invested_sol = position['entry_price'] * position['amount']
             
             if invested_sol == 0:
@@ -164,17 +236,14 @@ class AutoTrader:
     async def _notify_user(self, user_id: int, message: str):
         """Send notification to user and channel"""
         try:
-            from telegram import Bot
-            from core.config import Config
-            bot = Bot(token=Config().bot_token)
-            
-            # Send to user
-            await bot.send_message(user_id, message, parse_mode="Markdown")
+            # Send to user (jumps ahead of marketing posts)
+            await notifier.send(user_id, message, priority=PRIORITY_TRADE, parse_mode="Markdown")
             
             # Send to channel
-            await bot.send_message(
+            await notifier.send(
                 self.channel_id,
                 f"📊 *TRADE UPDATE*\n{message}",
+                priority=PRIORITY_MARKETING,
                 parse_mode="Markdown"
             )
         except Exception as e:
@@ -0,0 +1,128 @@
+"""
+🧱 BLOCKHASH CACHE
+Keeps a recent blockhash warm in the background so signing never waits on RPC
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+
+SLOT_TIME = 0.4  # Seconds per block, for estimating height between polls
+
+
+class BlockhashProvider:
+    """
+    Refreshes getLatestBlockhash and getBlockHeight every `refresh_interval`
+    seconds. A hash is handed out only while the (estimated) block height is
+    at least `safety_blocks` short of its last_valid_block_height, and never
+    after `max_age`.
+    """
+
+    def __init__(self, client, refresh_interval: float = 2.0, max_age: float = 30.0,
+                 safety_blocks: int = 30):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.safety_blocks = safety_blocks  # ~12 s left to land before the hash expires
+        self.blockhash = None
+        self.last_valid_block_height: Optional[int] = None
+        self.fetched_at = 0.0
+        self.block_height: Optional[int] = None
+        self.height_at = 0.0
+        self._refreshing: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def estimated_block_height(self) -> Optional[int]:
+        """Last observed block height, advanced by the time since it was observed"""
+        if self.block_height is None:
+            return None
+        return self.block_height + int((time.monotonic() - self.height_at) / SLOT_TIME)
+
+    def blocks_left(self) -> Optional[int]:
+        """Blocks until the cached hash expires, if both heights are known"""
+        height = self.estimated_block_height()
+        if height is None or self.last_valid_block_height is None:
+            return None
+        return self.last_valid_block_height - height
+
+    def current(self) -> Optional[Tuple]:
+        """(blockhash, last_valid_block_height) if the cached hash is still fresh"""
+        if self.blockhash is None or self.age >= self.max_age:
+            return None
+        left = self.blocks_left()
+        if left is not None and left < self.safety_blocks:
+            return None
+        return self.blockhash, self.last_valid_block_height
+
+    async def get_block_height(self) -> int:
+        """Current block height straight from RPC (also refreshes the estimate)"""
+        response = await self.client.get_block_height()
+        self._observe_height(response.value)
+        return response.value
+
+    def _observe_height(self, height: int):
+        if self.block_height is None or height >= self.block_height:
+            self.block_height = height
+            self.height_at = time.monotonic()
+
+    async def get(self) -> Tuple:
+        """Cached hash when fresh, otherwise a synchronous fetch"""
+        self.start()
+        cached = self.current()
+        if cached:
+            self._stats["hits"] += 1
+            return cached
+        self._stats["misses"] += 1
+        await self.refresh()
+        return self.blockhash, self.last_valid_block_height
+
+    async def refresh(self):
+        # Concurrent callers share one in-flight RPC call
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        try:
+            await asyncio.shield(self._refreshing)
+        finally:
+            if self._refreshing is not None and self._refreshing.done():
+                self._refreshing = None
+
+    async def _fetch(self):
+        response, height = await asyncio.gather(self.client.get_latest_blockhash(),
+                                                self.client.get_block_height())
+        self._observe_height(height.value)
+        self.blockhash = response.value.blockhash
+        self.last_valid_block_height = response.value.last_valid_block_height
+        self.fetched_at = time.monotonic()
+        self._stats["refreshes"] += 1
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Blockhash refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {**self._stats, "age": self.age if self.blockhash else None,
+                "last_valid_block_height": self.last_valid_block_height,
+                "blocks_left": self.blocks_left()}
@@ -0,0 +1,55 @@
+"""
+⚡ BOUNDED FAN-OUT
+Run many independent coroutines with a concurrency cap and a deadline
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+async def bounded_gather(jobs: Dict[Hashable, Callable[[], Awaitable[Any]]],
+                         limit: int = 8, deadline: Optional[float] = None) -> Dict:
+    """
+    Run every job concurrently, at most `limit` at a time.
+    Jobs still running when `deadline` seconds elapse are cancelled and
+    reported as missed; whatever finished is returned as partial results.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    results: Dict[Hashable, Any] = {}
+    errors: Dict[Hashable, str] = {}
+    timings: Dict[Hashable, float] = {}
+    started = time.perf_counter()
+
+    async def run(key, job):
+        async with semaphore:
+            leg_start = time.perf_counter()
+            try:
+                results[key] = await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors[key] = str(e)
+            finally:
+                timings[key] = time.perf_counter() - leg_start
+
+    tasks = {asyncio.ensure_future(run(key, job)): key for key, job in jobs.items()}
+    missed = []
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+            missed.append(tasks[task])
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for key in missed:
+        timings.pop(key, None)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "timings": timings,
+        "missed": missed,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,128 @@
+"""
+✅ CONFIRMATION TRACKER
+Batched getSignatureStatuses polling for every in-flight transaction
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+COMMITMENT_RANK = {"processed": 0, "confirmed": 1, "finalized": 2}
+MAX_SIGNATURES_PER_CALL = 256  # RPC limit for getSignatureStatuses
+
+
+def _commitment_of(status) -> str:
+    """'TransactionConfirmationStatus.Confirmed' / 'confirmed' -> 'confirmed'"""
+    return str(status.confirmation_status).rsplit(".", 1)[-1].lower()
+
+
+class ConfirmationTracker:
+    """
+    One poller per RPC client: all waiting signatures are checked together and
+    each waiter is woken as soon as its transaction reaches the wanted commitment.
+    """
+
+    def __init__(self, client, min_interval: float = 0.25, max_interval: float = 2.0,
+                 backoff: float = 1.5):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._pending: Dict[str, Dict] = {}  # str(signature) -> {"signature", "futures"}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"rpc_calls": 0, "checked": 0, "confirmed": 0, "failed": 0, "timeouts": 0}
+
+    async def wait(self, signature, commitment: str = "confirmed",
+                   timeout: float = 30.0) -> Optional[Dict]:
+        """
+        Wait until `signature` lands. Returns {'signature', 'status', 'err'}
+        once it reaches `commitment` or fails on-chain, or None on timeout.
+        """
+        key = str(signature)
+        future = asyncio.get_running_loop().create_future()
+        entry = self._pending.setdefault(key, {"signature": signature, "futures": []})
+        entry["futures"].append((COMMITMENT_RANK[commitment], future))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+        self._wakeup.set()  # New signature: poll soon rather than after a long backoff
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            return None
+        finally:
+            self._forget(key, future)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        entry = self._pending.get(key)
+        if entry is None:
+            return
+        entry["futures"] = [(rank, f) for rank, f in entry["futures"] if f is not future]
+        if not entry["futures"]:
+            del self._pending[key]
+
+    async def _poll_loop(self):
+        interval = self.min_interval
+        while self._pending:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+                interval = self.min_interval
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                resolved = await self._poll_once()
+            except Exception as e:
+                logger.warning(f"Signature status poll failed: {e}")
+                resolved = 0
+
+            # Tighten while things are landing, back off while the network is slow
+            interval = self.min_interval if resolved else min(self.max_interval, interval * self.backoff)
+
+    async def _poll_once(self) -> int:
+        keys: List[str] = list(self._pending)
+        resolved = 0
+        for i in range(0, len(keys), MAX_SIGNATURES_PER_CALL):
+            chunk = keys[i:i + MAX_SIGNATURES_PER_CALL]
+            signatures = [self._pending[k]["signature"] for k in chunk if k in self._pending]
+            if not signatures:
+                continue
+            response = await self.client.get_signature_statuses(signatures)
+            self._stats["rpc_calls"] += 1
+            self._stats["checked"] += len(signatures)
+            for signature, status in zip(signatures, response.value):
+                if status is not None:
+                    resolved += self._resolve(str(signature), status)
+        return resolved
+
+    def _resolve(self, key: str, status) -> int:
+        entry = self._pending.get(key)
+        if entry is None:
+            return 0
+        commitment = _commitment_of(status)
+        rank = COMMITMENT_RANK.get(commitment, -1)
+        result = {"signature": key, "status": commitment, "err": status.err}
+
+        woken = 0
+        remaining = []
+        for wanted, future in entry["futures"]:
+            if status.err is not None or rank >= wanted:
+                if not future.done():
+                    future.set_result(result)
+                woken += 1
+            else:
+                remaining.append((wanted, future))
+        if woken:
+            self._stats["failed" if status.err is not None else "confirmed"] += 1
+        entry["futures"] = remaining
+        if not remaining:
+            del self._pending[key]
+        return woken
+
+    def stats(self) -> Dict:
+        return {**self._stats, "in_flight": len(self._pending)}
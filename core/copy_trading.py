@@ -3,38 +3,54 @@
 Auto-copy top traders from leaderboard
 """
 
-from typing import Dict, List
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 from datetime import datetime
 from loguru import logger
+from core.leaderboard import Leaderboard
+from core.order_netting import OrderNetter
+from core.quote_cache import quote_cache, SOL_MINT
+
+# execute(side, token, total_amount, quote) -> swap result dict; additive fields
+# (token_amount, profit, outAmount) are split between followers by share
+CopyExecutor = Callable[[str, str, float, Dict], Awaitable[Dict]]
 
 class CopyTrading:
     """Copy trading for Whale tier users"""
     
     def __init__(self):
         self.leaderboard = {}
+        self.ranking = Leaderboard()
         self.copy_settings = {}
+        self.followers: Dict[int, Set[int]] = {}  # leader -> followers
+    
+    def update_trader(self, user_id: int, total_profit: float, win_rate: float, total_trades: int):
+        """Refresh a trader's stats and ranking after a trade"""
+        self.leaderboard[user_id] = {
+            "total_profit": total_profit,
+            "win_rate": win_rate,
+            "total_trades": total_trades
+        }
+        self.ranking.set(user_id, total_profit)
     
     def get_top_traders(self, limit: int = 10) -> List[Dict]:
         """Get top performing traders"""
-        sorted_traders = sorted(
-            self.leaderboard.items(),
-            key=lambda x: x[1]['total_profit'],
-            reverse=True
-        )
-        
         return [
             {
                 "rank": i+1,
                 "user_id": uid,
-                "profit": data['total_profit'],
-                "win_rate": data['win_rate'],
-                "trades": data['total_trades']
+                "profit": profit,
+                "win_rate": self.leaderboard[uid]['win_rate'],
+                "trades": self.leaderboard[uid]['total_trades']
             }
-            for i, (uid, data) in enumerate(sorted_traders[:limit])
+            for i, (uid, profit) in enumerate(self.ranking.top(limit))
         ]
     
     def set_copy_target(self, user_id: int, target_id: int, percentage: float = 100.0):
         """Set trader to copy"""
+        self.stop_copying(user_id)
+        self.followers.setdefault(target_id, set()).add(user_id)
         self.copy_settings[user_id] = {
             "target": target_id,
             "percentage": percentage,
@@ -42,3 +58,71 @@ class CopyTrading:
             "started": datetime.now().isoformat()
         }
         logger.info(f"User {user_id} now copying {target_id} at {percentage}%")
+    
+    def stop_copying(self, user_id: int):
+        """Drop a follower from their current leader"""
+        settings = self.copy_settings.pop(user_id, None)
+        if settings:
+            followers = self.followers.get(settings["target"])
+            if followers:
+                followers.discard(user_id)
+                if not followers:
+                    del self.followers[settings["target"]]
+    
+    async def copy_trade(self, leader_id: int, token: str, amount: float,
+                         execute: CopyExecutor, side: str = "buy", slippage_bps: int = 100,
+                         deadline: Optional[float] = None) -> Dict:
+        """
+        Mirror a leader's buy (amount in SOL) or sell (amount in token base
+        units) for every enabled follower, scaled by their percentage.
+        Followers trade from the shared bot wallet, so their orders are netted
+        into one swap on one exact quote and the fill is split pro rata: the
+        cost stays one quote and one swap however many followers there are.
+        """
+        started = time.perf_counter()
+        orders = {}
+        for follower_id in self.followers.get(leader_id, ()):
+            settings = self.copy_settings.get(follower_id)
+            if settings and settings["enabled"]:
+                orders[follower_id] = amount * settings["percentage"] / 100
+        total = sum(orders.values())
+        if not orders or total <= 0:
+            return {"success": True, "orders": 0, "filled": 0, "failed": {}, "results": {}, "elapsed": 0.0}
+        
+        if side == "buy":
+            input_mint, output_mint, units = SOL_MINT, token, int(total * 1e9)
+        else:
+            input_mint, output_mint, units = token, SOL_MINT, int(total)
+        
+        async def swap() -> Dict:
+            quote = await quote_cache.get_quote(input_mint, output_mint, units, slippage_bps, exact=True)
+            if not quote or "outAmount" not in quote:
+                return {"success": False, "error": "No route found"}
+            return await execute(side, token, total, quote)
+        
+        try:
+            result = await asyncio.wait_for(swap(), deadline)
+        except asyncio.TimeoutError:
+            result = {"success": False, "error": "timed out"}
+        except Exception as e:
+            logger.error(f"Copy {side} for leader {leader_id} failed: {e}")
+            result = {"success": False, "error": str(e)}
+        
+        results = {}
+        for fid, follower_amount in orders.items():
+            results[fid] = OrderNetter.allocate(result, follower_amount, total)
+            results[fid]["amount"] = follower_amount
+        failed = {} if result.get("success") else {fid: result.get("error", "failed") for fid in orders}
+        filled = len(orders) - len(failed)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Copied leader {leader_id} {side} on {token[:8]}: {filled}/{len(orders)} filled "
+                    f"in {elapsed:.2f}s")
+        return {
+            "success": True,
+            "orders": len(orders),
+            "filled": filled,
+            "failed": failed,
+            "results": results,
+            "signature": result.get("signature") or result.get("tx"),
+            "elapsed": elapsed
+        }
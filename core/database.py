@@ -1,16 +1,69 @@
-"""Database using HTTP requests to Supabase REST API"""
-import requests
+"""Async trade database: Supabase REST API with a pooled local SQLite fallback"""
+import asyncio
+import sqlite3
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 from loguru import logger
+from core.http_client import http_client
+from core.concurrency import bounded_gather
+
+# SQLite schema (matches the columns the queries below use)
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        token_address TEXT,
+        amount_sol REAL,
+        entry_price REAL,
+        tx_signature TEXT,
+        fee_paid REAL DEFAULT 0,
+        exit_price REAL,
+        pnl_percent REAL,
+        status TEXT DEFAULT 'active',
+        created_at TEXT
+    )
+"""
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_trades_user_status ON trades (user_id, status)",
+]
+# Columns added after the first release; older trades.db files are migrated in place
+MIGRATED_COLUMNS = {
+    "tx_signature": "TEXT",
+    "fee_paid": "REAL DEFAULT 0",
+    "exit_price": "REAL",
+    "pnl_percent": "REAL",
+    "created_at": "TEXT",
+}
+
+# Statements are kept as constants so sqlite3's per-connection statement cache reuses them
+INSERT_TRADE = """
+    INSERT INTO trades (user_id, token_address, amount_sol, entry_price, tx_signature, fee_paid, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_ACTIVE = """
+    SELECT id, user_id, token_address, amount_sol, entry_price, tx_signature, fee_paid, pnl_percent
+    FROM trades WHERE user_id=? AND status='active'
+"""
+UPDATE_EXIT = "UPDATE trades SET exit_price=?, pnl_percent=?, status=? WHERE id=?"
+UPDATE_PNL = "UPDATE trades SET pnl_percent=? WHERE id=?"
+
 
 class DatabaseManager:
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, sqlite_path: str = 'trades.db', pool_size: int = 4,
+                 pnl_flush_interval: float = 2.0):
         # Parse Supabase URL for REST API
         self.database_url = database_url
         self.rest_url = None
         self.api_key = None
-        
+        self.sqlite_path = sqlite_path
+        self.pool_size = pool_size
+        self.pnl_flush_interval = pnl_flush_interval
+        self.rest_concurrency = 8  # PATCH requests in flight per bulk update
+        self._pool: Optional[asyncio.Queue] = None
+        self._connections: List[sqlite3.Connection] = []
+        self._pending_pnl: Dict[int, float] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
         # Extract from postgres URL format
         if 'supabase.com' in database_url:
             # Convert to REST API URL
@@ -25,71 +78,232 @@ class DatabaseManager:
                 if 'pooler.supabase.com' in host:
                     project_ref = host.split('.')[0]
                     self.rest_url = f"https://{project_ref}.supabase.co/rest/v1"
-    
-    def connect(self):
+
+    @property
+    def using_sqlite(self) -> bool:
+        return self._pool is not None
+
+    def _headers(self, prefer: str = "") -> Dict:
+        headers = {
+            "apikey": self.api_key,
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        if prefer:
+            headers["Prefer"] = prefer
+        return headers
+
+    async def connect(self):
         """Test connection"""
         if self.rest_url:
             try:
-                headers = {
-                    "apikey": self.api_key,
-                    "Authorization": f"Bearer {self.api_key}"
-                }
-                resp = requests.get(f"{self.rest_url}/trades?limit=1", headers=headers)
-                logger.info(f"Supabase REST connected: {resp.status_code}")
+                async with http_client.get(f"{self.rest_url}/trades?limit=1", headers=self._headers()) as resp:
+                    logger.info(f"Supabase REST connected: {resp.status}")
+                    if resp.status < 400:
+                        self._start_flusher()
+                        return
             except Exception as e:
                 logger.error(f"Database connection failed: {e}")
-                # Use local SQLite fallback
-                self._init_sqlite()
-        else:
-            self._init_sqlite()
-    
-    def _init_sqlite(self):
+        # Use local SQLite fallback
+        await self._init_sqlite()
+        self._start_flusher()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.sqlite_path, check_same_thread=False, timeout=10,
+                               cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(SCHEMA)
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(trades)")}
+        for column, decl in MIGRATED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE trades ADD COLUMN {column} {decl}")
+        for index in INDEXES:
+            conn.execute(index)
+        conn.commit()
+
+    async def _init_sqlite(self):
         """Fallback to SQLite"""
-        import sqlite3
-        self.sqlite_conn = sqlite3.connect('trades.db')
-        self.sqlite_conn.execute("""
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                token_address TEXT,
-                amount_sol REAL,
-                entry_price REAL,
-                status TEXT DEFAULT 'active'
-            )
-        """)
-        self.sqlite_conn.commit()
-        logger.info("Using SQLite fallback")
-    
-    def record_trade(self, user_id: int, token: str, amount_sol: float,
-                    entry_price: float, tx_signature: str, fee_paid: float) -> int:
+        def open_pool():
+            conns = [self._open_connection() for _ in range(self.pool_size)]
+            self._create_schema(conns[0])
+            return conns
+
+        self._connections = await asyncio.to_thread(open_pool)
+        self._pool = asyncio.Queue()
+        for conn in self._connections:
+            self._pool.put_nowait(conn)
+        logger.info(f"Using SQLite fallback ({self.pool_size} pooled connections)")
+
+    async def _run(self, fn, *args):
+        """Run a blocking SQLite call on a pooled connection off the event loop"""
+        conn = await self._pool.get()
+        try:
+            return await asyncio.to_thread(fn, conn, *args)
+        finally:
+            self._pool.put_nowait(conn)
+
+    async def record_trade(self, user_id: int, token: str, amount_sol: float,
+                           entry_price: float, tx_signature: str, fee_paid: float) -> int:
         """Record trade"""
-        if hasattr(self, 'sqlite_conn'):
-            cur = self.sqlite_conn.cursor()
-            cur.execute("""
-                INSERT INTO trades (user_id, token_address, amount_sol, entry_price, tx_signature, fee_paid)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, token, amount_sol, entry_price, tx_signature, fee_paid))
-            self.sqlite_conn.commit()
-            return cur.lastrowid
-        return 1
-    
-    def get_active_positions(self, user_id: int) -> List[Dict]:
+        ids = await self.record_trades([{
+            "user_id": user_id, "token_address": token, "amount_sol": amount_sol,
+            "entry_price": entry_price, "tx_signature": tx_signature, "fee_paid": fee_paid
+        }])
+        return ids[0] if ids else 1
+
+    async def record_trades(self, trades: List[Dict]) -> List[int]:
+        """Bulk insert; returns the new trade ids in order"""
+        if not trades:
+            return []
+        now = datetime.now().isoformat()
+
+        if self.using_sqlite:
+            rows = [(t["user_id"], t["token_address"], t["amount_sol"], t["entry_price"],
+                     t.get("tx_signature"), t.get("fee_paid", 0.0), now) for t in trades]
+
+            def insert(conn):
+                ids = []
+                with conn:
+                    for row in rows:
+                        ids.append(conn.execute(INSERT_TRADE, row).lastrowid)
+                return ids
+
+            return await self._run(insert)
+
+        if self.rest_url:
+            try:
+                payload = [{**t, "status": "active", "created_at": now} for t in trades]
+                async with http_client.post(f"{self.rest_url}/trades", json=payload,
+                                            headers=self._headers("return=representation")) as resp:
+                    if resp.status < 400:
+                        return [row.get("id") for row in await resp.json()]
+                    logger.error(f"Supabase insert failed: HTTP {resp.status}")
+            except Exception as e:
+                logger.error(f"Supabase insert error: {e}")
+        return []
+
+    async def get_active_positions(self, user_id: int) -> List[Dict]:
         """Get active trades"""
-        if hasattr(self, 'sqlite_conn'):
-            cur = self.sqlite_conn.cursor()
-            cur.execute("SELECT * FROM trades WHERE user_id=? AND status='active'", (user_id,))
-            rows = cur.fetchall()
-            return [{"id": r[0], "token_address": r[2], "amount_sol": r[3]} for r in rows]
+        if self.using_sqlite:
+            def select(conn):
+                return [dict(row) for row in conn.execute(SELECT_ACTIVE, (user_id,))]
+            return await self._run(select)
+
+        if self.rest_url:
+            try:
+                async with http_client.get(
+                    f"{self.rest_url}/trades?user_id=eq.{user_id}&status=eq.active",
+                    headers=self._headers()
+                ) as resp:
+                    if resp.status < 400:
+                        return await resp.json()
+            except Exception as e:
+                logger.error(f"Supabase query error: {e}")
         return []
-    
-    def update_trade_exit(self, trade_id: int, exit_price: float, pnl_percent: float, status: str = 'closed'):
+
+    async def update_trade_exit(self, trade_id: int, exit_price: float, pnl_percent: float, status: str = 'closed'):
         """Update trade"""
-        if hasattr(self, 'sqlite_conn'):
-            self.sqlite_conn.execute("""
-                UPDATE trades SET exit_price=?, pnl_percent=?, status=? WHERE id=?
-            """, (exit_price, pnl_percent, status, trade_id))
-            self.sqlite_conn.commit()
-    
-    def close(self):
-        if hasattr(self, 'sqlite_conn'):
-            self.sqlite_conn.close()
+        self._pending_pnl.pop(trade_id, None)
+        await self.update_trades_exit([(trade_id, exit_price, pnl_percent, status)])
+
+    async def update_trades_exit(self, exits: Iterable[Tuple[int, float, float, str]]):
+        """Bulk close: (trade_id, exit_price, pnl_percent, status) tuples"""
+        exits = list(exits)
+        if not exits:
+            return
+
+        if self.using_sqlite:
+            rows = [(exit_price, pnl, status, trade_id) for trade_id, exit_price, pnl, status in exits]
+
+            def update(conn):
+                with conn:
+                    conn.executemany(UPDATE_EXIT, rows)
+
+            await self._run(update)
+            return
+
+        await self._rest_update([
+            {"id": trade_id, "exit_price": exit_price, "pnl_percent": pnl, "status": status}
+            for trade_id, exit_price, pnl, status in exits
+        ])
+
+    async def update_trade_pnl(self, trade_id: int, pnl_percent: float):
+        """Buffer a live P&L update; only the latest value per trade is written"""
+        self._pending_pnl[trade_id] = pnl_percent
+
+    async def update_trades_pnl(self, updates: Iterable[Tuple[int, float]]):
+        """Bulk P&L write: (trade_id, pnl_percent) tuples"""
+        updates = list(updates)
+        if not updates:
+            return
+
+        if self.using_sqlite:
+            rows = [(pnl, trade_id) for trade_id, pnl in updates]
+
+            def update(conn):
+                with conn:
+                    conn.executemany(UPDATE_PNL, rows)
+
+            await self._run(update)
+            return
+
+        await self._rest_update([{"id": trade_id, "pnl_percent": pnl} for trade_id, pnl in updates])
+
+    async def _rest_update(self, rows: List[Dict]):
+        """
+        Partial-row updates, one PATCH per trade id sent concurrently. A POST
+        upsert would be an INSERT ... ON CONFLICT and fail on NOT NULL columns.
+        """
+        if not self.rest_url:
+            return
+
+        async def patch(row: Dict):
+            fields = {k: v for k, v in row.items() if k != "id"}
+            async with http_client.request("PATCH", f"{self.rest_url}/trades?id=eq.{row['id']}",
+                                           json=fields, headers=self._headers("return=minimal")) as resp:
+                if resp.status >= 400:
+                    raise RuntimeError(f"HTTP {resp.status}")
+
+        jobs = {row["id"]: (lambda row=row: patch(row)) for row in rows}
+        outcome = await bounded_gather(jobs, limit=self.rest_concurrency)
+        if outcome["errors"]:
+            first = next(iter(outcome["errors"].values()))
+            logger.error(f"Supabase update failed for {len(outcome['errors'])}/{len(rows)} trades: {first}")
+
+    async def flush_pnl(self):
+        """Write all buffered P&L updates in one batch"""
+        if not self._pending_pnl:
+            return
+        updates = list(self._pending_pnl.items())
+        self._pending_pnl.clear()
+        try:
+            await self.update_trades_pnl(updates)
+        except Exception as e:
+            logger.error(f"P&L flush failed: {e}")
+            for trade_id, pnl in updates:
+                self._pending_pnl.setdefault(trade_id, pnl)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.pnl_flush_interval)
+            await asyncio.shield(self.flush_pnl())
+
+    def _start_flusher(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush_pnl()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._pool = None
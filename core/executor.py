@@ -1,5 +1,6 @@
-import os, json, aiohttp
+import os, json
 from core.security import security
+from core.http_client import http_client
 
 class SniperExecutor:
     def __init__(self):
@@ -13,10 +14,9 @@ class SniperExecutor:
         
         payload = {"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": [pub_key]}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.rpc_url, json=payload) as resp:
-                    res = await resp.json()
-                    return res.get("result", {}).get("value", 0) / 10**9
+            async with http_client.post(self.rpc_url, json=payload) as resp:
+                res = await resp.json()
+                return res.get("result", {}).get("value", 0) / 10**9
         except:
             return 0
 
@@ -0,0 +1,144 @@
+"""
+🌐 SHARED HTTP CLIENT
+One pooled aiohttp session for every Jupiter / RPC / Helius / RugCheck call
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from loguru import logger
+
+# Trade-path hosts that take whole fan-outs at once (copy trades, netted orders)
+JUPITER_HOSTS = ("quote-api.jup.ag", "lite-api.jup.ag", "api.jup.ag")
+
+
+class HTTPClient:
+    """
+    Process-wide HTTP client with keep-alive, DNS cache and per-host limits.
+    Per-host concurrency is enforced by semaphores: `limit_per_host` by default,
+    `host_limits` where set, and `trade_host_limit` for Jupiter and the RPC
+    endpoints in RPC_URL / RPC_URLS (read on first use).
+    """
+
+    def __init__(self, limit: int = 512, limit_per_host: int = 20,
+                 dns_ttl: int = 300, keepalive_timeout: float = 30.0,
+                 timeout: float = 10.0, host_limits: Optional[Dict[str, int]] = None,
+                 trade_host_limit: int = 256):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.trade_host_limit = trade_host_limit
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=min(timeout, 5.0))
+        # Hosts with stricter concurrency budgets than the default
+        self.host_limits = host_limits or {
+            "api.helius.xyz": 10,
+            "api.rugcheck.xyz": 5,
+            **{host: trade_host_limit for host in JUPITER_HOSTS},
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+        }
+        self._host_stats: Dict[str, Dict[str, int]] = {}
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Count fresh vs reused connections"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_create(session, ctx, params):
+            self._stats["connections_created"] += 1
+
+        async def on_reuse(session, ctx, params):
+            self._stats["connections_reused"] += 1
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared session inside the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=0,  # The host semaphores below are the per-host caps
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                trace_configs=[self._trace_config()],
+            )
+        return self._session
+
+    @staticmethod
+    def _rpc_hosts() -> set:
+        urls = [*os.getenv("RPC_URL", "").split(","), *os.getenv("RPC_URLS", "").split(",")]
+        return {urlsplit(url.strip()).hostname for url in urls if url.strip()}
+
+    def host_limit(self, host: str) -> int:
+        if host in self.host_limits:
+            return self.host_limits[host]
+        if host in self._rpc_hosts():
+            return self.trade_host_limit
+        return self.limit_per_host
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.host_limit(host))
+            self._semaphores[host] = sem
+        return sem
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        """Issue a request through the pool, bounded by the host's concurrency limit"""
+        host = urlsplit(url).hostname or ""
+        host_stats = self._host_stats.setdefault(host, {"requests": 0, "errors": 0})
+        self._stats["requests"] += 1
+        host_stats["requests"] += 1
+
+        async with self._semaphore(host):
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    yield resp
+            except Exception:
+                self._stats["errors"] += 1
+                host_stats["errors"] += 1
+                raise
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Request and connection-reuse counters"""
+        created = self._stats["connections_created"]
+        reused = self._stats["connections_reused"]
+        total = created + reused
+        return {
+            **self._stats,
+            "reuse_ratio": reused / total if total else 0.0,
+            "hosts": {host: dict(s) for host, s in self._host_stats.items()},
+        }
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP client closed: {self.stats()}")
+        self._session = None
+
+
+http_client = HTTPClient()
@@ -0,0 +1,132 @@
+"""
+🏆 LEADERBOARD INDEX
+Incrementally maintained rankings: all-time, daily and weekly
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+
+class Leaderboard:
+    """Sorted score index: O(log n) updates and rank lookups, O(K) top-K reads"""
+
+    def __init__(self):
+        self._keys = SortedList()  # (-score, user_id), ascending = best first
+        self._scores: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def set(self, user_id: int, score: float):
+        old = self._scores.get(user_id)
+        if old is not None:
+            if old == score:
+                return
+            self._keys.remove((-old, user_id))
+        self._keys.add((-score, user_id))
+        self._scores[user_id] = score
+
+    def add(self, user_id: int, delta: float):
+        self.set(user_id, self._scores.get(user_id, 0.0) + delta)
+
+    def remove(self, user_id: int):
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._keys.remove((-old, user_id))
+
+    def score(self, user_id: int) -> Optional[float]:
+        return self._scores.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank, or None if the user has no score"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return self._keys.bisect_left((-score, user_id)) + 1
+
+    def top(self, k: int = 10) -> List[Tuple[int, float]]:
+        return [(user_id, -neg) for neg, user_id in self._keys.islice(0, k)]
+
+    def scores(self) -> Dict[int, float]:
+        """Live user -> score map (do not mutate)"""
+        return self._scores
+
+
+class WindowedLeaderboard:
+    """One leaderboard per day or ISO week bucket; old buckets are dropped"""
+
+    def __init__(self, period: str = "day", keep: int = 7):
+        if period not in ("day", "week"):
+            raise ValueError(f"Unknown leaderboard period: {period}")
+        self.period = period
+        self.keep = keep
+        self._buckets: Dict[str, Leaderboard] = {}
+
+    def bucket_key(self, when: Optional[datetime] = None) -> str:
+        when = when or datetime.now()
+        if self.period == "day":
+            return when.date().isoformat()
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    def add(self, user_id: int, delta: float, when: Optional[datetime] = None):
+        key = self.bucket_key(when)
+        board = self._buckets.get(key)
+        if board is None:
+            board = self._buckets[key] = Leaderboard()
+            # Keys sort chronologically, so the smallest are the oldest
+            for stale in sorted(self._buckets)[:-self.keep]:
+                del self._buckets[stale]
+        board.add(user_id, delta)
+
+    def top(self, k: int = 10, when: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        board = self._buckets.get(self.bucket_key(when))
+        return board.top(k) if board else []
+
+    def snapshot(self) -> Dict[str, Dict[int, float]]:
+        """bucket -> scores; shares the live score maps, so serialize it right away"""
+        return {key: board.scores() for key, board in self._buckets.items()}
+
+    def restore(self, snapshot: Dict[str, Dict]):
+        self._buckets = {}
+        for key in sorted(snapshot)[-self.keep:]:
+            board = self._buckets[key] = Leaderboard()
+            for user_id, score in snapshot[key].items():
+                board.set(int(user_id), score)  # JSON turned the ids into strings
+
+
+class LeaderboardIndex:
+    """All-time profit ranking plus daily and weekly windows, updated per trade"""
+
+    def __init__(self):
+        self.all_time = Leaderboard()
+        self.daily = WindowedLeaderboard("day", keep=7)
+        self.weekly = WindowedLeaderboard("week", keep=4)
+
+    def load(self, users: Dict[int, Dict], field: str = "total_profit"):
+        """Seed the all-time board from existing user records"""
+        for user_id, data in users.items():
+            self.all_time.set(user_id, data.get(field, 0.0))
+
+    def snapshot(self) -> Dict:
+        """Daily and weekly windows; the all-time board is rebuilt from user records"""
+        return {"daily": self.daily.snapshot(), "weekly": self.weekly.snapshot()}
+
+    def restore(self, snapshot: Dict):
+        self.daily.restore(snapshot.get("daily") or {})
+        self.weekly.restore(snapshot.get("weekly") or {})
+
+    def record(self, user_id: int, total_profit: float, profit: float,
+               when: Optional[datetime] = None):
+        self.all_time.set(user_id, total_profit)
+        self.daily.add(user_id, profit, when)
+        self.weekly.add(user_id, profit, when)
+
+    def top(self, k: int = 10, window: str = "all") -> List[Tuple[int, float]]:
+        if window == "daily":
+            return self.daily.top(k)
+        if window == "weekly":
+            return self.weekly.top(k)
+        return self.all_time.top(k)
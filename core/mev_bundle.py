@@ -3,42 +3,359 @@
 Submit transactions to Jito block engine
 """
 
-import aiohttp
-from typing import Dict, List
+import asyncio
+import itertools
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from loguru import logger
+from core.http_client import http_client
+
+MAX_BUNDLE_SIZE = 5  # Jito limit per bundle
+LANDED, FAILED, INVALID, PENDING = "Landed", "Failed", "Invalid", "Pending"
+
+JITO_ENDPOINT = "https://mainnet.block-engine.jito.wtf/api/v1"
+TIP_FLOOR_URL = "https://bundles.jito.wtf/api/v1/bundles/tip_floor"
+# Used until getTipAccounts answers
+JITO_TIP_ACCOUNTS = [
+    "96gYZGLnJYVFmbjzopPSU6QiEV5fGqZNyN9nmNhvrZU5",
+    "HFqU5x63VTqvQss8hp11i4wVV8bD44PvwucfZ2bU7gRe",
+    "Cw8CFyM9FkoMi7K7Crf6HNQqf4uEMzpKw6QNghXLvLkY",
+    "ADaUMid9yfUytqMBgopwjb2DTLSokTSzL1zt6iGPaS49",
+    "DfXygSm4jCyNCybVYYK6DwvWqjKee8pbDmJGcLWNDXjh",
+    "ADuUkR4vqLUMWXxW9gh6D6L8pMSawimctcNZ5pGwDcEt",
+    "DttWaMuVvTiduZRnguLF7jNxTgiMBZ1hyAumKUiL2KRL",
+    "3AVi9Tg9Uo68tJfuvoKvqKNWKkC5wPdSSdeBnizKZ6jT",
+]
+FLOOR_PERCENTILES = (25, 50, 75, 95, 99)  # Published in the tip floor feed
+
+# build(tip_lamports, tip_account) -> (signed base64 tx, signature, last_valid_block_height).
+# A tip of 0 means no tip instruction; otherwise the transfer is part of the signed tx.
+TxBuilder = Callable[[int, str], Awaitable[Tuple[str, str, int]]]
+BlockHeight = Callable[[], Awaitable[int]]
+
+
+class TipStats:
+    """Landed-tip percentiles as published by the block engine's tip floor"""
+
+    def __init__(self, default_tip: int = 10000):
+        self.default_tip = default_tip
+        self.floor: Dict[int, int] = {}  # percentile -> lamports
+        self.updated = 0.0
+        self.paid = deque(maxlen=200)    # Our own landed tips; reported, never fed back
+
+    def update(self, sample: Dict):
+        """One tip_floor entry (values in SOL)"""
+        floor = {}
+        for percentile in FLOOR_PERCENTILES:
+            value = sample.get(f"landed_tips_{percentile}th_percentile")
+            if value is not None:
+                floor[percentile] = int(float(value) * 1e9)
+        if floor:
+            self.floor = floor
+            self.updated = time.monotonic()
+
+    def record(self, tip: int):
+        self.paid.append(tip)
+
+    def suggest(self, percentile: float = 50, floor: int = 1000, ceiling: int = 1_000_000) -> int:
+        """Market tip at `percentile`, interpolated between published points, clamped"""
+        points = sorted(self.floor.items())
+        if not points:
+            tip = self.default_tip
+        elif percentile <= points[0][0]:
+            tip = points[0][1]
+        elif percentile >= points[-1][0]:
+            tip = points[-1][1]
+        else:
+            for (p0, t0), (p1, t1) in zip(points, points[1:]):
+                if p0 <= percentile <= p1:
+                    tip = t0 + (t1 - t0) * (percentile - p0) / (p1 - p0)
+                    break
+        return max(floor, min(ceiling, int(tip)))
+
 
 class MEVBundler:
-    """Submit transactions via Jito for MEV protection"""
-    
-    def __init__(self, jito_api_key: str = ""):
-        self.jito_endpoint = "https://mainnet.block-engine.jito.wtf/api/v1"
+    """
+    Submit transactions via Jito for MEV protection. Callers hand in a builder
+    rather than a signed transaction: the last transaction of every bundle is
+    built with a transfer to a Jito tip account.
+
+    A signed bundle is only ever replaced (re-signed, tip raised) once it can
+    no longer land: after a Failed status, or once the block height has passed
+    the last_valid_block_height of its transactions. Until then an unanswered
+    bundle is resubmitted byte for byte, so two versions of a swap can never
+    both execute. Without a `block_height` source expiry is never assumed and
+    the bundle is given up after `max_rebroadcasts` identical resubmissions.
+    """
+
+    def __init__(self, jito_api_key: str = "", window: float = 0.05, bundle_ttl: float = 30.0,
+                 status_interval: float = 1.0, max_attempts: int = 3, tip_percentile: float = 50,
+                 tip_refresh_interval: float = 10.0, jito_endpoint: str = JITO_ENDPOINT,
+                 tip_floor_url: str = TIP_FLOOR_URL, block_height: Optional[BlockHeight] = None,
+                 max_rebroadcasts: int = 10):
+        self.jito_endpoint = jito_endpoint
+        self.tip_floor_url = tip_floor_url
         self.api_key = jito_api_key
-        self.bundle_id = 0
-    
-    async def submit_bundle(self, transactions: List[str], tip_lamports: int = 10000) -> Dict:
-        """Submit transaction bundle to Jito"""
+        self.window = window                    # How long to hold a bundle open for more txs
+        self.bundle_ttl = bundle_ttl            # Resubmit if still not landed after this
+        self.status_interval = status_interval
+        self.max_attempts = max_attempts        # Signed versions (tip levels) per bundle
+        self.max_rebroadcasts = max_rebroadcasts
+        self.block_height = block_height
+        self.tip_percentile = tip_percentile
+        self.tip_refresh_interval = tip_refresh_interval
+        self.tips = TipStats()
+        self.tip_accounts = list(JITO_TIP_ACCOUNTS)
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tips_ready: Optional[asyncio.Event] = None  # Set after the first tip floor fetch
+        self._inflight: Dict[str, Dict] = {}    # bundle_id -> bundle
+        self._tasks: List[asyncio.Task] = []
+        self._sending = set()
+        self._stats = {"bundles": 0, "transactions": 0, "landed": 0, "failed": 0, "resubmitted": 0,
+                       "rebroadcast": 0, "rebuilt": 0}
+
+    async def _rpc(self, method: str, params: List):
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["x-jito-auth"] = self.api_key
+        async with http_client.post(f"{self.jito_endpoint}/bundles", json=payload, headers=headers) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            data = await resp.json()
+            if data.get("error"):
+                raise RuntimeError(data["error"].get("message", data["error"]))
+            return data.get("result")
+
+    async def submit_bundle(self, transactions: List[str]) -> Dict:
+        """Submit signed (base64) transactions as one bundle; the tip must already be inside them"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": self.bundle_id,
-                "method": "sendBundle",
-                "params": [transactions, {"tip": tip_lamports, "api_key": self.api_key}]
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.jito_endpoint}/bundles",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as resp:
-                    
-                    if resp.status == 200:
-                        result = await resp.json()
-                        self.bundle_id += 1
-                        return {"success": True, "bundle_id": result.get("result"), "tip": tip_lamports}
-                    else:
-                        return {"success": False, "error": f"HTTP {resp.status}"}
-                        
+            result = await self._rpc("sendBundle", [transactions, {"encoding": "base64"}])
+            return {"success": True, "bundle_id": result}
         except Exception as e:
             logger.error(f"MEV bundle error: {e}")
             return {"success": False, "error": str(e)}
+
+    async def refresh_tips(self):
+        """Pull landed-tip percentiles (tip floor) and the current tip accounts"""
+        try:
+            async with http_client.get(self.tip_floor_url) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status}")
+                samples = await resp.json()
+            if samples:
+                self.tips.update(samples[0])
+        except Exception as e:
+            logger.warning(f"Tip floor refresh failed: {e}")
+        try:
+            accounts = await self._rpc("getTipAccounts", [])
+            if accounts:
+                self.tip_accounts = list(accounts)
+        except Exception as e:
+            logger.warning(f"Tip account refresh failed: {e}")
+
+    async def _tip_loop(self):
+        while True:
+            await self.refresh_tips()
+            self._tips_ready.set()
+            await asyncio.sleep(self.tip_refresh_interval)
+
+    async def submit(self, build: TxBuilder) -> Dict:
+        """
+        Queue one transaction for the next bundle and wait until that bundle
+        lands or is given up on. The result carries the signature that landed.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait({"build": build, "future": future})
+        return await future
+
+    async def _collect_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < MAX_BUNDLE_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            if not self._tips_ready.is_set():
+                # Price the first bundle off the market, not the default tip
+                try:
+                    await asyncio.wait_for(self._tips_ready.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+            bundle = {"items": batch, "tip": self.tips.suggest(self.tip_percentile), "attempts": 0}
+            self._stats["transactions"] += len(batch)
+            # Keep collecting the next bundle while this one is in the air
+            self._spawn(self._send(bundle))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _build(self, bundle: Dict) -> bool:
+        """
+        (Re)build transactions whose tip is not what this attempt pays: the last
+        one carries the tip, the rest carry none. Items that fail to build are
+        resolved with the error and dropped. Callers clear item["tx"] only when
+        the old version can no longer land.
+        """
+        while bundle["items"]:
+            carrier = bundle["items"][-1]
+            stale = [item for item in bundle["items"]
+                     if item.get("tx") is None or item["tip"] != (bundle["tip"] if item is carrier else 0)]
+            if not stale:
+                return True
+            for item in stale:
+                tip = bundle["tip"] if item is carrier else 0
+                try:
+                    tx, signature, last_valid = await item["build"](tip, random.choice(self.tip_accounts))
+                except Exception as e:
+                    logger.error(f"Could not build bundle transaction: {e}")
+                    bundle["items"].remove(item)
+                    if not item["future"].done():
+                        item["future"].set_result({"success": False, "error": str(e)})
+                    continue
+                self._stats["rebuilt"] += item.get("tx") is not None
+                item.update({"tx": tx, "signature": signature, "tip": tip, "last_valid": last_valid})
+        return False
+
+    async def _send(self, bundle: Dict):
+        """Sign whatever this attempt needs, then submit"""
+        bundle["attempts"] += 1
+        bundle["rebroadcasts"] = 0
+        if not await self._build(bundle):
+            return
+        # All-or-nothing: the bundle is dead once its earliest blockhash is
+        bundle["last_valid"] = min(item["last_valid"] for item in bundle["items"])
+        await self._submit(bundle)
+
+    async def _submit(self, bundle: Dict):
+        """Submit the bundle's current signed transactions unchanged"""
+        result = await self.submit_bundle([item["tx"] for item in bundle["items"]])
+        if not result["success"]:
+            # The engine may still have accepted it: only ever retry the same bytes
+            if bundle["rebroadcasts"] < self.max_rebroadcasts:
+                bundle["rebroadcasts"] += 1
+                self._stats["rebroadcast"] += 1
+                asyncio.get_running_loop().call_later(
+                    self.status_interval, lambda: self._spawn(self._submit(bundle))
+                )
+            else:
+                self._finish(bundle, {"success": False, "error": result["error"], "tip": bundle["tip"]})
+            return
+        bundle["bundle_id"] = result["bundle_id"]
+        bundle["sent_at"] = time.monotonic()
+        self._inflight[bundle["bundle_id"]] = bundle
+        self._stats["bundles"] += 1
+
+    def _finish(self, bundle: Dict, result: Dict):
+        self._stats["landed" if result.get("success") else "failed"] += 1
+        for item in bundle["items"]:
+            if not item["future"].done():
+                item["future"].set_result({**result, "signature": item.get("signature")})
+
+    async def _status_loop(self):
+        while True:
+            await asyncio.sleep(self.status_interval)
+            ids = list(self._inflight)
+            for i in range(0, len(ids), MAX_BUNDLE_SIZE):
+                chunk = ids[i:i + MAX_BUNDLE_SIZE]
+                try:
+                    result = await self._rpc("getInflightBundleStatuses", [chunk])
+                except Exception as e:
+                    logger.warning(f"Bundle status check failed: {e}")
+                    continue
+                for status in (result or {}).get("value", []):
+                    if status:
+                        await self._on_status(status)
+                # Pending, Invalid (unknown to the engine) or unreported for too long
+                for bundle_id in chunk:
+                    bundle = self._inflight.get(bundle_id)
+                    if bundle and time.monotonic() - bundle["sent_at"] > self.bundle_ttl:
+                        await self._expire(self._inflight.pop(bundle_id))
+
+    async def _on_status(self, status: Dict):
+        bundle = self._inflight.get(status.get("bundle_id"))
+        if bundle is None:
+            return
+        state = status.get("status")
+        if state == LANDED:
+            del self._inflight[bundle["bundle_id"]]
+            self.tips.record(bundle["tip"])
+            self._finish(bundle, {"success": True, "bundle_id": bundle["bundle_id"],
+                                  "tip": bundle["tip"], "slot": status.get("landed_slot")})
+        elif state == FAILED:
+            # Definitive: none of these transactions will land from this bundle
+            del self._inflight[bundle["bundle_id"]]
+            if len(bundle["items"]) > 1:
+                # Bundles are all-or-nothing: retry each user's tx on its own, each with a tip
+                for item in bundle["items"]:
+                    self._spawn(self._send({"items": [item], "tip": bundle["tip"],
+                                            "attempts": bundle["attempts"]}))
+                self._stats["resubmitted"] += 1
+            else:
+                await self._retry(bundle, state.lower())
+
+    async def _current_height(self) -> Optional[int]:
+        if self.block_height is None:
+            return None
+        try:
+            return await self.block_height()
+        except Exception as e:
+            logger.warning(f"Block height check failed: {e}")
+            return None
+
+    async def _expire(self, bundle: Dict):
+        """A bundle outlived bundle_ttl undecided: resend it as is, or re-sign once it is dead"""
+        height = await self._current_height()
+        if height is not None and height > bundle["last_valid"]:
+            # Its blockhash has expired, so no signed version can land any more
+            for item in bundle["items"]:
+                item["tx"] = None
+            await self._retry(bundle, "expired")
+        elif bundle["rebroadcasts"] < self.max_rebroadcasts:
+            bundle["rebroadcasts"] += 1
+            self._stats["rebroadcast"] += 1
+            await self._submit(bundle)
+        else:
+            self._finish(bundle, {"success": False, "error": "Bundle not landed", "tip": bundle["tip"]})
+
+    async def _retry(self, bundle: Dict, reason: str):
+        if bundle["attempts"] >= self.max_attempts:
+            self._finish(bundle, {"success": False, "error": f"Bundle {reason}", "tip": bundle["tip"]})
+            return
+        # Only reached once the previous version cannot land; outbid it and re-sign
+        bundle["tip"] = max(int(bundle["tip"] * 1.5), self.tips.suggest(self.tip_percentile))
+        self._stats["resubmitted"] += 1
+        await self._send(bundle)
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tips_ready = asyncio.Event()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._collect_loop()),
+                           asyncio.create_task(self._status_loop()),
+                           asyncio.create_task(self._tip_loop())]
+
+    async def stop(self):
+        for task in [*self._tasks, *self._sending]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._sending, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict:
+        return {**self._stats, "inflight": len(self._inflight),
+                "suggested_tip": self.tips.suggest(self.tip_percentile),
+                "tip_floor": dict(self.tips.floor)}
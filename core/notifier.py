@@ -0,0 +1,239 @@
+"""
+📣 TELEGRAM DISPATCHER
+One shared bot client with a prioritized, rate-limited outbound queue
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Union
+
+from loguru import logger
+
+# Lower value = sent first
+PRIORITY_TRADE = 0       # Fills, stop-losses, anything the user is waiting on
+PRIORITY_ALERT = 5       # Scanner alerts
+PRIORITY_MARKETING = 10  # Channel profit posts, announcements
+
+ChatId = Union[int, str]
+
+
+class TokenBucket:
+    """Classic token bucket; `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until one token is available (0 if ready)"""
+        now = now if now is not None else time.monotonic()
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+    def drain(self, seconds: float):
+        """Hold the bucket empty so its next token becomes available `seconds` from now"""
+        self.updated = time.monotonic()
+        self.tokens = 1 - seconds * self.rate
+
+
+class TelegramDispatcher:
+    """
+    Single outbound path for bot messages, honouring Telegram's flood limits.
+    The dispatcher hands each message to its own send task once the global
+    and per-chat buckets allow it, so up to `max_inflight` requests overlap;
+    messages to one chat still go out one at a time, in order.
+    """
+
+    def __init__(self, bot_token: str = "", global_rate: float = 25.0, chat_rate: float = 1.0,
+                 group_rate: float = 20 / 60, max_queue: int = 10000, max_inflight: int = 32,
+                 chat_idle_ttl: float = 300.0):
+        self.bot_token = bot_token
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight
+        self.chat_idle_ttl = chat_idle_ttl  # Idle chats' buckets are full again long before this
+        self._bot = None
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._deferred = 0
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._busy: Dict[ChatId, List] = {}  # Chat with a send in flight -> messages held behind it
+        self._last_sweep = time.monotonic()
+        self._stats = {"sent": 0, "failed": 0, "retry_after": 0, "dropped": 0}
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            from telegram import Bot
+            self._bot = Bot(self.bot_token or os.getenv("BOT_TOKEN", ""))
+        return self._bot
+
+    @bot.setter
+    def bot(self, bot):
+        """Reuse an already-initialized bot (e.g. application.bot)"""
+        self._bot = bot
+
+    @property
+    def queue_depth(self) -> int:
+        queued = self._queue.qsize() if self._queue else 0
+        return queued + self._deferred + sum(len(held) for held in self._busy.values())
+
+    def _chat_bucket(self, chat_id: ChatId) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Groups and channels (negative ids or @names) have a per-minute limit
+            is_group = str(chat_id).startswith(("-", "@"))
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, 1 if is_group else 3)
+        return bucket
+
+    def _evict_idle_chats(self, now: float):
+        cutoff = now - self.chat_idle_ttl
+        for chat_id in [c for c, b in self._chats.items() if b.updated < cutoff and c not in self._busy]:
+            del self._chats[chat_id]
+        self._last_sweep = now
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Semaphore(self.max_inflight)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        tasks = [self._task] if self._task else []
+        for task in [*tasks, *self._sending]:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._sending, return_exceptions=True)
+        self._task = None
+
+    async def send(self, chat_id: ChatId, text: str, priority: int = PRIORITY_ALERT,
+                   wait: bool = False, **kwargs):
+        """
+        Queue a message. Returns immediately unless wait=True, in which case
+        the caller gets the sent Message (or None if sending failed).
+        """
+        self.start()
+        if self.queue_depth >= self.max_queue and priority > PRIORITY_TRADE:
+            self._stats["dropped"] += 1
+            logger.warning(f"Outbound queue full ({self.queue_depth}), dropped message to {chat_id}")
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((priority, next(self._seq), chat_id, text, kwargs, future))
+        if wait:
+            return await future
+        return None
+
+    def _requeue_later(self, delay: float, item):
+        """Park a message whose chat is throttled so other chats keep flowing"""
+        self._deferred += 1
+
+        def requeue():
+            self._deferred -= 1
+            self._queue.put_nowait(item)
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            priority, seq, chat_id, text, kwargs, future = item
+
+            if chat_id in self._busy:
+                # Keep per-chat order: wait for the chat's in-flight send
+                self._busy[chat_id].append(item)
+                continue
+
+            chat_delay = self._chat_bucket(chat_id).delay()
+            if chat_delay > 0:
+                self._requeue_later(chat_delay, item)
+                continue
+
+            global_delay = self._global.delay()
+            if global_delay > 0:
+                await asyncio.sleep(global_delay)
+            await self._slots.acquire()
+
+            self._global.consume()
+            self._chat_bucket(chat_id).consume()
+            self._busy[chat_id] = []
+            self._spawn(self._send_one(item))
+
+            now = time.monotonic()
+            if now - self._last_sweep > self.chat_idle_ttl:
+                self._evict_idle_chats(now)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _retry_head(self, item, retry_after: float):
+        """Resend a flood-limited message once allowed; its chat stays busy until then"""
+        await asyncio.sleep(retry_after)
+        global_delay = self._global.delay()
+        if global_delay > 0:
+            await asyncio.sleep(global_delay)
+        await self._slots.acquire()
+        self._global.consume()
+        self._chat_bucket(item[2]).consume()
+        await self._send_one(item)
+
+    async def _send_one(self, item):
+        from telegram.error import RetryAfter
+
+        priority, seq, chat_id, text, kwargs, future = item
+        retrying = False
+        try:
+            message = await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            self._stats["sent"] += 1
+            if not future.done():
+                future.set_result(message)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            retry_after = float(retry_after)
+            self._stats["retry_after"] += 1
+            logger.warning(f"Telegram flood limit for {chat_id}, retrying in {retry_after}s")
+            # Messages held behind this one keep waiting, and the chat's bucket
+            # stays empty, so nothing else reaches the chat before the retry
+            self._chat_bucket(chat_id).drain(retry_after)
+            retrying = True
+            self._spawn(self._retry_head(item, retry_after))
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"Telegram send to {chat_id} failed: {e}")
+            if not future.done():
+                future.set_result(None)
+        finally:
+            self._slots.release()
+            if not retrying:
+                for held in self._busy.pop(chat_id, []):
+                    self._queue.put_nowait(held)
+
+    def stats(self) -> Dict:
+        return {**self._stats, "queue_depth": self.queue_depth, "chats": len(self._chats),
+                "inflight": len(self._sending)}
+
+
+# BOT_TOKEN is resolved when the bot is first built, after load_dotenv() has run
+notifier = TelegramDispatcher()
@@ -0,0 +1,147 @@
+"""
+🧺 ORDER NETTING
+Aggregate concurrent same-token orders into one swap and split the fill pro rata
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+from loguru import logger
+
+# Result fields that belong to the whole swap and are split by share
+ADDITIVE_FIELDS = ("token_amount", "profit", "outAmount")
+
+# execute(total_amount_sol, slippage_bps) -> swap result dict
+BatchExecutor = Callable[[float, int], Awaitable[Dict]]
+
+
+class OrderNetter:
+    """
+    Orders with the same key (token, side, route) that arrive within `window`
+    seconds of the first one share a single swap. Each participant gets the
+    swap result with additive fields scaled to their share of the notional.
+    A window of 0 disables netting; without one, SNIPE_NETTING_WINDOW_MS is
+    read on first use.
+    """
+
+    def __init__(self, window: Optional[float] = None, max_orders: int = 50, ledger_size: int = 1000):
+        self._window = window
+        self.max_orders = max_orders
+        self._open: Dict[Hashable, Dict] = {}
+        self._ids = itertools.count(1)
+        self.ledger = deque(maxlen=ledger_size)  # Recent batches with per-user allocations
+        self._executing = set()  # Running _execute tasks
+        self._stats = {"orders": 0, "batches": 0, "netted_orders": 0, "swaps_saved": 0}
+
+    @property
+    def window(self) -> float:
+        # Lazy: the module singleton is built before main() loads .env
+        if self._window is None:
+            self._window = float(os.getenv("SNIPE_NETTING_WINDOW_MS", "0")) / 1000
+        return self._window
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def submit(self, token: str, user_id: int, amount_sol: float, slippage_bps: int,
+                     execute: BatchExecutor, side: str = "buy", route: str = "") -> Dict:
+        """Join (or open) the batch for this token and wait for this user's allocation"""
+        self._stats["orders"] += 1
+        if not self.enabled:
+            return await execute(amount_sol, slippage_bps)
+
+        key = (token, side, route)
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = {
+                "id": next(self._ids), "token": token, "side": side, "orders": [],
+                "execute": execute, "opened": time.monotonic(),
+            }
+            batch["timer"] = asyncio.get_running_loop().call_later(
+                self.window, lambda: self._close(key, batch)
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        batch["orders"].append({"user_id": user_id, "amount": amount_sol,
+                                "slippage_bps": slippage_bps, "future": future})
+        if len(batch["orders"]) >= self.max_orders:
+            batch["timer"].cancel()
+            self._close(key, batch)
+        return await future
+
+    def _close(self, key: Hashable, batch: Dict):
+        if self._open.get(key) is batch:
+            del self._open[key]
+            task = asyncio.ensure_future(self._execute(batch))
+            self._executing.add(task)
+            task.add_done_callback(self._executing.discard)
+
+    async def _execute(self, batch: Dict):
+        orders: List[Dict] = batch["orders"]
+        total = sum(o["amount"] for o in orders)
+        # Tightest slippage in the batch so nobody's limit is exceeded
+        slippage_bps = min(o["slippage_bps"] for o in orders)
+        try:
+            result = await batch["execute"](total, slippage_bps)
+        except Exception as e:
+            logger.error(f"Netted swap {batch['id']} failed: {e}")
+            result = {"success": False, "error": str(e)}
+
+        self._stats["batches"] += 1
+        if len(orders) > 1:
+            self._stats["netted_orders"] += len(orders)
+            self._stats["swaps_saved"] += len(orders) - 1
+
+        allocations = []
+        for order in orders:
+            allocation = self.allocate(result, order["amount"], total)
+            allocation.update({"batch_id": batch["id"], "batch_size": len(orders),
+                               "amount_sol": order["amount"]})
+            allocations.append({"user_id": order["user_id"], "amount_sol": order["amount"],
+                                "share": allocation["share"],
+                                "token_amount": allocation.get("token_amount")})
+            if not order["future"].done():
+                order["future"].set_result(allocation)
+
+        self.ledger.append({
+            "batch_id": batch["id"], "token": batch["token"], "side": batch["side"],
+            "total_sol": total, "success": result.get("success", False),
+            "signature": result.get("signature") or result.get("tx"),
+            "allocations": allocations, "at": time.time()
+        })
+        logger.info(f"Netted {len(orders)} {batch['side']} orders for {batch['token'][:8]} "
+                    f"({total:.3f} SOL) into batch {batch['id']}")
+
+    @staticmethod
+    def allocate(result: Dict, amount: float, total: float) -> Dict:
+        """This order's slice of a batch result"""
+        share = amount / total if total > 0 else 0.0
+        allocation = dict(result)
+        allocation["share"] = share
+        if result.get("success"):
+            for field in ADDITIVE_FIELDS:
+                if field not in result:
+                    continue
+                value = result[field]
+                scaled = float(value) * share
+                if isinstance(value, str):      # Jupiter base-unit strings
+                    allocation[field] = str(int(scaled))
+                elif isinstance(value, int):
+                    allocation[field] = int(scaled)
+                else:
+                    allocation[field] = scaled
+        return allocation
+
+    def batch(self, batch_id: int) -> Optional[Dict]:
+        return next((b for b in reversed(self.ledger) if b["batch_id"] == batch_id), None)
+
+    def stats(self) -> Dict:
+        return {**self._stats, "open_batches": len(self._open), "window_ms": self.window * 1000}
+
+
+order_netter = OrderNetter()
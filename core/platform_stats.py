@@ -0,0 +1,127 @@
+"""
+📊 PLATFORM AGGREGATES
+Running totals, tier counts and time rollups updated on every mutation
+"""
+
+import time
+from typing import Dict, List, Optional
+
+ROLLUP_FIELDS = ("trades", "volume", "profit", "fees")
+
+
+class RollupRing:
+    """Fixed-size ring of time slots; memory and reads never grow with activity"""
+
+    def __init__(self, slot_seconds: int, slots: int):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self._slot_ids = [-1] * slots
+        self._values = [[0.0] * len(ROLLUP_FIELDS) for _ in range(slots)]
+
+    def _current_slot_id(self, now: Optional[float] = None) -> int:
+        return int((now if now is not None else time.time()) // self.slot_seconds)
+
+    def add(self, values: Dict[str, float], now: Optional[float] = None):
+        slot_id = self._current_slot_id(now)
+        i = slot_id % self.slots
+        if self._slot_ids[i] != slot_id:
+            # Slot last held data from a previous lap around the ring
+            self._slot_ids[i] = slot_id
+            self._values[i] = [0.0] * len(ROLLUP_FIELDS)
+        row = self._values[i]
+        for j, field in enumerate(ROLLUP_FIELDS):
+            row[j] += values.get(field, 0.0)
+
+    def series(self, now: Optional[float] = None) -> List[Dict[str, float]]:
+        """Per-slot values, oldest first, covering the whole window"""
+        newest = self._current_slot_id(now)
+        out = []
+        for slot_id in range(newest - self.slots + 1, newest + 1):
+            i = slot_id % self.slots
+            row = self._values[i] if self._slot_ids[i] == slot_id else None
+            out.append({field: (row[j] if row else 0.0) for j, field in enumerate(ROLLUP_FIELDS)})
+        return out
+
+    def total(self, now: Optional[float] = None) -> Dict[str, float]:
+        oldest = self._current_slot_id(now) - self.slots + 1
+        sums = [0.0] * len(ROLLUP_FIELDS)
+        for slot_id, row in zip(self._slot_ids, self._values):
+            if slot_id >= oldest:
+                for j, value in enumerate(row):
+                    sums[j] += value
+        return dict(zip(ROLLUP_FIELDS, sums))
+
+    def snapshot(self) -> Dict:
+        return {"slot_ids": list(self._slot_ids), "values": [list(v) for v in self._values]}
+
+    def restore(self, data: Dict):
+        if len(data.get("slot_ids", [])) == self.slots:
+            self._slot_ids = list(data["slot_ids"])
+            self._values = [list(v) for v in data["values"]]
+
+
+class PlatformAggregates:
+    """O(1) platform stats: totals, tier distribution, minute/hour/day rollups"""
+
+    def __init__(self, tiers=("free", "pro", "whale")):
+        self.totals = {
+            "total_users": 0,
+            "total_trades": 0,
+            "total_volume": 0.0,
+            "total_profit": 0.0,
+            "total_fees": 0.0
+        }
+        self.tier_counts: Dict[str, int] = {tier: 0 for tier in tiers}
+        self.rollups = {
+            "minute": RollupRing(60, 60),        # last hour
+            "hour": RollupRing(3600, 24),        # last day
+            "day": RollupRing(86400, 30),        # last 30 days
+        }
+
+    def load(self, users: Dict[int, Dict]):
+        """Rebuild user and tier counts from the user table (startup only)"""
+        self.totals["total_users"] = len(users)
+        for tier in self.tier_counts:
+            self.tier_counts[tier] = 0
+        for data in users.values():
+            tier = data.get("tier", "free")
+            self.tier_counts[tier] = self.tier_counts.get(tier, 0) + 1
+
+    def on_user_created(self, tier: str = "free"):
+        self.totals["total_users"] += 1
+        self.tier_counts[tier] = self.tier_counts.get(tier, 0) + 1
+
+    def on_tier_change(self, old_tier: str, new_tier: str):
+        if old_tier == new_tier:
+            return
+        self.tier_counts[old_tier] = max(0, self.tier_counts.get(old_tier, 0) - 1)
+        self.tier_counts[new_tier] = self.tier_counts.get(new_tier, 0) + 1
+
+    def on_trade(self, amount: float, profit: float, fee: float, now: Optional[float] = None):
+        self.totals["total_trades"] += 1
+        self.totals["total_volume"] += amount
+        self.totals["total_profit"] += profit
+        self.totals["total_fees"] += fee
+        values = {"trades": 1, "volume": amount, "profit": profit, "fees": fee}
+        for ring in self.rollups.values():
+            ring.add(values, now)
+
+    def window(self, period: str, now: Optional[float] = None) -> Dict[str, float]:
+        """Sums over the last hour ('minute'), day ('hour') or 30 days ('day')"""
+        return self.rollups[period].total(now)
+
+    def snapshot(self) -> Dict:
+        return {
+            "totals": dict(self.totals),
+            "rollups": {name: ring.snapshot() for name, ring in self.rollups.items()}
+        }
+
+    def restore(self, data: Dict):
+        """Restore persisted totals and rollups; user/tier counts come from load()"""
+        totals = data.get("totals", {})
+        for key in ("total_trades", "total_volume", "total_profit", "total_fees"):
+            if key in totals:
+                self.totals[key] = totals[key]
+        for name, ring in self.rollups.items():
+            if name in data.get("rollups", {}):
+                ring.restore(data["rollups"][name])
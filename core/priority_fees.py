@@ -0,0 +1,136 @@
+"""
+⛽ PRIORITY FEE ESTIMATOR
+Rolling getRecentPrioritizationFees samples per account set, served from memory
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from core.http_client import http_client
+
+AccountKey = Tuple[str, ...]
+
+
+def swap_accounts(quote: Dict) -> List[str]:
+    """Writable accounts a Jupiter route touches (its AMM pools and output mint)"""
+    accounts = [step.get("swapInfo", {}).get("ammKey") for step in quote.get("routePlan", [])]
+    accounts.append(quote.get("outputMint"))
+    return [a for a in accounts if a]
+
+
+class PriorityFeeEstimator:
+    """
+    Fees are micro-lamports per compute unit. estimate() never touches the
+    network: it reads the last samples for the accounts and, if those are
+    missing or stale, schedules a background refresh and answers from the
+    network-wide samples meanwhile.
+    """
+
+    def __init__(self, rpc_url: str = "", refresh_interval: float = 5.0, max_age: float = 30.0,
+                 min_fee: int = 1000, max_fee: int = 2_000_000, max_tracked: int = 32):
+        self._rpc_url = rpc_url
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.min_fee = min_fee
+        self.max_fee = max_fee
+        self.max_tracked = max_tracked
+        self.default_fee = 10000
+        # account key -> (sorted fee samples, fetched_at); () is the network-wide set
+        self._samples: "OrderedDict[AccountKey, Tuple[List[int], float]]" = OrderedDict()
+        self._refreshing = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"estimates": 0, "fallbacks": 0, "refreshes": 0, "errors": 0}
+
+    @property
+    def rpc_url(self) -> str:
+        # Resolved on use: the module singleton is built before main() loads .env
+        return self._rpc_url or os.getenv("RPC_URL", "")
+
+    @staticmethod
+    def _key(accounts: Optional[Iterable[str]]) -> AccountKey:
+        return tuple(sorted(set(accounts or ())))[:128]  # RPC accepts at most 128 accounts
+
+    def estimate(self, accounts: Optional[Iterable[str]] = None, probability: float = 0.75) -> int:
+        """Fee at the `probability` percentile of recent slots for these accounts"""
+        self._stats["estimates"] += 1
+        key = self._key(accounts)
+        self._ensure_started()
+
+        entry = self._samples.get(key)
+        if entry is not None:
+            self._samples.move_to_end(key)
+        if entry is None or time.monotonic() - entry[1] > self.max_age:
+            self._schedule(key)
+            self._stats["fallbacks"] += 1
+            entry = entry or self._samples.get(())
+        if not entry or not entry[0]:
+            return self.default_fee
+        return max(self.min_fee, min(self.max_fee, self._percentile(entry[0], probability)))
+
+    @staticmethod
+    def _percentile(fees: List[int], probability: float) -> int:
+        return fees[min(len(fees) - 1, int(len(fees) * probability))] if fees else 0
+
+    def _schedule(self, key: AccountKey):
+        if key in self._refreshing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refreshing.add(key)
+        task = loop.create_task(self.refresh(key))
+        task.add_done_callback(lambda _: self._refreshing.discard(key))
+
+    async def refresh(self, key: AccountKey = ()):
+        try:
+            params = [list(key)] if key else []
+            async with http_client.post(self.rpc_url, json={
+                "jsonrpc": "2.0", "id": 1, "method": "getRecentPrioritizationFees", "params": params
+            }) as resp:
+                data = await resp.json()
+            fees = sorted(int(s["prioritizationFee"]) for s in data.get("result") or [])
+            self._samples[key] = (fees, time.monotonic())
+            self._samples.move_to_end(key)
+            while len(self._samples) > self.max_tracked:
+                oldest = next(iter(self._samples))
+                if oldest == ():
+                    self._samples.move_to_end(oldest)
+                    continue
+                del self._samples[oldest]
+            self._stats["refreshes"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Priority fee refresh failed: {e}")
+
+    async def _refresh_loop(self):
+        while True:
+            # Keep the network-wide and recently used account sets warm
+            await asyncio.gather(*(self.refresh(key) for key in {(), *self._samples}))
+            await asyncio.sleep(self.refresh_interval)
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+            except RuntimeError:
+                pass
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict:
+        network = self._samples.get((), ([], 0))[0]
+        return {**self._stats, "tracked": len(self._samples),
+                "network_p50": self._percentile(network, 0.5),
+                "network_p90": self._percentile(network, 0.9)}
+
+
+fee_estimator = PriorityFeeEstimator()
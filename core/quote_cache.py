@@ -0,0 +1,123 @@
+"""
+💱 JUPITER QUOTE CACHE
+Short-TTL LRU cache with request coalescing for identical quotes
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+from core.http_client import http_client
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+JUPITER_QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
+
+
+class QuoteCache:
+    """Shares Jupiter quotes between callers asking for the same route"""
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 2048, bucket_digits: int = 3):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bucket_digits = bucket_digits
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "errors": 0}
+
+    def bucket(self, amount: int) -> int:
+        """Round an amount to a few significant digits so near-identical sizes share a key"""
+        amount = int(amount)
+        if amount <= 0:
+            return amount
+        drop = max(0, len(str(amount)) - self.bucket_digits)
+        step = 10 ** drop
+        return max(step, round(amount / step) * step)
+
+    async def get_quote(self, input_mint: str, output_mint: str, amount: int,
+                        slippage_bps: int, exact: bool = False) -> Optional[Dict]:
+        """
+        Get a quote, served from cache when fresh.
+        Valuation callers leave exact=False so amounts are bucketed and the
+        result is scaled back to the requested size; swap paths pass exact=True.
+        """
+        amount = int(amount)
+        key_amount = amount if exact else self.bucket(amount)
+        key = (input_mint, output_mint, key_amount, int(slippage_bps))
+
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self.scale(entry[1], key_amount, amount)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            future = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller giving up does not cancel the fetch for the others
+        quote = await asyncio.shield(future)
+        return self.scale(quote, key_amount, amount)
+
+    async def _fetch(self, key: Tuple) -> Optional[Dict]:
+        input_mint, output_mint, amount, slippage_bps = key
+        params = {
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "amount": str(amount),
+            "slippageBps": str(slippage_bps)
+        }
+        try:
+            async with http_client.get(JUPITER_QUOTE_URL, params=params) as resp:
+                if resp.status != 200:
+                    return None
+                quote = await resp.json()
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Jupiter quote error: {e}")
+            return None
+
+        if "outAmount" in quote:
+            self._store(key, quote)
+        return quote
+
+    def _store(self, key: Tuple, quote: Dict):
+        self._entries[key] = (time.monotonic() + self.ttl, quote)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def scale(quote: Optional[Dict], quoted_amount: int, amount: int) -> Optional[Dict]:
+        """Scale a bucketed quote linearly back to the caller's amount"""
+        if not quote or quoted_amount == amount or quoted_amount <= 0:
+            return quote
+        ratio = amount / quoted_amount
+        scaled = dict(quote)
+        scaled["inAmount"] = str(amount)
+        for field in ("outAmount", "otherAmountThreshold"):
+            if field in quote:
+                scaled[field] = str(int(int(quote[field]) * ratio))
+        return scaled
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_rate": (self._stats["hits"] + self._stats["coalesced"]) / lookups if lookups else 0.0
+        }
+
+
+quote_cache = QuoteCache()
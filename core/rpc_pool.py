@@ -0,0 +1,165 @@
+"""
+🛰️ RPC ENDPOINT POOL
+Health-scored Solana RPC endpoints: reads go to the fastest, sends race the top N
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+def rpc_urls_from_env(primary: str = "") -> List[str]:
+    """RPC_URL plus any extra comma-separated endpoints in RPC_URLS, de-duplicated"""
+    urls = []
+    for url in [*primary.split(","), *os.getenv("RPC_URLS", "").split(",")]:
+        url = url.strip()
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _default_client(url: str, commitment: str):
+    from solana.rpc.async_api import AsyncClient
+    return AsyncClient(url, commitment=commitment)
+
+
+def _consume_result(task: asyncio.Task):
+    """Mark a losing send's outcome as retrieved so asyncio does not log it"""
+    if not task.cancelled():
+        task.exception()
+
+
+class RpcEndpoint:
+    """One provider with exponentially-weighted latency and error rate"""
+
+    def __init__(self, url: str, client, alpha: float = 0.2):
+        self.url = url
+        self.client = client
+        self.alpha = alpha
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def score(self) -> float:
+        """Lower is better; unmeasured endpoints sort first so they get probed"""
+        if self.calls == 0:
+            return 0.0
+        latency = self.latency_ms if self.latency_ms is not None else 1000.0  # Never succeeded
+        return (latency + 25 * self.in_flight) * (1 + 20 * self.error_rate)
+
+    def record(self, ms: float, ok: bool):
+        self.calls += 1
+        if ok:
+            self.latency_ms = ms if self.latency_ms is None else \
+                (1 - self.alpha) * self.latency_ms + self.alpha * ms
+        else:
+            self.errors += 1
+        self.error_rate = (1 - self.alpha) * self.error_rate + self.alpha * (0.0 if ok else 1.0)
+
+    def summary(self) -> Dict:
+        return {"url": self.url.split("?")[0], "latency_ms": self.latency_ms,
+                "error_rate": round(self.error_rate, 3), "calls": self.calls, "errors": self.errors}
+
+
+class RpcPool:
+    """
+    Drop-in for a single AsyncClient: any client method called on the pool is
+    routed to the healthiest endpoint, failing over to the next on error.
+    """
+
+    def __init__(self, urls: List[str], commitment: str = "processed", send_fanout: int = 2,
+                 health_interval: float = 10.0,
+                 client_factory: Callable = _default_client):
+        if not urls:
+            raise ValueError("RpcPool needs at least one RPC URL")
+        self.endpoints = [RpcEndpoint(url, client_factory(url, commitment)) for url in urls]
+        self.send_fanout = send_fanout
+        self.health_interval = health_interval
+        self._health_task: Optional[asyncio.Task] = None
+
+    def ranked(self) -> List[RpcEndpoint]:
+        return sorted(self.endpoints, key=lambda e: e.score)
+
+    async def _call(self, endpoint: RpcEndpoint, method: str, *args, **kwargs):
+        start = time.perf_counter()
+        endpoint.in_flight += 1
+        try:
+            result = await getattr(endpoint.client, method)(*args, **kwargs)
+        except Exception:
+            endpoint.record((time.perf_counter() - start) * 1000, ok=False)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.record((time.perf_counter() - start) * 1000, ok=True)
+        return result
+
+    async def call(self, method: str, *args, **kwargs):
+        """Read call on the best endpoint, failing over in score order"""
+        self.start()
+        last_error = None
+        for endpoint in self.ranked():
+            try:
+                return await self._call(endpoint, method, *args, **kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"RPC {method} failed on {endpoint.url.split('?')[0]}: {e}")
+        raise last_error
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def routed(*args, **kwargs):
+            return await self.call(method, *args, **kwargs)
+        return routed
+
+    async def send_transaction(self, *args, **kwargs):
+        """Broadcast to the top `send_fanout` endpoints; first acceptance wins"""
+        return await self._race("send_transaction", *args, **kwargs)
+
+    async def send_raw_transaction(self, *args, **kwargs):
+        return await self._race("send_raw_transaction", *args, **kwargs)
+
+    async def _race(self, method: str, *args, **kwargs):
+        self.start()
+        targets = self.ranked()[:max(1, self.send_fanout)]
+        pending = {asyncio.ensure_future(self._call(e, method, *args, **kwargs)) for e in targets}
+        last_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    # Slower sends keep running: extra copies only help propagation
+                    for other in pending:
+                        other.add_done_callback(_consume_result)
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            # Probe every endpoint so idle or recovering ones keep a live score
+            probes = [self._call(e, "get_slot") for e in self.endpoints]
+            await asyncio.gather(*probes, return_exceptions=True)
+
+    def start(self):
+        if self.health_interval and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
+
+    def stats(self) -> List[Dict]:
+        return [e.summary() for e in self.ranked()]
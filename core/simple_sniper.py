@@ -1,8 +1,10 @@
 """Lightweight sniper without solders (for emergency deploy)"""
-import aiohttp
 import base64
 from typing import Dict
 from loguru import logger
+from core.http_client import http_client
+from core.quote_cache import quote_cache, SOL_MINT
+from core.tracing import tracer
 
 class SimpleSniper:
     """Fallback sniper using direct RPC calls"""
@@ -16,19 +18,18 @@ class SimpleSniper:
     async def get_wallet_balance(self) -> float:
         """Get balance via Helius API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.rpc_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "getBalance",
-                        "params": ["FctWuo6HVMywsXSByra2gFYnpeD8SYtmmfnTV8P1tgyb"]
-                    }
-                ) as resp:
-                    data = await resp.json()
-                    lamports = data['result']['value']
-                    return lamports / 1e9
+            async with http_client.post(
+                self.rpc_url,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "getBalance",
+                    "params": ["FctWuo6HVMywsXSByra2gFYnpeD8SYtmmfnTV8P1tgyb"]
+                }
+            ) as resp:
+                data = await resp.json()
+                lamports = data['result']['value']
+                return lamports / 1e9
         except Exception as e:
             logger.error(f"Balance error: {e}")
             return 0.1  # Fallback for testing
@@ -36,24 +37,26 @@ class SimpleSniper:
     async def snipe_token(self, token_address: str, amount_sol: float, 
                          slippage_bps: int, user_id: int) -> Dict:
         """Execute trade via Jupiter API"""
+        with tracer.span("simple_snipe.total"):
+            return await self._snipe(token_address, amount_sol, slippage_bps)
+    
+    async def _snipe(self, token_address: str, amount_sol: float, slippage_bps: int) -> Dict:
         try:
             # Get quote
-            quote_url = f"https://quote-api.jup.ag/v6/quote?inputMint=So11111111111111111111111111111111111111112&outputMint={token_address}&amount={int(amount_sol*1e9)}&slippageBps={slippage_bps}"
+            with tracer.span("simple_snipe.quote"):
+                quote = await quote_cache.get_quote(
+                    SOL_MINT, token_address, int(amount_sol * 1e9), slippage_bps, exact=True
+                )
+            if not quote:
+                return {'success': False, 'error': 'No route found'}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(quote_url) as resp:
-                    if resp.status != 200:
-                        return {'success': False, 'error': 'No route found'}
-                    
-                    quote = await resp.json()
-                    
-                    # Simulate success for now (full implementation on Render)
-                    return {
-                        'success': True,
-                        'signature': 'SIMULATED_TX_' + token_address[:8],
-                        'entry_price': float(quote.get('outAmount', 0)) / 1e6 / amount_sol if amount_sol > 0 else 0,
-                        'token_amount': float(quote.get('outAmount', 0)) / 1e6
-                    }
+            # Simulate success for now (full implementation on Render)
+            return {
+                'success': True,
+                'signature': 'SIMULATED_TX_' + token_address[:8],
+                'entry_price': float(quote.get('outAmount', 0)) / 1e6 / amount_sol if amount_sol > 0 else 0,
+                'token_amount': float(quote.get('outAmount', 0)) / 1e6
+            }
                     
         except Exception as e:
             logger.error(f"Snipe error: {e}")
@@ -62,13 +65,9 @@ class SimpleSniper:
     async def get_token_value(self, token_address: str, amount: float) -> float:
         """Get token value in SOL"""
         try:
-            quote_url = f"https://quote-api.jup.ag/v6/quote?inputMint={token_address}&outputMint=So11111111111111111111111111111111111111112&amount={int(amount*1e6)}&slippageBps=100"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(quote_url) as resp:
-                    if resp.status == 200:
-                        quote = await resp.json()
-                        return float(quote.get('outAmount', 0)) / 1e9
+            quote = await quote_cache.get_quote(token_address, SOL_MINT, int(amount * 1e6), 100)
+            if quote:
+                return float(quote.get('outAmount', 0)) / 1e9
         except:
             pass
         return 0.0
@@ -0,0 +1,150 @@
+"""
+🐋 SMART MONEY FEED
+Background ingestion of whale wallet activity into bounded in-memory buffers
+"""
+
+import os
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional
+
+from loguru import logger
+from core.concurrency import bounded_gather
+from core.http_client import http_client
+from core.wallet_scheduler import PollScheduler
+
+HELIUS_TX_URL = "https://api.helius.xyz/v0/addresses/{wallet}/transactions"
+
+
+def parse_moves(wallet: str, tx: Dict) -> List[Dict]:
+    """Token transfers in one Helius enhanced transaction, seen from `wallet`"""
+    moves = []
+    timestamp = tx.get('timestamp', 0)
+    for transfer in tx.get('tokenTransfers') or []:
+        if wallet not in (transfer.get('toUserAccount'), transfer.get('fromUserAccount')):
+            continue
+        moves.append({
+            'wallet': wallet,
+            'token': transfer.get('mint', ''),
+            'amount': transfer.get('tokenAmount', 0),
+            'type': 'BUY' if transfer.get('toUserAccount') == wallet else 'SELL',
+            'time': datetime.fromtimestamp(timestamp).strftime('%H:%M'),
+            'timestamp': timestamp,
+            'signature': tx.get('signature', '')
+        })
+    return moves
+
+
+class SmartMoneyFeed:
+    """
+    Polls each wallet with a since-signature cursor (Helius `until`) and accepts
+    pushed webhook batches; readers only ever touch memory. Polls are spread
+    over the HELIUS_POLL_RPS budget, hot wallets first.
+    """
+
+    def __init__(self, api_key: str, wallets: Iterable[str], per_wallet: int = 50,
+                 recent_size: int = 200, concurrency: int = 4,
+                 rate: Optional[float] = None):
+        if rate is None:
+            rate = float(os.getenv("HELIUS_POLL_RPS", "10"))
+        self.api_key = api_key
+        self.per_wallet = per_wallet
+        self.concurrency = concurrency
+        self.scheduler = PollScheduler(self.poll_wallet, rate=rate)
+        self._buffers: Dict[str, Deque[Dict]] = {}
+        self._cursors: Dict[str, Optional[str]] = {}
+        self._recent: Deque[Dict] = deque(maxlen=recent_size)  # Newest last, all wallets
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()  # (wallet, signature) ingested
+        self._stats = {"polls": 0, "poll_errors": 0, "pushed": 0, "transactions": 0, "moves": 0}
+        for wallet in wallets:
+            self.add_wallet(wallet)
+
+    def add_wallet(self, wallet: str):
+        if wallet not in self._buffers:
+            self._buffers[wallet] = deque(maxlen=self.per_wallet)
+            self._cursors[wallet] = None
+            self.scheduler.add(wallet)
+
+    def remove_wallet(self, wallet: str):
+        self._buffers.pop(wallet, None)
+        self._cursors.pop(wallet, None)
+        self.scheduler.remove(wallet)
+
+    @property
+    def wallets(self) -> List[str]:
+        return list(self._buffers)
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        """Newest moves across all wallets"""
+        return sorted(self._recent, key=lambda m: m['timestamp'], reverse=True)[:limit]
+
+    def wallet_moves(self, wallet: str, limit: int = 10) -> List[Dict]:
+        return list(self._buffers.get(wallet, ()))[-limit:][::-1]
+
+    def ingest(self, wallet: str, transactions: List[Dict]) -> int:
+        """Store parsed moves from transactions (oldest first), skipping known signatures"""
+        added = 0
+        for tx in transactions:
+            signature = tx.get('signature')
+            if signature:
+                if (wallet, signature) in self._seen:
+                    continue
+                self._seen[(wallet, signature)] = None
+                if len(self._seen) > 50000:
+                    self._seen.popitem(last=False)
+            self._stats["transactions"] += 1
+            for move in parse_moves(wallet, tx):
+                self._buffers[wallet].append(move)
+                self._recent.append(move)
+                added += 1
+        self._stats["moves"] += added
+        return added
+
+    def ingest_webhook(self, transactions: List[Dict]) -> int:
+        """Helius enhanced-transaction webhook payload: route each tx to tracked wallets"""
+        added = 0
+        self._stats["pushed"] += len(transactions)
+        for tx in transactions:
+            involved = {tx.get('feePayer')}
+            for transfer in tx.get('tokenTransfers') or []:
+                involved.add(transfer.get('toUserAccount'))
+                involved.add(transfer.get('fromUserAccount'))
+            for wallet in involved:
+                if wallet in self._buffers:
+                    # Polling may fetch the same tx later; the seen-signature set drops it
+                    added += self.ingest(wallet, [tx])
+                    self.scheduler.mark_active(wallet)
+        return added
+
+    async def poll_wallet(self, wallet: str) -> int:
+        params = {"api-key": self.api_key, "limit": "100" if self._cursors.get(wallet) else "5"}
+        if self._cursors.get(wallet):
+            params["until"] = self._cursors[wallet]
+        async with http_client.get(HELIUS_TX_URL.format(wallet=wallet), params=params) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            transactions = await resp.json()
+        self._stats["polls"] += 1
+        if not transactions:
+            return 0
+        # Helius returns newest first
+        self._cursors[wallet] = transactions[0].get('signature', self._cursors.get(wallet))
+        return self.ingest(wallet, list(reversed(transactions)))
+
+    async def poll_all(self) -> Dict:
+        """Poll every wallet once right now (manual refresh; the scheduler handles steady state)"""
+        jobs = {wallet: (lambda w=wallet: self.poll_wallet(w)) for wallet in self._buffers}
+        outcome = await bounded_gather(jobs, limit=self.concurrency)
+        for wallet, error in outcome["errors"].items():
+            self._stats["poll_errors"] += 1
+            logger.warning(f"Smart money poll failed for {wallet[:8]}: {error}")
+        return outcome
+
+    def start(self):
+        self.scheduler.start()
+
+    async def stop(self):
+        await self.scheduler.stop()
+
+    def stats(self) -> Dict:
+        return {**self._stats, "buffered": len(self._recent), "scheduler": self.scheduler.stats()}
@@ -1,18 +1,33 @@
 """Solana sniper engine"""
 import asyncio
 import base64
+import os
 from typing import Dict, Optional
-from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.instruction import Instruction
 from solders.compute_budget import set_compute_unit_price
+from solders.system_program import TransferParams, transfer
 from loguru import logger
+from core.http_client import http_client
+from core.quote_cache import quote_cache
+from core.tracing import tracer
+from core.confirmations import ConfirmationTracker
+from core.blockhash import BlockhashProvider
+from core.rpc_pool import RpcPool, rpc_urls_from_env
+from core.mev_bundle import MEVBundler
+from core.priority_fees import fee_estimator, swap_accounts
+from core.order_netting import order_netter
 
 class SolanaSniper:
     def __init__(self, rpc_url: str, wallet_key: str, encryption_key: str):
-        self.client = AsyncClient(rpc_url, commitment="processed")
+        # rpc_url may list several endpoints; RPC_URLS adds more
+        self.client = RpcPool(rpc_urls_from_env(rpc_url), commitment="processed")
+        self.confirmations = ConfirmationTracker(self.client)
+        self.blockhashes = BlockhashProvider(self.client)
+        self.bundler = MEVBundler(os.getenv("JITO_API_KEY", ""), block_height=self.blockhashes.get_block_height)
+        self.rebroadcast_interval = 2.0  # Resend the signed tx this often until it lands or expires
         self.wallet = Keypair.from_base58_string(wallet_key)
         self.wallet_address = str(self.wallet.pubkey())
         
@@ -27,40 +42,59 @@ class SolanaSniper:
             return 0.0
     
     async def snipe_token(self, token_address: str, amount_sol: float, 
-                         slippage_bps: int, user_id: int) -> Dict:
+                         slippage_bps: int, user_id: int, mev_boost: bool = False) -> Dict:
         """
-        Execute snipe with Jupiter/Raydium integration
+        Execute snipe with Jupiter/Raydium integration.
+        mev_boost (Pro/Whale) routes the signed swap through a Jito bundle.
         """
+        with tracer.span("snipe.total"):
+            if order_netter.enabled:
+                # Concurrent snipes of this mint share one swap; each user gets a pro-rata fill
+                return await order_netter.submit(
+                    token_address, user_id, amount_sol, slippage_bps,
+                    lambda total, slippage: self._snipe(token_address, total, slippage, mev_boost),
+                    route="jito" if mev_boost else ""
+                )
+            return await self._snipe(token_address, amount_sol, slippage_bps, mev_boost)
+    
+    async def _snipe(self, token_address: str, amount_sol: float, slippage_bps: int,
+                     mev_boost: bool = False) -> Dict:
         try:
             # Get quote from Jupiter
-            quote = await self._get_jupiter_quote(
-                input_mint="So11111111111111111111111111111111111111112",  # SOL
-                output_mint=token_address,
-                amount=int(amount_sol * 1e9),
-                slippage_bps=slippage_bps
-            )
+            with tracer.span("snipe.quote"):
+                quote = await self._get_jupiter_quote(
+                    input_mint="So11111111111111111111111111111111111111112",  # SOL
+                    output_mint=token_address,
+                    amount=int(amount_sol * 1e9),
+                    slippage_bps=slippage_bps
+                )
             
             if not quote:
                 return {'success': False, 'error': 'No route found'}
             
             # Get swap transaction
-            swap_tx = await self._get_jupiter_swap(quote)
+            with tracer.span("snipe.swap_build"):
+                swap_tx = await self._get_jupiter_swap(quote)
             if not swap_tx:
                 return {'success': False, 'error': 'Swap construction failed'}
             
-            # Add priority fee for fast execution
-            priority_fee = 10000  # 0.00001 SOL
-            modified_tx = self._add_priority_fee(swap_tx, priority_fee)
+            # Add priority fee for fast execution (from cached recent fees, no RPC here)
+            with tracer.span("snipe.priority_fee"):
+                priority_fee = fee_estimator.estimate(swap_accounts(quote))
+                modified_tx = self._add_priority_fee(swap_tx, priority_fee)
             
             # Sign and send
-            result = await self._send_transaction(modified_tx)
+            if mev_boost:
+                result = await self._send_bundled(modified_tx)
+            else:
+                result = await self._send_transaction(modified_tx)
             
             if result['success']:
                 return {
                     'success': True,
                     'signature': result['signature'],
                     'entry_price': quote.get('price', 0),
-                    'token_amount': quote.get('outAmount', 0) / 1e6  # Assuming 6 decimals
+                    'token_amount': int(quote.get('outAmount', 0)) / 1e6  # Assuming 6 decimals
                 }
             else:
                 return {'success': False, 'error': result['error']}
@@ -70,15 +104,10 @@ class SolanaSniper:
             return {'success': False, 'error': str(e)}
     
     async def _get_jupiter_quote(self, input_mint: str, output_mint: str, 
-                                 amount: int, slippage_bps: int) -> Optional[Dict]:
-        """Get quote from Jupiter API"""
+                                 amount: int, slippage_bps: int, exact: bool = True) -> Optional[Dict]:
+        """Get quote from Jupiter API (shared cache, coalesced)"""
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                url = f"https://quote-api.jup.ag/v6/quote?inputMint={input_mint}&outputMint={output_mint}&amount={amount}&slippageBps={slippage_bps}"
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
+            return await quote_cache.get_quote(input_mint, output_mint, amount, slippage_bps, exact=exact)
         except Exception as e:
             logger.error(f"Jupiter quote error: {e}")
         return None
@@ -86,20 +115,18 @@ class SolanaSniper:
     async def _get_jupiter_swap(self, quote: Dict) -> Optional[Transaction]:
         """Get swap transaction from Jupiter"""
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://quote-api.jup.ag/v6/swap",
-                    json={
-                        "quoteResponse": quote,
-                        "userPublicKey": self.wallet_address,
-                        "wrapAndUnwrapSol": True
-                    }
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        tx_data = base64.b64decode(data['swapTransaction'])
-                        return Transaction.deserialize(tx_data)
+            async with http_client.post(
+                "https://quote-api.jup.ag/v6/swap",
+                json={
+                    "quoteResponse": quote,
+                    "userPublicKey": self.wallet_address,
+                    "wrapAndUnwrapSol": True
+                }
+            ) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    tx_data = base64.b64decode(data['swapTransaction'])
+                    return Transaction.deserialize(tx_data)
         except Exception as e:
             logger.error(f"Jupiter swap error: {e}")
         return None
@@ -111,39 +138,118 @@ class SolanaSniper:
         return tx
     
     async def _send_transaction(self, tx: Transaction) -> Dict:
-        """Send with retry logic"""
-        max_retries = 3
-        for attempt in range(max_retries):
+        """
+        Sign once, then rebroadcast that same signed transaction until it
+        confirms or its blockhash expires. Only an expired transaction is
+        re-signed, so two copies of one swap can never both land.
+        """
+        max_signings = 3
+        for attempt in range(max_signings):
             try:
-                # Get fresh blockhash
-                blockhash = await self.client.get_latest_blockhash()
+                # Recent blockhash from the background cache (RPC only if stale)
+                with tracer.span("snipe.blockhash"):
+                    blockhash, last_valid_block_height = await self.blockhashes.get()
                 
                 # Sign
-                tx.sign(self.wallet, blockhash.value.blockhash)
-                
-                # Send with skip preflight for speed
-                result = await self.client.send_transaction(
-                    tx,
-                    opts={"skip_preflight": True, "max_retries": 1}
-                )
-                
-                # Wait for confirmation
-                await asyncio.sleep(2)
-                status = await self.client.get_signature_statuses([result.value])
-                
-                if status.value[0] and status.value[0].confirmation_status:
-                    return {
-                        'success': True,
-                        'signature': str(result.value),
-                        'status': str(status.value[0].confirmation_status)
-                    }
-                    
+                with tracer.span("snipe.sign"):
+                    tx.sign(self.wallet, blockhash)
+                    raw = tx.serialize()
+                    signature = tx.signature()
             except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
+                logger.warning(f"Attempt {attempt + 1} failed to sign: {e}")
                 await asyncio.sleep(1)
+                continue
+            
+            status = await self._broadcast_until_expired(raw, signature, last_valid_block_height)
+            if status is None:
+                logger.warning(f"Attempt {attempt + 1}: {signature} expired unconfirmed, re-signing")
+                continue
+            if status['err'] is not None:
+                return {'success': False, 'error': f"Transaction failed: {status['err']}"}
+            return {
+                'success': True,
+                'signature': str(signature),
+                'status': status['status']
+            }
         
         return {'success': False, 'error': 'Max retries exceeded'}
     
+    async def _broadcast_until_expired(self, raw: bytes, signature,
+                                       last_valid_block_height: int) -> Optional[Dict]:
+        """
+        Resend `raw` every rebroadcast_interval until it confirms (status dict)
+        or the block height passes last_valid_block_height (None).
+        """
+        while True:
+            # Skip preflight for speed; we do the retrying ourselves
+            try:
+                with tracer.span("snipe.send"):
+                    await self.client.send_raw_transaction(
+                        raw,
+                        opts={"skip_preflight": True, "max_retries": 0}
+                    )
+            except Exception as e:
+                logger.warning(f"Broadcast of {signature} failed: {e}")
+            
+            # Wait for confirmation (batched with every other in-flight trade)
+            with tracer.span("snipe.confirm"):
+                status = await self.confirmations.wait(
+                    signature, commitment="confirmed", timeout=self.rebroadcast_interval
+                )
+            if status is not None:
+                return status
+            
+            try:
+                height = await self.blockhashes.get_block_height()
+            except Exception as e:
+                logger.warning(f"Block height check failed: {e}")
+                height = self.blockhashes.estimated_block_height()
+            if height is not None and height > last_valid_block_height:
+                # Can no longer land; one last look in case it did just before expiring
+                return await self.confirmations.wait(
+                    signature, commitment="confirmed", timeout=self.rebroadcast_interval
+                )
+    
+    def _with_tip(self, tx: Transaction, tip_lamports: int, tip_account: str) -> Transaction:
+        """Copy of `tx` with a Jito tip transfer appended (none if tip_lamports is 0)"""
+        tipped = Transaction(fee_payer=self.wallet.pubkey(), instructions=list(tx.instructions))
+        if tip_lamports > 0:
+            tipped.add(transfer(TransferParams(
+                from_pubkey=self.wallet.pubkey(),
+                to_pubkey=Pubkey.from_string(tip_account),
+                lamports=tip_lamports
+            )))
+        return tipped
+    
+    async def _send_bundled(self, tx: Transaction) -> Dict:
+        """Hand the swap to the Jito bundler; it batches, tips and resubmits"""
+        try:
+            # Only called for a new version once the previous one failed or expired
+            async def build(tip_lamports: int, tip_account: str):
+                with tracer.span("snipe.blockhash"):
+                    blockhash, last_valid_block_height = await self.blockhashes.get()
+                with tracer.span("snipe.sign"):
+                    signed = self._with_tip(tx, tip_lamports, tip_account)
+                    signed.sign(self.wallet, blockhash)
+                return (base64.b64encode(signed.serialize()).decode(), str(signed.signature()),
+                        last_valid_block_height)
+            
+            with tracer.span("snipe.bundle"):
+                result = await self.bundler.submit(build)
+        except Exception as e:
+            logger.error(f"Bundled send failed: {e}")
+            return {'success': False, 'error': str(e)}
+        
+        if not result['success']:
+            return {'success': False, 'error': result['error']}
+        return {
+            'success': True,
+            'signature': result['signature'],
+            'status': 'landed',
+            'bundle_id': result['bundle_id'],
+            'tip': result['tip']
+        }
+    
     async def get_token_value(self, token_address: str, amount: float) -> float:
         """Get current value of token holdings in SOL"""
         try:
@@ -151,10 +257,11 @@ class SolanaSniper:
                 input_mint=token_address,
                 output_mint="So11111111111111111111111111111111111111112",
                 amount=int(amount * 1e6),
-                slippage_bps=100
+                slippage_bps=100,
+                exact=False
             )
             if quote:
-                return quote.get('outAmount', 0) / 1e9
+                return int(quote.get('outAmount', 0)) / 1e9
         except Exception as e:
             logger.error(f"Value check error: {e}")
         return 0.0
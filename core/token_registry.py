@@ -0,0 +1,172 @@
+"""
+📇 JUPITER TOKEN REGISTRY
+Background-refreshed token list, stored as fixed-width records and memory-mapped
+"""
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from loguru import logger
+from core.http_client import http_client
+
+JUPITER_TOKEN_LIST_URL = "https://token.jup.ag/all"
+
+# Header: magic, record count, fetched-at unix time
+HEADER = struct.Struct("<8sId")
+MAGIC = b"MEXTOK01"
+# Record: address, symbol, decimals, daily volume (USD)
+RECORD = struct.Struct("<44s16sBd")
+
+
+class TokenRegistry:
+    """O(1) address -> metadata lookups without touching the network"""
+
+    def __init__(self, path: Optional[str] = None, refresh_interval: float = 3600):
+        self.path = path or os.getenv("TOKEN_REGISTRY_PATH", "data/jupiter_tokens.bin")
+        self.refresh_interval = refresh_interval
+        self.fetched_at = 0.0
+        self._index: Dict[str, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Future] = None  # Download shared by concurrent callers
+        self._attempted_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def load(self) -> bool:
+        """Map the on-disk registry and rebuild the address index"""
+        if not os.path.exists(self.path):
+            return False
+        f = open(self.path, "rb")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, fetched_at = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or len(mapped) < HEADER.size + count * RECORD.size:
+                mapped.close()
+                raise ValueError("corrupt token registry")
+
+            index = {}
+            for i in range(count):
+                offset = HEADER.size + i * RECORD.size
+                address = mapped[offset:offset + 44].rstrip(b"\0").decode()
+                index[address] = offset
+        except Exception as e:
+            f.close()
+            logger.error(f"Token registry load failed: {e}")
+            return False
+
+        old_map, old_file = self._mmap, self._file
+        self._mmap, self._file, self._index, self.fetched_at = mapped, f, index, fetched_at
+        if old_map:
+            old_map.close()
+            old_file.close()
+        logger.info(f"Token registry loaded: {count} tokens")
+        return True
+
+    def lookup(self, address: str) -> Optional[Dict]:
+        offset = self._index.get(address)
+        if offset is None:
+            return None
+        raw_address, symbol, decimals, daily_volume = RECORD.unpack_from(self._mmap, offset)
+        return {
+            "address": address,
+            "symbol": symbol.rstrip(b"\0").decode(errors="ignore"),
+            "decimals": decimals,
+            "dailyVolume": daily_volume
+        }
+
+    def _write(self, tokens) -> int:
+        """Serialize the token list atomically next to the live file"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        count = 0
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0, 0.0))
+            for token in tokens:
+                address = (token.get("address") or "").encode()
+                if not address or len(address) > 44:
+                    continue
+                f.write(RECORD.pack(
+                    address,
+                    (token.get("symbol") or "").encode()[:16],
+                    int(token.get("decimals") or 0) & 0xFF,
+                    float(token.get("daily_volume") or token.get("dailyVolume") or 0)
+                ))
+                count += 1
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, count, time.time()))
+        os.replace(tmp_path, self.path)
+        return count
+
+    async def refresh(self) -> bool:
+        """Download the full list once and swap it in"""
+        async with self._lock:
+            try:
+                async with http_client.get(
+                    JUPITER_TOKEN_LIST_URL,
+                    timeout=aiohttp.ClientTimeout(total=120)
+                ) as resp:
+                    if resp.status != 200:
+                        logger.warning(f"Token list refresh failed: HTTP {resp.status}")
+                        return False
+                    tokens = await resp.json()
+                count = await asyncio.to_thread(self._write, tokens)
+                logger.info(f"Token list refreshed: {count} tokens")
+            except Exception as e:
+                logger.error(f"Token list refresh error: {e}")
+                return False
+            return self.load()
+
+    def _refresh_once(self) -> asyncio.Future:
+        if self._pending is None or self._pending.done():
+            self._attempted_at = time.time()
+            self._pending = asyncio.ensure_future(self.refresh())
+        return self._pending
+
+    async def ensure_loaded(self) -> bool:
+        """
+        Use the disk copy if present and download only when there is none. A
+        copy older than refresh_interval is still served while a background
+        refresh replaces it (unless start() already keeps it fresh).
+        """
+        if self.loaded or self.load():
+            now = time.time()
+            if (now - self.fetched_at > self.refresh_interval and now - self._attempted_at > 60
+                    and (self._task is None or self._task.done())):
+                self._refresh_once()
+            return True
+        # Concurrent first callers share a single download
+        return await asyncio.shield(self._refresh_once())
+
+    async def _refresh_loop(self):
+        while True:
+            age = time.time() - self.fetched_at
+            await asyncio.sleep(max(0.0, self.refresh_interval - age))
+            if not await self.refresh():
+                await asyncio.sleep(60)  # Keep serving the last good copy, retry later
+
+    def start(self):
+        """Load from disk and keep refreshing in the background"""
+        self.load()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+token_registry = TokenRegistry()
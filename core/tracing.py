@@ -0,0 +1,114 @@
+"""
+⏱️ LATENCY TRACING
+Lightweight spans with in-process latency histograms per stage
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; constant memory per stage"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float, error: bool = False):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile"""
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms
+        }
+
+
+class Tracer:
+    """Records how long each named stage takes"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, stage: str, ms: float, error: bool = False):
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = LatencyHistogram()
+        hist.observe(ms, error)
+
+    @contextmanager
+    def span(self, stage: str):
+        """`with tracer.span("snipe.quote"):` -- works around sync and async code alike"""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000, error)
+
+    def summary(self, prefix: str = "") -> Dict[str, Dict]:
+        return {stage: hist.summary() for stage, hist in sorted(self.histograms.items())
+                if stage.startswith(prefix)}
+
+    def render_text(self, prefix: str = "") -> str:
+        """Compact per-stage table for the admin command"""
+        lines: List[str] = []
+        for stage, s in self.summary(prefix).items():
+            lines.append(f"{stage}: n={s['count']} p50={s['p50_ms']:.0f}ms "
+                         f"p95={s['p95_ms']:.0f}ms max={s['max_ms']:.0f}ms err={s['errors']}")
+        return "\n".join(lines) or "No samples yet"
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition for the /metrics route"""
+        name = "mex_stage_latency_ms"
+        lines = [f"# HELP {name} Latency of pipeline stages in milliseconds",
+                 f"# TYPE {name} histogram"]
+        for stage, hist in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS_MS, hist.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total_ms:.3f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+        lines += ["# HELP mex_stage_errors_total Stage executions that raised",
+                  "# TYPE mex_stage_errors_total counter"]
+        for stage, hist in sorted(self.histograms.items()):
+            lines.append(f'mex_stage_errors_total{{stage="{stage}"}} {hist.errors}')
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()
@@ -0,0 +1,102 @@
+"""
+📥 WEBHOOK UPDATE QUEUE
+Ack Telegram immediately, process updates on a worker pool in per-chat order
+"""
+
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, Optional
+
+from loguru import logger
+
+QUEUED, DUPLICATE, FULL = "queued", "duplicate", "full"
+
+
+class UpdateDispatcher:
+    """Bounded, deduplicated update queue: sequential within a chat, concurrent across chats"""
+
+    def __init__(self, application, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, dedup_window: int = 10000):
+        self.application = application
+        # Read here, not as defaults, so values from .env (loaded after import) apply
+        self.workers = workers or int(os.getenv("UPDATE_WORKERS", "8"))
+        self.max_pending = max_pending or int(os.getenv("UPDATE_MAX_PENDING", "1000"))
+        self.dedup_window = dedup_window
+        self._chats: Dict[Hashable, Deque] = {}
+        self._scheduled = set()  # Chats waiting in _ready or being processed
+        self._ready: Optional[asyncio.Queue] = None
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._pending = 0
+        self._tasks = []
+        self._stats = {"queued": 0, "processed": 0, "failed": 0, "duplicates": 0, "rejected": 0}
+
+    @staticmethod
+    def _chat_key(update) -> Hashable:
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return ("user", update.effective_user.id)
+        return ("update", update.update_id)
+
+    def submit(self, update) -> str:
+        """Queue an update without awaiting it; never blocks the webhook"""
+        if self._ready is None:
+            self.start()
+        if update.update_id in self._seen:
+            self._stats["duplicates"] += 1
+            return DUPLICATE
+        if self._pending >= self.max_pending:
+            # Caller answers non-2xx so Telegram backs off and redelivers later
+            self._stats["rejected"] += 1
+            return FULL
+
+        self._seen[update.update_id] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+
+        key = self._chat_key(update)
+        self._chats.setdefault(key, deque()).append(update)
+        self._pending += 1
+        self._stats["queued"] += 1
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._ready.put_nowait(key)
+        return QUEUED
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            pending = self._chats[key]
+            update = pending.popleft()
+            try:
+                await self.application.process_update(update)
+                self._stats["processed"] += 1
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Update {update.update_id} failed: {e}")
+            finally:
+                self._pending -= 1
+                if pending:
+                    # Back of the line so one busy chat cannot starve the rest
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                    self._scheduled.discard(key)
+
+    def start(self):
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict:
+        return {**self._stats, "pending": self._pending, "active_chats": len(self._chats),
+                "workers": len(self._tasks)}
@@ -0,0 +1,117 @@
+"""
+💾 USER STORE
+SQLite (WAL) write-behind persistence for user records and platform counters
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+from typing import Dict, Optional
+
+from loguru import logger
+
+
+class UserStore:
+    """Reads come from memory; dirty records are group-committed in the background"""
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 1.0):
+        # Read here, not as a default: main.py imports this before load_dotenv()
+        path = path or os.getenv("USER_DB_PATH", "data/users.db")
+        self.path = path
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                data TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        self._records: Dict[int, Dict] = {}
+        self._dirty_users = set()
+        self._dirty_meta: Dict[str, Dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+    def load_users(self) -> Dict[int, Dict]:
+        """Read the whole user table in one pass (startup only)"""
+        rows = self.conn.execute("SELECT user_id, data FROM users").fetchall()
+        self._records = {user_id: json.loads(data) for user_id, data in rows}
+        logger.info(f"Loaded {len(self._records)} users from {self.path}")
+        return self._records
+
+    def load_meta(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def mark_dirty(self, user_id: int, record: Dict):
+        """Queue a user for the next flush; never touches disk"""
+        self._records[user_id] = record
+        self._dirty_users.add(user_id)
+
+    def put_meta(self, key: str, value: Dict):
+        self._dirty_meta[key] = value
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty_users) + len(self._dirty_meta)
+
+    async def flush(self):
+        """Write every dirty record in a single transaction off the event loop"""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            # Serialize on the loop so the worker thread never sees a dict mid-mutation
+            users = [(uid, json.dumps(self._records[uid])) for uid in self._dirty_users]
+            meta = [(key, json.dumps(value)) for key, value in self._dirty_meta.items()]
+            self._dirty_users.clear()
+            self._dirty_meta.clear()
+            try:
+                await asyncio.to_thread(self._write, users, meta)
+                self.flushes += 1
+            except Exception as e:
+                logger.error(f"User store flush failed: {e}")
+                # Re-queue so the next flush retries them
+                self._dirty_users.update(uid for uid, _ in users)
+                for key, value in meta:
+                    self._dirty_meta.setdefault(key, json.loads(value))
+
+    def _write(self, users, meta):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO users (user_id, data) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data=excluded.data", users)
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value", meta)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so stopping the loop never abandons a half-done batch
+            await asyncio.shield(self.flush())
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Final flush and close"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        self.conn.close()
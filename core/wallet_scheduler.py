@@ -0,0 +1,212 @@
+"""
+🗓️ WALLET POLL SCHEDULER
+Set-based wallet registry plus sharded, rate-budgeted, activity-adaptive polling
+"""
+
+import asyncio
+import heapq
+import math
+import os
+import random
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+from core.notifier import TokenBucket
+
+
+def load_wallets(defaults: Iterable[str] = ()) -> Set[str]:
+    """Wallets from SMART_WALLETS (comma-separated) and SMART_WALLETS_FILE (one per line)"""
+    wallets = set(defaults)
+    wallets.update(w.strip() for w in os.getenv("SMART_WALLETS", "").split(",") if w.strip())
+    path = os.getenv("SMART_WALLETS_FILE", "")
+    if path:
+        try:
+            with open(path) as f:
+                wallets.update(line.split("#")[0].strip() for line in f if line.split("#")[0].strip())
+        except OSError as e:
+            logger.error(f"Could not read {path}: {e}")
+    return wallets
+
+
+class WalletState:
+    __slots__ = ("wallet", "interval", "next_due", "added_at", "moves", "updated", "weight", "polls")
+
+    def __init__(self, wallet: str, interval: float, now: float):
+        self.wallet = wallet
+        self.interval = interval
+        self.next_due = now + random.uniform(0, interval)
+        self.added_at = now
+        self.moves = 0.0      # Exponentially decayed count of observed moves
+        self.updated = now
+        self.weight = 0.0     # sqrt(estimated move rate)
+        self.polls = 0
+
+
+class PollScheduler:
+    """
+    Each wallet lives in one shard (by hash). A shard keeps a due-time heap and
+    an equal slice of the request budget.
+
+    Intervals follow the square-root rule: with estimated move rate r_i, wallet i
+    is polled every S / (rate * sqrt(r_i)) seconds, S = sum of sqrt(r). That
+    spends exactly the budget and minimizes the average move-to-poll delay, so
+    busy wallets are checked often and quiet ones rarely.
+    """
+
+    def __init__(self, poll: Callable[[str], Awaitable[int]], rate: float = 10.0, shards: int = 4,
+                 min_interval: float = 5.0, max_interval: float = 3600.0,
+                 half_life: float = 6 * 3600, prior_gap: float = 6 * 3600,
+                 per_shard_inflight: int = 4):
+        self.poll = poll
+        self.rate = rate
+        self.shards = max(1, shards)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.half_life = half_life    # How fast past activity is forgotten
+        self.prior_gap = prior_gap    # Assumed time between moves for a wallet we know nothing about
+        self.per_shard_inflight = per_shard_inflight
+        self.wallets: Dict[str, WalletState] = {}
+        self._weight_sum = 0.0
+        self._heaps: List[list] = [[] for _ in range(self.shards)]
+        self._buckets = [TokenBucket(rate / self.shards, max(1.0, rate / self.shards))
+                         for _ in range(self.shards)]
+        self._wakeups: List[Optional[asyncio.Event]] = [None] * self.shards
+        self._tasks: List[asyncio.Task] = []
+        self._polls: Set[asyncio.Task] = set()  # In-flight _poll_one tasks
+        self._stats = {"polls": 0, "errors": 0, "moves": 0}
+
+    def __contains__(self, wallet: str) -> bool:
+        return wallet in self.wallets
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+    def _shard(self, wallet: str) -> int:
+        return zlib.crc32(wallet.encode()) % self.shards
+
+    def _push(self, state: WalletState):
+        shard = self._shard(state.wallet)
+        heapq.heappush(self._heaps[shard], (state.next_due, state.wallet))
+        if self._wakeups[shard]:
+            self._wakeups[shard].set()
+
+    def _update_weight(self, state: WalletState, new_moves: int, now: float):
+        """Fold new moves into the decayed count and refresh sqrt(rate)"""
+        decay = math.exp(-(now - state.updated) * math.log(2) / self.half_life)
+        state.moves = state.moves * decay + new_moves
+        state.updated = now
+        window = min(now - state.added_at, self.half_life / math.log(2)) + self.prior_gap
+        weight = math.sqrt((state.moves + 1) / window)  # +1: one prior move per prior_gap
+        self._weight_sum += weight - state.weight
+        state.weight = weight
+
+    def _interval(self, state: WalletState) -> float:
+        ideal = self._weight_sum / (self.rate * state.weight)
+        return max(self.min_interval, min(self.max_interval, ideal))
+
+    def add(self, wallet: str):
+        if wallet in self.wallets:
+            return
+        now = time.monotonic()
+        state = WalletState(wallet, 0.0, now)
+        self._update_weight(state, 0, now)
+        self.wallets[wallet] = state
+        # Spread first polls over one interval so a large import does not burst
+        state.interval = self._interval(state)
+        state.next_due = now + random.uniform(0, state.interval)
+        self._push(state)
+
+    def remove(self, wallet: str):
+        # Heap entries for removed wallets are skipped lazily
+        state = self.wallets.pop(wallet, None)
+        if state is not None:
+            self._weight_sum -= state.weight
+
+    def mark_active(self, wallet: str, moves: int = 1):
+        """Pushed activity (webhook) counts like a poll hit: poll this wallet sooner"""
+        state = self.wallets.get(wallet)
+        if state is None:
+            return
+        now = time.monotonic()
+        self._update_weight(state, moves, now)
+        state.interval = self._interval(state)
+        if now + state.interval < state.next_due:
+            state.next_due = now + state.interval
+            self._push(state)
+
+    def _reschedule(self, state: WalletState, found: int):
+        now = time.monotonic()
+        self._update_weight(state, found, now)
+        state.interval = self._interval(state)
+        state.next_due = now + state.interval
+        self._push(state)
+
+    async def _poll_one(self, state: WalletState, semaphore: asyncio.Semaphore):
+        found = 0
+        try:
+            found = await self.poll(state.wallet) or 0
+            self._stats["moves"] += found
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Wallet poll failed for {state.wallet[:8]}: {e}")
+        finally:
+            state.polls += 1
+            self._stats["polls"] += 1
+            semaphore.release()
+            if state.wallet in self.wallets:
+                self._reschedule(state, found)
+
+    async def _shard_loop(self, shard: int):
+        heap = self._heaps[shard]
+        bucket = self._buckets[shard]
+        wakeup = self._wakeups[shard] = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.per_shard_inflight)
+        while True:
+            if not heap:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            due, wallet = heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(heap)
+            state = self.wallets.get(wallet)
+            if state is None or state.next_due != due:
+                continue  # Removed, or superseded by a newer entry
+
+            throttle = bucket.delay()
+            if throttle > 0:
+                await asyncio.sleep(throttle)
+            bucket.consume()
+            await semaphore.acquire()
+            task = asyncio.create_task(self._poll_one(state, semaphore))
+            self._polls.add(task)
+            task.add_done_callback(self._polls.discard)
+
+    def start(self):
+        self._tasks = [t for t in self._tasks if not t.done()]
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._shard_loop(i)) for i in range(self.shards)]
+
+    async def stop(self):
+        tasks = self._tasks + list(self._polls)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._polls.clear()
+
+    def stats(self) -> Dict:
+        intervals = sorted(s.interval for s in self.wallets.values())
+        return {**self._stats, "wallets": len(self.wallets), "budget_rps": self.rate,
+                "demand_rps": round(sum(1 / i for i in intervals), 2),
+                "min_interval": intervals[0] if intervals else None,
+                "median_interval": intervals[len(intervals) // 2] if intervals else None}
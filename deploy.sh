@@ -19,6 +19,7 @@ async def init():
     config = Config()
     db = DatabaseManager(config.database_url)
     await db.connect()
+    await db.close()
     print('✅ Database initialized')
 
 asyncio.run(init())
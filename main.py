@@ -6,18 +6,26 @@ Auto-posts profits to channel for transparency & trust
 
 import os
 import asyncio
-import aiohttp
 import random
 from datetime import datetime
 from typing import Dict
 from loguru import logger
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Bot
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, CallbackQueryHandler,
     MessageHandler, filters, ContextTypes, ConversationHandler
 )
 from dotenv import load_dotenv
 from aiohttp import web
+from core.http_client import http_client
+from core.user_store import UserStore
+from core.leaderboard import LeaderboardIndex
+from core.platform_stats import PlatformAggregates
+from core.update_queue import UpdateDispatcher, FULL
+from core.notifier import notifier, PRIORITY_MARKETING, PRIORITY_TRADE
+from core.copy_trading import CopyTrading
+from core.tracing import tracer
+from core.order_netting import order_netter
 
 load_dotenv()
 
@@ -39,8 +47,15 @@ TIERS = {
 WAITING_TOKEN, WAITING_AMOUNT = 1, 2
 
 class UserData:
-    def __init__(self):
-        self.users = {}
+    def __init__(self, store: UserStore = None):
+        self.store = store
+        self.users = store.load_users() if store else {}
+        self.leaderboard = LeaderboardIndex()
+        self.leaderboard.load(self.users)
+        if store:
+            self.leaderboard.restore(store.load_meta("leaderboard") or {})
+        self.aggregates = PlatformAggregates(tuple(TIERS))
+        self.aggregates.load(self.users)
     
     def get_user(self, user_id: int) -> Dict:
         if user_id not in self.users:
@@ -51,8 +66,16 @@ class UserData:
                 "daily_trades": 0, "last_trade_date": None,
                 "biggest_win": 0.0
             }
+            self.leaderboard.all_time.set(user_id, 0.0)
+            self.aggregates.on_user_created("free")
+            self.save(user_id)
         return self.users[user_id]
     
+    def save(self, user_id: int):
+        """Queue a changed user for the next background flush"""
+        if self.store:
+            self.store.mark_dirty(user_id, self.users[user_id])
+    
     def record_trade(self, user_id: int, amount: float, profit: float, fee: float):
         user = self.get_user(user_id)
         user["total_trades"] += 1
@@ -68,18 +91,37 @@ class UserData:
             user["daily_trades"] = 0
             user["last_trade_date"] = today
         user["daily_trades"] += 1
+        self.leaderboard.record(user_id, user["total_profit"], profit)
+        self.aggregates.on_trade(amount, profit, fee)
+        self.save(user_id)
+        if self.store:
+            self.store.put_meta("leaderboard", self.leaderboard.snapshot())
 
 class MexBalancerPro:
     def __init__(self):
-        self.db = UserData()
-        self.admin_revenue = 0.0
-        self.platform_stats = {
-            "total_users": 0,
-            "total_trades": 0,
-            "total_profit": 0.0,
-            "total_fees": 0.0
-        }
-        
+        self.db = UserData(UserStore())
+        saved = self.db.store.load_meta("platform_stats") or {}
+        self.admin_revenue = saved.get("admin_revenue", 0.0)
+        self.db.aggregates.restore(saved.get("platform_stats") or {})
+        # Live totals, kept current by UserData on every mutation
+        self.platform_stats = self.db.aggregates.totals
+        self.copy_trading = CopyTrading()
+        for follower_id, settings in (self.db.store.load_meta("copy_settings") or {}).items():
+            self.copy_trading.set_copy_target(int(follower_id), settings["target"], settings["percentage"])
+        self._mirroring = set()  # Running follower copies
+    
+    def save_platform_stats(self):
+        self.db.store.put_meta("platform_stats", {
+            "admin_revenue": self.admin_revenue,
+            "platform_stats": self.db.aggregates.snapshot()
+        })
+        
+    def save_copy_settings(self):
+        self.db.store.put_meta("copy_settings", {
+            str(uid): {"target": s["target"], "percentage": s["percentage"]}
+            for uid, s in self.copy_trading.copy_settings.items()
+        })
+    
     def get_tier_info(self, user_id: int) -> Dict:
         return TIERS[self.db.get_user(user_id)["tier"]]
     
@@ -88,9 +130,6 @@ class MexBalancerPro:
         user_data = self.db.get_user(user.id)
         tier_info = self.get_tier_info(user.id)
         
-        # Update platform stats
-        self.platform_stats["total_users"] = len(self.db.users)
-        
         welcome = f"""🎯 *MEX BALANCER PRO*
 💰 *AUTOMATED PROFIT MACHINE*
 
@@ -173,17 +212,20 @@ class MexBalancerPro:
         )
     
     async def leaderboard_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show top earners to motivate users"""
-        sorted_users = sorted(self.db.users.items(), 
-                            key=lambda x: x[1]['total_profit'], 
-                            reverse=True)[:5]
+        """Show top earners to motivate users (/leaderboard [daily|weekly])"""
+        window = (context.args[0].lower() if context.args else "all")
+        if window not in ("daily", "weekly"):
+            window = "all"
+        leaders = self.db.leaderboard.top(5, window)
         
-        text = "🏆 *TOP PROFIT LEADERS*\n\n"
+        title = {"daily": "TODAY'S", "weekly": "THIS WEEK'S", "all": "TOP"}[window]
+        text = f"🏆 *{title} PROFIT LEADERS*\n\n"
         
-        for i, (uid, data) in enumerate(sorted_users, 1):
+        for i, (uid, profit) in enumerate(leaders, 1):
+            data = self.db.users[uid]
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "▫️"
             text += f"{medal} *#{i}* User `{uid}`\n"
-            text += f"   Profit: *{data['total_profit']:.4f} SOL*\n"
+            text += f"   Profit: *{profit:.4f} SOL*\n"
             text += f"   Trades: {data['total_trades']} | Volume: {data['total_volume']:.2f} SOL\n\n"
         
         text += f"📊 *Platform Total:* {self.platform_stats['total_profit']:.4f} SOL profit generated!\n"
@@ -235,6 +277,7 @@ Current tier fees vs profit potential:"""
         if user["last_trade_date"] != today:
             user["daily_trades"] = 0
             user["last_trade_date"] = today
+            self.db.save(update.effective_user.id)
         
         remaining = tier["daily_trades"] - user["daily_trades"]
         
@@ -326,20 +369,23 @@ Example: `0.5` or `1.0`""",
         )
         
         # Simulate trade execution (replace with real Jupiter swap)
-        result = await self.execute_trade_simulation(token, amount, tier["mev_boost"])
+        with tracer.span("handle_amount.execute"):
+            # Same-token orders inside the netting window share one swap (SNIPE_NETTING_WINDOW_MS)
+            result = await order_netter.submit(
+                token, user_id, amount, 100,
+                lambda total, slippage: self.execute_trade_simulation(token, total, tier["mev_boost"]),
+                route="mev" if tier["mev_boost"] else ""
+            )
         
         if result["success"]:
             profit = result["profit"]
             fee = max(profit, 0) * (tier["fee_percent"] / 100)
             net_profit = profit - fee
             
-            self.db.record_trade(user_id, amount, profit, fee)
-            self.admin_revenue += fee
-            
-            # Update platform stats
-            self.platform_stats["total_trades"] += 1
-            self.platform_stats["total_profit"] += profit
-            self.platform_stats["total_fees"] += fee
+            with tracer.span("handle_amount.record"):
+                self.db.record_trade(user_id, amount, profit, fee)
+                self.admin_revenue += fee
+                self.save_platform_stats()
             
             # Build success message
             profit_emoji = "🟢" if profit > 0 else "🔴"
@@ -368,13 +414,46 @@ Monitoring for next moves...""",
             )
             
             # 🎉 POST TO CHANNEL FOR TRANSPARENCY
-            await self.post_profit_to_channel(user_id, amount, profit, fee, net_profit, tier['name'])
+            with tracer.span("handle_amount.post"):
+                await self.post_profit_to_channel(user_id, amount, profit, fee, net_profit, tier['name'])
+            
+            # Followers' copies run in the background; the leader's reply never waits on them
+            if self.copy_trading.followers.get(user_id):
+                task = asyncio.create_task(self.mirror_trade(user_id, token, amount))
+                self._mirroring.add(task)
+                task.add_done_callback(self._mirroring.discard)
             
         else:
             await executing.edit_text(f"❌ Trade failed: {result['error']}")
         
         return ConversationHandler.END
     
+    async def mirror_trade(self, leader_id: int, token: str, amount: float):
+        """Run a leader's trade for all followers as one netted swap and book each share"""
+        async def execute(side, token, total, quote):
+            return await self.execute_trade_simulation(token, total, True)
+        
+        with tracer.span("copy_trade"):
+            outcome = await self.copy_trading.copy_trade(leader_id, token, amount, execute)
+        for follower_id, result in outcome["results"].items():
+            if not result.get("success"):
+                await notifier.send(follower_id, f"❌ Copy of `{leader_id}` failed: {result.get('error')}",
+                                    priority=PRIORITY_TRADE, parse_mode="Markdown")
+                continue
+            tier = self.get_tier_info(follower_id)
+            profit = result["profit"]
+            fee = max(profit, 0) * (tier["fee_percent"] / 100)
+            self.db.record_trade(follower_id, result["amount"], profit, fee)
+            self.admin_revenue += fee
+            await notifier.send(
+                follower_id,
+                f"🐋 *COPIED* `{leader_id}` on `{token[:20]}...`\n"
+                f"💰 {result['amount']:.3f} SOL | P&L {profit:+.4f} SOL (fee {fee:.4f})",
+                priority=PRIORITY_TRADE, parse_mode="Markdown"
+            )
+        if outcome["filled"]:
+            self.save_platform_stats()
+    
     async def execute_trade_simulation(self, token, amount, mev_boost):
         """Simulate trade for demo (replace with real Jupiter execution)"""
         try:
@@ -425,17 +504,19 @@ Monitoring for next moves...""",
 
 🤖 Trade with us: @Iceboys_Bot"""
             
-            await Bot(BOT_TOKEN).send_message(
-                chat_id=CHANNEL_ID,
-                text=message,
+            await notifier.send(
+                CHANNEL_ID,
+                message,
+                priority=PRIORITY_MARKETING,
                 parse_mode="Markdown"
             )
             
             # If big win, celebrate more
             if profit > 0.5:
-                await Bot(BOT_TOKEN).send_message(
-                    chat_id=CHANNEL_ID,
-                    text=f"🎉 *BIG WIN ALERT!* 🎉\n\nUser `{user_id}` just made *{profit:.4f} SOL* profit!\n\n🏆 Biggest win today!\n\nStart trading: @Iceboys_Bot",
+                await notifier.send(
+                    CHANNEL_ID,
+                    f"🎉 *BIG WIN ALERT!* 🎉\n\nUser `{user_id}` just made *{profit:.4f} SOL* profit!\n\n🏆 Biggest win today!\n\nStart trading: @Iceboys_Bot",
+                    priority=PRIORITY_MARKETING,
                     parse_mode="Markdown"
                 )
                 
@@ -444,9 +525,8 @@ Monitoring for next moves...""",
     
     async def wallet_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(RPC_URL, json={"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": [WALLET]}) as resp:
-                    balance = (await resp.json())["result"]["value"] / 1e9
+            async with http_client.post(RPC_URL, json={"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": [WALLET]}) as resp:
+                balance = (await resp.json())["result"]["value"] / 1e9
         except:
             balance = 0.0
         
@@ -479,28 +559,91 @@ Min: 0.05 SOL for gas + trade amount
             parse_mode="Markdown"
         )
     
+    async def copy_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Whale only - mirror another trader (/copy <user_id> [percent] or /copy off)"""
+        user_id = update.effective_user.id
+        if not self.get_tier_info(user_id).get("copy_trading"):
+            return await update.message.reply_text("🐋 Copy trading is a Whale feature. /upgrade")
+        
+        args = context.args or []
+        if args and args[0].lower() == "off":
+            self.copy_trading.stop_copying(user_id)
+            self.save_copy_settings()
+            return await update.message.reply_text("🛑 Copy trading stopped")
+        try:
+            target = int(args[0])
+            percentage = float(args[1]) if len(args) > 1 else 100.0
+        except (IndexError, ValueError):
+            return await update.message.reply_text("Usage: /copy <user_id> [percent] or /copy off")
+        if target == user_id or target not in self.db.users or not 0 < percentage <= 100:
+            return await update.message.reply_text("❌ Pick a trader from /leaderboard and a percent from 1 to 100")
+        
+        self.copy_trading.set_copy_target(user_id, target, percentage)
+        self.save_copy_settings()
+        await update.message.reply_text(
+            f"✅ Copying `{target}` at {percentage:.0f}% of their trade size\nStop any time: /copy off",
+            parse_mode="Markdown"
+        )
+    
+    async def latency_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin only - per-stage latency percentiles"""
+        if update.effective_user.id != ADMIN_ID:
+            return await update.message.reply_text("⛔ Admin only")
+        
+        prefix = context.args[0] if context.args else ""
+        await update.message.reply_text(f"⏱️ STAGE LATENCY\n\n{tracer.render_text(prefix)}")
+    
     async def admin_stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Admin only - full platform stats"""
         if update.effective_user.id != ADMIN_ID:
             return await update.message.reply_text("⛔ Admin only")
         
+        http_stats = http_client.stats()
+        outbound = notifier.stats()
+        inbound = update_dispatcher.stats()
+        netting = order_netter.stats()
+        tiers = self.db.aggregates.tier_counts
+        last_hour = self.db.aggregates.window("minute")
+        last_day = self.db.aggregates.window("hour")
+        last_month = self.db.aggregates.window("day")
+        
         await update.message.reply_text(
             f"""💎 *ADMIN DASHBOARD*
 
 📊 *Platform Statistics:*
-├ Total Users: {len(self.db.users)}
+├ Total Users: {self.platform_stats['total_users']}
 ├ Total Trades: {self.platform_stats['total_trades']}
-├ Total Volume: {self.platform_stats.get('total_volume', 0):.2f} SOL
+├ Total Volume: {self.platform_stats['total_volume']:.2f} SOL
 ├ Total Profit Generated: {self.platform_stats['total_profit']:.4f} SOL
 ├ Total Fees Collected: {self.platform_stats['total_fees']:.4f} SOL
 └ **Your Revenue: {self.admin_revenue:.4f} SOL** 💰
 
 💵 USD Value: ~${self.admin_revenue * 82:.2f} (at $82/SOL)
 
+⏱️ *Activity:*
+├ Last hour: {last_hour['trades']:.0f} trades | {last_hour['volume']:.2f} SOL
+├ Last 24h: {last_day['trades']:.0f} trades | {last_day['volume']:.2f} SOL
+└ Last 30d: {last_month['trades']:.0f} trades | {last_month['fees']:.4f} SOL fees
+
+🌐 *HTTP Pool:*
+• Requests: {http_stats['requests']} ({http_stats['errors']} errors)
+• Connections: {http_stats['connections_created']} new / {http_stats['connections_reused']} reused ({http_stats['reuse_ratio']:.0%})
+
+📣 *Outbound Messages:*
+• Queue depth: {outbound['queue_depth']}
+• Sent: {outbound['sent']} | Failed: {outbound['failed']} | Rate-limited: {outbound['retry_after']}
+
+📥 *Inbound Updates:*
+• Pending: {inbound['pending']} across {inbound['active_chats']} chats ({inbound['workers']} workers)
+• Processed: {inbound['processed']} | Duplicates: {inbound['duplicates']} | Rejected: {inbound['rejected']}
+
+🧺 *Order Netting ({netting['window_ms']:.0f} ms window):*
+• Orders: {netting['orders']} | Batches: {netting['batches']} | Swaps saved: {netting['swaps_saved']}
+
 📈 *Tier Distribution:*
-• Free: {sum(1 for u in self.db.users.values() if u['tier'] == 'free')}
-• Pro: {sum(1 for u in self.db.users.values() if u['tier'] == 'pro')}
-• Whale: {sum(1 for u in self.db.users.values() if u['tier'] == 'whale')}
+• Free: {tiers.get('free', 0)}
+• Pro: {tiers.get('pro', 0)}
+• Whale: {tiers.get('whale', 0)}
 
 🎯 *Projections (100 active users):*
 Monthly Volume: ~500 SOL
@@ -534,6 +677,8 @@ application.add_handler(CommandHandler("leaderboard", bot.leaderboard_command))
 application.add_handler(CommandHandler("upgrade", bot.upgrade_command))
 application.add_handler(CommandHandler("wallet", bot.wallet_command))
 application.add_handler(CommandHandler("admin", bot.admin_stats_command))
+application.add_handler(CommandHandler("latency", bot.latency_command))
+application.add_handler(CommandHandler("copy", bot.copy_command))
 application.add_handler(conv)
 
 # Callbacks
@@ -541,32 +686,46 @@ application.add_handler(CallbackQueryHandler(lambda u,c: bot.snipe_command(u,c),
 application.add_handler(CallbackQueryHandler(lambda u,c: bot.upgrade_command(u,c), pattern="^upgrade$"))
 application.add_handler(CallbackQueryHandler(lambda u,c: bot.stats_command(u,c), pattern="^stats$"))
 
+update_dispatcher = UpdateDispatcher(application)
+
 # Web server
 async def health_check(request):
     return web.Response(text="✅ MEX BALANCER PRO - OPERATIONAL")
 
+async def metrics_handler(request):
+    return web.Response(text=tracer.render_prometheus(), content_type="text/plain")
+
 async def webhook_handler(request):
     try:
         data = await request.json()
         update = Update.de_json(data, application.bot)
-        await application.process_update(update)
-        return web.Response(status=200)
     except Exception as e:
         logger.error(f"Webhook error: {e}")
-        return web.Response(status=500)
+        return web.Response(status=400)
+    
+    # Ack right away; workers process the update in the background
+    if update_dispatcher.submit(update) == FULL:
+        return web.Response(status=503)
+    return web.Response(status=200)
 
 async def main():
     logger.add("logs/bot.log", rotation="500 MB")
     logger.info("🚀 MEX BALANCER PRO FINAL VERSION STARTED")
     
+    bot.db.store.start()
     await application.initialize()
     await application.start()
     await application.bot.set_webhook(f"{WEBHOOK_URL}/webhook")
     
+    # All outbound messages share the application's bot
+    notifier.bot = application.bot
+    notifier.start()
+    update_dispatcher.start()
+    
     # Startup notification to channel
-    await Bot(BOT_TOKEN).send_message(
-        chat_id=CHANNEL_ID,
-        text="""🤖 *MEX BALANCER PRO* is ONLINE!
+    await notifier.send(
+        CHANNEL_ID,
+        """🤖 *MEX BALANCER PRO* is ONLINE!
 
 ✅ Auto-profit posting enabled
 ✅ Leaderboard tracking active
@@ -576,12 +735,14 @@ async def main():
 💰 Every trade profit posted here automatically!
 
 🎯 Start trading: @Iceboys_Bot""",
+        priority=PRIORITY_MARKETING,
         parse_mode="Markdown"
     )
     
     # Web server
     app = web.Application()
     app.router.add_get('/', health_check)
+    app.router.add_get('/metrics', metrics_handler)
     app.router.add_post('/webhook', webhook_handler)
     
     runner = web.AppRunner(app)
@@ -591,8 +752,15 @@ async def main():
     
     logger.info(f"🌐 Server running on port {PORT}")
     
-    while True:
-        await asyncio.sleep(3600)
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await asyncio.gather(*bot._mirroring, return_exceptions=True)
+        await update_dispatcher.stop()
+        await notifier.stop()
+        await bot.db.store.stop()
+        await http_client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
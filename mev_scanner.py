@@ -7,7 +7,6 @@ Makes money through referral fees & subscriptions
 
 import os
 import asyncio
-import aiohttp
 import json
 from datetime import datetime
 from typing import Dict, List
@@ -16,6 +15,13 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 from dotenv import load_dotenv
 from aiohttp import web
+from core.concurrency import bounded_gather
+from core.quote_cache import quote_cache, SOL_MINT
+from core.update_queue import UpdateDispatcher, FULL
+from core.notifier import notifier, PRIORITY_ALERT
+from core.smart_money import SmartMoneyFeed
+from core.wallet_scheduler import load_wallets
+from core.arbitrage_graph import ArbitrageGraph
 
 load_dotenv()
 
@@ -23,21 +29,38 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_ID = int(os.getenv("ADMIN_ID", "0"))
 CHANNEL_ID = os.getenv("CHANNEL_ID")
 HELIUS_KEY = os.getenv("RPC_URL", "").split("api-key=")[-1] if "api-key=" in os.getenv("RPC_URL", "") else ""
+HELIUS_WEBHOOK_SECRET = os.getenv("HELIUS_WEBHOOK_SECRET", "")
 
 # Jupiter Referral Key (EARN 0.1% on all trades!)
 JUPITER_REFERRAL = "YOUR_REFERRAL_KEY_HERE"  # Get from https://referral.jup.ag
 
+# Tokens the arbitrage scan quotes pairwise: mint -> (symbol, decimals)
+SCAN_TOKENS = {
+    SOL_MINT: ("SOL", 9),
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": ("USDC", 6),
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": ("USDT", 6),
+    "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263": ("BONK", 5),
+}
+
 PORT = int(os.getenv("PORT", 10000))
 WEBHOOK_URL = "https://mex-balancer.onrender.com"
 
 class MEVScanner:
     def __init__(self):
         self.hot_tokens = {}  # Track trending tokens
-        self.smart_wallets = [
+        # Defaults plus SMART_WALLETS / SMART_WALLETS_FILE
+        self.smart_wallets = load_wallets([
             "5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVbNUqSCKdMQxK",  # Example smart wallet
             "H8sMJSCQxfKiFTF7kD4E5sDt9PnSLP6T9xUym1Toc6vV",
-        ]
+        ])
+        self.smart_money = SmartMoneyFeed(HELIUS_KEY, self.smart_wallets)
         self.arbitrage_opportunities = []
+        self.graph = ArbitrageGraph(hop_cost=0.001)  # Pair quotes in log space, kept between scans
+        self.graph_max_age = 30.0  # Seconds before an unrefreshed quote leaves the graph
+        self.min_profit_pct = 1.5  # After per-hop costs
+        self.scan_concurrency = 8  # Max quote legs in flight per scan
+        self.scan_deadline = 2.0  # Seconds before a scan returns partial results
+        self.last_scan: Dict = {}
         self.user_subscriptions = {}  # Track paid users
         
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -106,17 +129,19 @@ Scanner running 24/7...
             
             text += f"""{profit_emoji} *OPPORTUNITY #{i}*
 
-🎯 Token: `{opp['token'][:15]}...`
-💰 Buy on: {opp['buy_dex']} @ ${opp['buy_price']:.6f}
-💎 Sell on: {opp['sell_dex']} @ ${opp['sell_price']:.6f}
-📊 Profit: *+{profit_pct:.2f}%*
-💵 With 1 SOL: *+{profit_pct/100:.3f} SOL*
+🔁 Route: {' → '.join(opp['route'])}
+🏦 Venues: {' → '.join(opp['venues'])}
+📊 Profit: *+{profit_pct:.2f}%* ({opp['hops']} hops, after fees)
+💵 With 1 {opp['route'][0]}: *+{profit_pct/100:.3f} {opp['route'][0]}*
 
 ⚡ *ACT FAST - Opportunities last seconds!*
 
 [JUPITER SWAP](https://jup.ag/swap/{opp['token']}?referral={JUPITER_REFERRAL})
 """
         
+        text += f"\n⏱️ Scan: {self.last_scan.get('elapsed_ms', 0):.0f}ms"
+        if self.last_scan.get('missed'):
+            text += f" ({len(self.last_scan['missed'])} quotes timed out)"
         text += "\n💡 *Upgrade to Pro for instant alerts (0 delay)*"
         
         keyboard = [[InlineKeyboardButton("⚡ UPGRADE FOR INSTANT ALERTS", callback_data="upgrade")]]
@@ -127,54 +152,52 @@ Scanner running 24/7...
         await self.notify_channel(f"🔥 {len(opportunities)} arbitrage opportunities detected!")
     
     async def find_arbitrage_opportunities(self) -> List[Dict]:
-        """Scan Jupiter for price differences"""
-        opportunities = []
-        
-        # Popular tokens to scan
-        tokens = [
-            "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC
-            "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",  # USDT
-            "So11111111111111111111111111111111111111112",     # SOL
-            "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263",   # BONK
-        ]
-        
+        """Requote every pair of scan tokens into the price graph and return its profitable cycles"""
+        # Every leg is sized at ~1 SOL. Non-SOL legs take their size from the previous
+        # scan's SOL -> token rate, so all legs go out in one round; on the first scan
+        # (or after a token's SOL leg expired) only its SOL leg is quoted.
+        probe = 10 ** SCAN_TOKENS[SOL_MINT][1]
+        sizes = {SOL_MINT: probe}
+        for mint, (_, decimals) in SCAN_TOKENS.items():
+            rate = self.graph.rate(SOL_MINT, mint)
+            if mint != SOL_MINT and rate > 0:
+                sizes[mint] = int(rate * 10 ** decimals)
+        legs = {(src, dst): (lambda src=src, dst=dst: quote_cache.get_quote(src, dst, sizes[src], 50))
+                for src in sizes for dst in SCAN_TOKENS if dst != src}
         try:
-            async with aiohttp.ClientSession() as session:
-                for token in tokens:
-                    # Get quotes from different DEXs via Jupiter
-                    # Buy SOL with token
-                    buy_url = f"https://quote-api.jup.ag/v6/quote?inputMint={token}&outputMint=So11111111111111111111111111111111111111112&amount=1000000&slippageBps=50"
-                    
-                    async with session.get(buy_url) as resp:
-                        if resp.status == 200:
-                            buy_data = await resp.json()
-                            buy_price = float(buy_data.get('outAmount', 0)) / 1e9
-                            
-                            # Sell SOL for token
-                            sell_url = f"https://quote-api.jup.ag/v6/quote?inputMint=So11111111111111111111111111111111111111112&outputMint={token}&amount=1000000000&slippageBps=50"
-                            
-                            async with session.get(sell_url) as sell_resp:
-                                if sell_resp.status == 200:
-                                    sell_data = await sell_resp.json()
-                                    sell_price = 1 / (float(sell_data.get('outAmount', 0)) / 1e6) if sell_data.get('outAmount') else 0
-                                    
-                                    # Calculate arbitrage
-                                    if buy_price > 0 and sell_price > 0:
-                                        profit_pct = ((buy_price - sell_price) / sell_price) * 100
-                                        
-                                        if profit_pct > 1.5:  # Only show >1.5% profit
-                                            opportunities.append({
-                                                'token': token,
-                                                'buy_dex': 'Jupiter',
-                                                'sell_dex': 'Jupiter',
-                                                'buy_price': buy_price,
-                                                'sell_price': sell_price,
-                                                'profit_pct': profit_pct
-                                            })
+            scan = await bounded_gather(legs, limit=self.scan_concurrency, deadline=self.scan_deadline)
         except Exception as e:
             logger.error(f"Arbitrage scan error: {e}")
+            return []
+        
+        quotes, timings, missed = scan['results'], scan['timings'], scan['missed']
+        self.last_scan = {
+            'elapsed_ms': scan['elapsed'] * 1000,
+            'legs_ms': {f"{SCAN_TOKENS[a][0]}>{SCAN_TOKENS[b][0]}": t * 1000 for (a, b), t in timings.items()},
+            'missed': [f"{SCAN_TOKENS[a][0]}>{SCAN_TOKENS[b][0]}" for a, b in missed],
+            'errors': len(scan['errors'])
+        }
+        if missed:
+            logger.warning(f"Arbitrage scan returned partial results, {len(missed)} legs missed the {self.scan_deadline}s deadline")
+        
+        for (src, dst), quote in quotes.items():
+            if not quote or not quote.get('outAmount') or not quote.get('inAmount'):
+                continue
+            rate = (int(quote['outAmount']) / 10 ** SCAN_TOKENS[dst][1]) / (int(quote['inAmount']) / 10 ** SCAN_TOKENS[src][1])
+            venues = [hop.get('swapInfo', {}).get('label') for hop in quote.get('routePlan') or []]
+            self.graph.set_rate(src, dst, rate, venue=" + ".join(dict.fromkeys(v for v in venues if v)) or "Jupiter")
+        # Legs that keep failing should not leave stale prices behind
+        self.graph.expire(self.graph_max_age)
         
-        return sorted(opportunities, key=lambda x: x['profit_pct'], reverse=True)
+        opportunities = []
+        for cycle in self.graph.opportunities(self.min_profit_pct, anchor=SOL_MINT):
+            opportunities.append({
+                **cycle,
+                'token': cycle['path'][1],
+                'route': [SCAN_TOKENS[mint][0] for mint in cycle['path']],
+                'legs_ms': [timings.get(hop, 0) * 1000 for hop in zip(cycle['path'], cycle['path'][1:])]
+            })
+        return opportunities
     
     async def smart_money_tracker(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Track whale wallets"""
@@ -218,32 +241,8 @@ Whales are holding...
         await tracking_msg.edit_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
     
     async def get_smart_money_moves(self) -> List[Dict]:
-        """Get recent transactions from smart wallets"""
-        moves = []
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                for wallet in self.smart_wallets:
-                    url = f"https://api.helius.xyz/v0/addresses/?api-key={HELIUS_KEY}&transactions={wallet}&limit=5"
-                    
-                    async with session.get(url) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            for tx in data.get('transactions', []):
-                                # Parse transaction for buy/sell
-                                if 'tokenTransfers' in tx:
-                                    for transfer in tx['tokenTransfers']:
-                                        moves.append({
-                                            'wallet': wallet,
-                                            'token': transfer.get('mint', ''),
-                                            'amount': transfer.get('tokenAmount', 0),
-                                            'type': 'BUY' if transfer.get('toUserAccount') == wallet else 'SELL',
-                                            'time': datetime.fromtimestamp(tx.get('timestamp', 0)).strftime('%H:%M')
-                                        })
-        except Exception as e:
-            logger.error(f"Smart money tracking error: {e}")
-        
-        return moves[:10]  # Return last 10 moves
+        """Latest moves from smart wallets (served from the background feed)"""
+        return self.smart_money.recent(10)
     
     async def trending_tokens(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show trending tokens with early entry signals"""
@@ -318,11 +317,7 @@ Pro costs 0.3 SOL/month
     async def notify_channel(self, message: str):
         """Send to channel"""
         try:
-            await Bot(BOT_TOKEN).send_message(
-                chat_id=CHANNEL_ID,
-                text=message,
-                parse_mode="Markdown"
-            )
+            await notifier.send(CHANNEL_ID, message, priority=PRIORITY_ALERT, parse_mode="Markdown")
         except Exception as e:
             logger.error(f"Notify failed: {e}")
 
@@ -343,6 +338,8 @@ application.add_handler(CallbackQueryHandler(lambda u,c: scanner.smart_money_tra
 application.add_handler(CallbackQueryHandler(lambda u,c: scanner.trending_tokens(u,c), pattern="^trending$"))
 application.add_handler(CallbackQueryHandler(lambda u,c: scanner.upgrade_command(u,c), pattern="^upgrade$"))
 
+update_dispatcher = UpdateDispatcher(application)
+
 # Web server
 async def health_check(request):
     return web.Response(text="🔥 MEV SCANNER PRO - OPERATIONAL")
@@ -351,11 +348,26 @@ async def webhook_handler(request):
     try:
         data = await request.json()
         update = Update.de_json(data, application.bot)
-        await application.process_update(update)
-        return web.Response(status=200)
     except Exception as e:
         logger.error(f"Webhook error: {e}")
-        return web.Response(status=500)
+        return web.Response(status=400)
+    
+    # Ack right away; workers process the update in the background
+    if update_dispatcher.submit(update) == FULL:
+        return web.Response(status=503)
+    return web.Response(status=200)
+
+async def helius_webhook_handler(request):
+    """Helius enhanced-transaction webhook: push smart wallet activity straight into the feed"""
+    if HELIUS_WEBHOOK_SECRET and request.headers.get("Authorization") != HELIUS_WEBHOOK_SECRET:
+        return web.Response(status=401)
+    try:
+        transactions = await request.json()
+    except Exception as e:
+        logger.error(f"Helius webhook error: {e}")
+        return web.Response(status=400)
+    scanner.smart_money.ingest_webhook(transactions if isinstance(transactions, list) else [transactions])
+    return web.Response(status=200)
 
 async def main():
     logger.add("logs/scanner.log", rotation="500 MB")
@@ -365,11 +377,17 @@ async def main():
     await application.start()
     await application.bot.set_webhook(f"{WEBHOOK_URL}/webhook")
     
+    notifier.bot = application.bot
+    notifier.start()
+    update_dispatcher.start()
+    scanner.smart_money.start()
+    
     await scanner.notify_channel("🔥 *MEV SCANNER PRO* is LIVE!\n\n✅ Arbitrage scanning\n✅ Smart money tracking\n✅ Trending alerts\n\n💰 Ready to find alpha!")
     
     app = web.Application()
     app.router.add_get('/', health_check)
     app.router.add_post('/webhook', webhook_handler)
+    app.router.add_post('/helius', helius_webhook_handler)
     
     runner = web.AppRunner(app)
     await runner.setup()
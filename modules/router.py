@@ -1,16 +1,27 @@
+import asyncio
 import os
 from core.scanner import scanner
 from modules.trading_engine import engine
 
 class Router:
     async def secure_snipe(self, token_address):
-        # 1. SCAN
-        is_safe, scan_msg = scanner.check_token(token_address)
+        # 1. SCAN + QUOTE together; the quote is speculative until the scan passes
+        # (Testing with 0.04 SOL ~ $5-6)
+        quote_task = asyncio.ensure_future(engine.get_quote(token_address, 0.04))
+        try:
+            is_safe, scan_msg = await scanner.check_token(token_address)
+        except BaseException:
+            quote_task.cancel()
+            raise
         if not is_safe:
+            quote_task.cancel()
             return scan_msg
 
-        # 2. QUOTE (Testing with 0.04 SOL ~ $5-6)
-        quote = await engine.get_quote(token_address, 0.04)
+        # 2. QUOTE (usually already in hand)
+        try:
+            quote = await quote_task
+        except Exception:
+            quote = {}
         if "outAmount" not in quote:
             return f"{scan_msg}\n\n❌ **LIQUIDITY ERROR:** Jupiter cannot find a trade route."
 
@@ -1,33 +1,32 @@
-import aiohttp, os, json
+import os, json
+from core.http_client import http_client
+from core.quote_cache import quote_cache, SOL_MINT
+from core.priority_fees import fee_estimator, swap_accounts
 
 class TradingEngine:
     def __init__(self):
-        self.jup_quote_url = "https://quote-api.jup.ag/v6/quote"
         self.jup_swap_url = "https://quote-api.jup.ag/v6/swap"
 
     async def get_quote(self, token_address, amount_sol):
         # Convert SOL to lamports
         lamports = int(amount_sol * 10**9)
-        params = {
-            "inputMint": "So11111111111111111111111111111111111111112",
-            "outputMint": token_address,
-            "amount": str(lamports),
-            "slippageBps": "1500" # 15% slippage
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.jup_quote_url, params=params) as resp:
-                return await resp.json()
+        quote = await quote_cache.get_quote(
+            SOL_MINT, token_address, lamports,
+            1500,  # 15% slippage
+            exact=True
+        )
+        return quote or {}
 
     async def get_swap_tx(self, quote_response, user_pubkey):
         payload = {
             "quoteResponse": quote_response,
             "userPublicKey": user_pubkey,
             "wrapAndUnwrapSol": True,
-            "prioritizationFeeLamports": 100000 # "Turbo" fee
+            # Micro-lamports per CU from recent fees on the route's accounts
+            "computeUnitPriceMicroLamports": fee_estimator.estimate(swap_accounts(quote_response))
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.jup_swap_url, json=payload) as resp:
-                data = await resp.json()
-                return data.get("swapTransaction")
+        async with http_client.post(self.jup_swap_url, json=payload) as resp:
+            data = await resp.json()
+            return data.get("swapTransaction")
 
 engine = TradingEngine()
@@ -0,0 +1,175 @@
+"""CopyTrading.copy_trade against a local Jupiter / RPC stub"""
+
+import asyncio
+import time
+from collections import Counter
+
+from aiohttp import web
+
+import core.quote_cache as quote_cache_module
+from core.copy_trading import CopyTrading
+from core.http_client import http_client
+from core.quote_cache import SOL_MINT, quote_cache
+
+TOKEN = "Token1111111111111111111111111111111111111"
+
+
+class StubJupiter:
+    """/quote, /swap and a sendTransaction RPC, each answering after its latency"""
+
+    def __init__(self, quote_latency: float = 0.02, swap_latency: float = 0.01,
+                 send_latency: float = 0.01, no_route: bool = False):
+        self.latency = {"quote": quote_latency, "swap": swap_latency, "send": send_latency}
+        self.no_route = no_route
+        self.calls = Counter()
+        self.quoted = []  # (inputMint, outputMint, amount)
+        self._runner = None
+        self.url = ""
+
+    async def quote(self, request):
+        self.calls["quote"] += 1
+        await asyncio.sleep(self.latency["quote"])
+        if self.no_route:
+            return web.json_response({"error": "No route"}, status=400)
+        q = request.query
+        self.quoted.append((q["inputMint"], q["outputMint"], int(q["amount"])))
+        amount = int(q["amount"])
+        return web.json_response({"inAmount": str(amount), "outAmount": str(amount * 1000),
+                                  "otherAmountThreshold": str(amount * 990), "routePlan": []})
+
+    async def swap(self, request):
+        self.calls["swap"] += 1
+        await asyncio.sleep(self.latency["swap"])
+        return web.json_response({"swapTransaction": "AAAA"})
+
+    async def rpc(self, request):
+        self.calls["send"] += 1
+        await asyncio.sleep(self.latency["send"])
+        return web.json_response({"jsonrpc": "2.0", "id": 1, "result": "5igSignature"})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/quote", self.quote)
+        app.router.add_post("/swap", self.swap)
+        app.router.add_post("/rpc", self.rpc)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    def executor(self):
+        async def execute(side: str, token: str, amount: float, quote: dict) -> dict:
+            async with http_client.post(f"{self.url}/swap", json={"quoteResponse": quote}) as resp:
+                tx = (await resp.json())["swapTransaction"]
+            async with http_client.post(f"{self.url}/rpc", json={"method": "sendTransaction",
+                                                                  "params": [tx]}) as resp:
+                signature = (await resp.json())["result"]
+            return {"success": True, "signature": signature, "outAmount": quote["outAmount"]}
+        return execute
+
+
+def copy_with_followers(count: int, percentage=lambda fid: 50) -> CopyTrading:
+    copy = CopyTrading()
+    for fid in range(1, count + 1):
+        copy.set_copy_target(fid, 0, percentage=percentage(fid))
+    return copy
+
+
+def run_with_stub(stub: StubJupiter, scenario, monkeypatch):
+    async def main():
+        url = await stub.start()
+        monkeypatch.setattr(quote_cache_module, "JUPITER_QUOTE_URL", f"{url}/quote")
+        quote_cache.invalidate()
+        try:
+            return await scenario()
+        finally:
+            await http_client.close()
+            await stub.stop()
+
+    return asyncio.run(main())
+
+
+def test_fill_latency_and_requests_stay_flat_as_followers_grow(monkeypatch):
+    stub = StubJupiter()
+
+    async def scenario():
+        timings = {}
+        for count in (10, 1000):
+            stub.calls.clear()
+            quote_cache.invalidate()
+            copy = copy_with_followers(count)
+            start = time.perf_counter()
+            result = await copy.copy_trade(0, TOKEN, 1.0, stub.executor())
+            timings[count] = time.perf_counter() - start
+            assert result["filled"] == count and not result["failed"]
+            assert stub.calls == {"quote": 1, "swap": 1, "send": 1}
+        return timings
+
+    timings = run_with_stub(stub, scenario, monkeypatch)
+
+    assert timings[1000] < timings[10] + 0.1
+
+
+def test_fill_is_split_pro_rata_on_an_exact_quote_for_the_total(monkeypatch):
+    stub = StubJupiter()
+    copy = copy_with_followers(3, percentage=lambda fid: {1: 100, 2: 50, 3: 25}[fid])
+    copy.copy_settings[3]["enabled"] = False
+
+    result = run_with_stub(stub, lambda: copy.copy_trade(0, TOKEN, 2.0, stub.executor()), monkeypatch)
+
+    assert stub.quoted == [(SOL_MINT, TOKEN, 3_000_000_000)]
+    assert result["orders"] == 2 and set(result["results"]) == {1, 2}
+    assert result["results"][1]["amount"] == 2.0 and result["results"][2]["amount"] == 1.0
+    assert result["results"][1]["outAmount"] == str(2_000_000_000_000)
+    assert result["results"][2]["outAmount"] == str(1_000_000_000_000)
+    assert result["signature"] == "5igSignature"
+
+
+def test_sells_are_mirrored_token_to_sol(monkeypatch):
+    stub = StubJupiter()
+    copy = copy_with_followers(2)
+
+    result = run_with_stub(stub, lambda: copy.copy_trade(0, TOKEN, 4_000_000, stub.executor(), side="sell"),
+                           monkeypatch)
+
+    assert stub.quoted == [(TOKEN, SOL_MINT, 4_000_000)]
+    assert result["filled"] == 2
+    assert all(r["amount"] == 2_000_000 for r in result["results"].values())
+
+
+def test_no_route_fails_every_follower_without_swapping(monkeypatch):
+    stub = StubJupiter(no_route=True)
+    copy = copy_with_followers(5)
+
+    result = run_with_stub(stub, lambda: copy.copy_trade(0, TOKEN, 1.0, stub.executor()), monkeypatch)
+
+    assert result["filled"] == 0
+    assert set(result["failed"].values()) == {"No route found"}
+    assert stub.calls["swap"] == 0 and stub.calls["send"] == 0
+
+
+def test_deadline_fails_the_copy_instead_of_hanging(monkeypatch):
+    stub = StubJupiter(swap_latency=1.0)
+    copy = copy_with_followers(2)
+
+    result = run_with_stub(stub, lambda: copy.copy_trade(0, TOKEN, 1.0, stub.executor(), deadline=0.2),
+                           monkeypatch)
+
+    assert result["filled"] == 0
+    assert set(result["failed"].values()) == {"timed out"}
+    assert stub.calls["send"] == 0
+
+
+def test_no_followers_makes_no_requests(monkeypatch):
+    stub = StubJupiter()
+    copy = copy_with_followers(0)
+
+    result = run_with_stub(stub, lambda: copy.copy_trade(0, TOKEN, 1.0, stub.executor()), monkeypatch)
+
+    assert result["orders"] == 0
+    assert not stub.calls
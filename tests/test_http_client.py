@@ -0,0 +1,82 @@
+"""Per-host concurrency limits of the shared HTTP client"""
+
+import asyncio
+
+from aiohttp import web
+
+from core.http_client import HTTPClient
+
+
+class StubServer:
+    """Records the most requests it ever had in flight at once"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.inflight = 0
+        self.peak = 0
+        self._runner = None
+        self.url = ""
+
+    async def handle(self, request):
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        await asyncio.sleep(self.latency)
+        self.inflight -= 1
+        return web.json_response({"ok": True})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+        return self.url
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def peak_concurrency(client: HTTPClient, requests: int) -> int:
+    server = StubServer()
+
+    async def main():
+        url = await server.start()
+
+        async def one():
+            async with client.post(url, json={}) as resp:
+                await resp.json()
+
+        try:
+            await asyncio.gather(*(one() for _ in range(requests)))
+        finally:
+            await client.close()
+            await server.stop()
+        return server.peak
+
+    return asyncio.run(main())
+
+
+def test_jupiter_and_rpc_hosts_get_the_trade_limit(monkeypatch):
+    monkeypatch.setenv("RPC_URL", "https://mainnet.helius-rpc.com/?api-key=x")
+    monkeypatch.setenv("RPC_URLS", "https://rpc-b.example.com")
+    client = HTTPClient()
+    assert client.host_limit("quote-api.jup.ag") == client.trade_host_limit
+    assert client.host_limit("mainnet.helius-rpc.com") == client.trade_host_limit
+    assert client.host_limit("rpc-b.example.com") == client.trade_host_limit
+    assert client.host_limit("api.rugcheck.xyz") == 5
+    assert client.host_limit("example.org") == client.limit_per_host
+
+
+def test_rpc_host_is_not_capped_at_the_default_per_host_limit(monkeypatch):
+    monkeypatch.setenv("RPC_URL", "http://127.0.0.1:1/")
+    monkeypatch.delenv("RPC_URLS", raising=False)
+    assert peak_concurrency(HTTPClient(), 100) == 100
+
+
+def test_other_hosts_keep_the_default_cap(monkeypatch):
+    monkeypatch.delenv("RPC_URL", raising=False)
+    monkeypatch.delenv("RPC_URLS", raising=False)
+    client = HTTPClient(limit_per_host=20)
+    assert peak_concurrency(client, 100) == 20
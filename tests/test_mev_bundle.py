@@ -0,0 +1,237 @@
+"""MEVBundler against a local block-engine stand-in"""
+
+import asyncio
+import base64
+import itertools
+import json
+
+from aiohttp import web
+
+from core.http_client import http_client
+from core.mev_bundle import MEVBundler, TipStats
+
+TIP_ACCOUNTS = ["TipAccount1111", "TipAccount2222"]
+TIP_FLOOR = {
+    "landed_tips_25th_percentile": 0.00001,
+    "landed_tips_50th_percentile": 0.00002,
+    "landed_tips_75th_percentile": 0.00004,
+    "landed_tips_95th_percentile": 0.0001,
+    "landed_tips_99th_percentile": 0.0005,
+}
+
+
+class StubBlockEngine:
+    """
+    sendBundle / getInflightBundleStatuses / getTipAccounts plus the tip floor
+    feed. `lands(txs)` decides each bundle's fate (None: undecided); statuses
+    report `waiting` (Pending or Invalid) while undecided and for the first
+    `pending_polls` checks (forever if None).
+    `height` is the chain's block height.
+    """
+
+    def __init__(self, lands=lambda txs: True, pending_polls: int = 1, waiting: str = "Pending"):
+        self.lands = lands
+        self.pending_polls = pending_polls
+        self.waiting = waiting
+        self.height = 900
+        self.bundles = {}  # bundle_id -> {"txs", "polls"}
+        self._ids = itertools.count(1)
+        self._runner = None
+        self.url = ""
+
+    async def rpc(self, request):
+        body = await request.json()
+        method, params = body["method"], body["params"]
+        if method == "sendBundle":
+            txs = [json.loads(base64.b64decode(tx)) for tx in params[0]]
+            bundle_id = f"bundle-{next(self._ids)}"
+            self.bundles[bundle_id] = {"txs": txs, "polls": 0}
+            result = bundle_id
+        elif method == "getInflightBundleStatuses":
+            result = {"value": [self._status(bundle_id) for bundle_id in params[0]]}
+        elif method == "getTipAccounts":
+            result = TIP_ACCOUNTS
+        else:
+            return web.json_response({"jsonrpc": "2.0", "id": body["id"],
+                                      "error": {"code": -32601, "message": "unknown method"}})
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": result})
+
+    def _status(self, bundle_id: str):
+        bundle = self.bundles[bundle_id]
+        bundle["polls"] += 1
+        outcome = None
+        if self.pending_polls is not None and bundle["polls"] > self.pending_polls:
+            outcome = self.lands(bundle["txs"])
+        status = self.waiting if outcome is None else "Landed" if outcome else "Failed"
+        return {"bundle_id": bundle_id, "status": status, "landed_slot": 123 if status == "Landed" else None}
+
+    async def tip_floor(self, request):
+        return web.json_response([TIP_FLOOR])
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/api/v1/bundles", self.rpc)
+        app.router.add_get("/api/v1/bundles/tip_floor", self.tip_floor)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    def sent(self):
+        return [bundle["txs"] for bundle in self.bundles.values()]
+
+    async def block_height(self) -> int:
+        return self.height
+
+
+def builder(name: str, calls: list, last_valid: int = 1000):
+    """Stand-in for SolanaSniper's builder: the 'transaction' records its signature and tip"""
+    async def build(tip_lamports: int, tip_account: str):
+        calls.append((tip_lamports, tip_account))
+        signature = f"{name}-sig{len(calls)}"
+        tx = {"swap": name, "signature": signature, "tip": tip_lamports,
+              "tip_account": tip_account if tip_lamports else None}
+        return base64.b64encode(json.dumps(tx).encode()).decode(), signature, last_valid
+    return build
+
+
+def run_with_engine(engine: StubBlockEngine, scenario, **bundler_kwargs):
+    async def main():
+        url = await engine.start()
+        options = {"window": 0.05, "status_interval": 0.02, "tip_refresh_interval": 60,
+                   "block_height": engine.block_height, **bundler_kwargs}
+        bundler = MEVBundler(jito_endpoint=f"{url}/api/v1",
+                             tip_floor_url=f"{url}/api/v1/bundles/tip_floor", **options)
+        try:
+            return await asyncio.wait_for(scenario(bundler), 10)
+        finally:
+            await bundler.stop()
+            await http_client.close()
+            await engine.stop()
+
+    return asyncio.run(main())
+
+
+def test_tip_suggestion_follows_the_tip_floor_not_our_own_landings():
+    tips = TipStats()
+    assert tips.suggest() == tips.default_tip
+    tips.update(TIP_FLOOR)
+    assert tips.suggest(50) == 20000
+    assert tips.suggest(75) == 40000
+    assert tips.suggest(60) == 28000          # Interpolated between p50 and p75
+    assert tips.suggest(10) == 10000          # Below the lowest published point
+    assert tips.suggest(99.9) == 500000
+    for _ in range(300):
+        tips.record(tips.suggest())
+    assert tips.suggest(50) == 20000
+
+
+def test_concurrent_swaps_share_one_bundle_with_one_tip_transfer():
+    engine = StubBlockEngine()
+    calls = {name: [] for name in "abc"}
+
+    async def scenario(bundler):
+        return await asyncio.gather(*[bundler.submit(builder(name, calls[name])) for name in "abc"])
+
+    results = run_with_engine(engine, scenario)
+
+    [bundle] = engine.sent()
+    assert [tx["swap"] for tx in bundle] == ["a", "b", "c"]
+    # Only the last transaction pays, at the market median, to a published tip account
+    assert [tx["tip"] for tx in bundle] == [0, 0, 20000]
+    assert bundle[-1]["tip_account"] in TIP_ACCOUNTS
+    assert all(r["success"] and r["tip"] == 20000 for r in results)
+    assert [r["signature"] for r in results] == ["a-sig1", "b-sig1", "c-sig1"]
+
+
+def test_failed_bundle_is_rebuilt_and_resigned_with_a_higher_tip():
+    engine = StubBlockEngine(lands=lambda txs: txs[-1]["tip"] >= 25000)
+    calls = []
+
+    async def scenario(bundler):
+        return await bundler.submit(builder("a", calls))
+
+    result = run_with_engine(engine, scenario)
+
+    assert [tip for tip, _ in calls] == [20000, 30000]
+    assert [[tx["tip"] for tx in bundle] for bundle in engine.sent()] == [[20000], [30000]]
+    assert result["success"] and result["tip"] == 30000
+    assert result["signature"] == "a-sig2"  # The re-signed version is the one that landed
+
+
+def test_failed_multi_tx_bundle_is_split_and_each_single_carries_a_tip():
+    engine = StubBlockEngine(lands=lambda txs: len(txs) == 1)
+    calls = {name: [] for name in "ab"}
+
+    async def scenario(bundler):
+        return await asyncio.gather(*[bundler.submit(builder(name, calls[name])) for name in "ab"])
+
+    results = run_with_engine(engine, scenario)
+
+    first, *singles = engine.sent()
+    assert [tx["tip"] for tx in first] == [0, 20000]
+    assert sorted((tx["swap"], tx["tip"]) for [tx] in singles) == [("a", 20000), ("b", 20000)]
+    assert all(r["success"] for r in results)
+    # "a" had to be re-signed with a tip; "b" already carried one
+    assert [tip for tip, _ in calls["a"]] == [0, 20000]
+    assert [tip for tip, _ in calls["b"]] == [20000]
+
+
+def test_gives_up_after_max_attempts():
+    engine = StubBlockEngine(lands=lambda txs: False)
+    calls = []
+
+    async def scenario(bundler):
+        return await bundler.submit(builder("a", calls))
+
+    result = run_with_engine(engine, scenario, max_attempts=3)
+
+    assert not result["success"]
+    assert result["error"] == "Bundle failed"
+    assert [bundle[0]["tip"] for bundle in engine.sent()] == [20000, 30000, 45000]
+
+
+def test_unanswered_bundle_is_resent_unchanged_until_its_blockhash_expires():
+    engine = StubBlockEngine(pending_polls=None, waiting="Invalid")
+    calls = []
+
+    async def scenario(bundler):
+        task = asyncio.ensure_future(bundler.submit(builder("a", calls, last_valid=1000)))
+        while len(engine.bundles) < 4:
+            await asyncio.sleep(0.02)
+        # While the original can still land, nothing but the same signed bytes goes out
+        assert {tx["signature"] for bundle in engine.sent() for tx in bundle} == {"a-sig1"}
+        assert len(calls) == 1
+        # Past last_valid_block_height: a-sig1 can never land, nor be reported on
+        engine.lands = lambda txs: None if txs[0]["signature"] == "a-sig1" else True
+        engine.pending_polls = 0
+        engine.height = 1001
+        return await task
+
+    result = run_with_engine(engine, scenario, bundle_ttl=0.05)
+
+    assert result["success"] and result["signature"] == "a-sig2"
+    signatures = [bundle[0]["signature"] for bundle in engine.sent()]
+    first_new = signatures.index("a-sig2")
+    assert set(signatures[:first_new]) == {"a-sig1"}
+    assert set(signatures[first_new:]) == {"a-sig2"}
+    assert [tip for tip, _ in calls] == [20000, 30000]
+
+
+def test_without_block_height_an_unanswered_bundle_is_never_resigned():
+    engine = StubBlockEngine(pending_polls=None)
+    calls = []
+
+    async def scenario(bundler):
+        return await bundler.submit(builder("a", calls))
+
+    result = run_with_engine(engine, scenario, bundle_ttl=0.02, block_height=None, max_rebroadcasts=3)
+
+    assert not result["success"]
+    assert len(calls) == 1
+    assert [bundle[0]["signature"] for bundle in engine.sent()] == ["a-sig1"] * 4
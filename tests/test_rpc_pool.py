@@ -0,0 +1,208 @@
+"""RpcPool against local stub JSON-RPC servers with injected latency"""
+
+import asyncio
+import time
+from collections import Counter
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from core.rpc_pool import RpcPool, _consume_result
+
+
+class StubRpcServer:
+    """JSON-RPC endpoint on 127.0.0.1 that answers after `latency` seconds"""
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False, reject_sends: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail                  # Every call answers HTTP 500
+        self.reject_sends = reject_sends  # sendTransaction answers a JSON-RPC error
+        self.calls = Counter()
+        self._runner = None
+        self.url = ""
+
+    async def handle(self, request):
+        body = await request.json()
+        method = body["method"]
+        self.calls[method] += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            return web.Response(status=500)
+        if method == "sendTransaction":
+            if self.reject_sends:
+                return web.json_response({"jsonrpc": "2.0", "id": body["id"],
+                                          "error": {"code": -32002, "message": "rejected"}})
+            return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": f"sig-{self.name}"})
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": self.name})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self.url
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+class StubClient:
+    """The slice of solana's AsyncClient the pool uses, over plain JSON-RPC"""
+
+    def __init__(self, url: str, commitment: str):
+        self.url = url
+        self._session = None
+
+    async def _rpc(self, method: str, params: list):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(self.url, json={"jsonrpc": "2.0", "id": 1, "method": method,
+                                                      "params": params}) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            data = await resp.json()
+        if "error" in data:
+            raise RuntimeError(data["error"]["message"])
+        return data["result"]
+
+    async def get_slot(self):
+        return await self._rpc("getSlot", [])
+
+    async def send_raw_transaction(self, raw: bytes, opts=None):
+        return await self._rpc("sendTransaction", [raw.hex()])
+
+    async def close(self):
+        if self._session:
+            await self._session.close()
+
+
+async def start_pool(servers, **kwargs) -> RpcPool:
+    urls = [await s.start() for s in servers]
+    return RpcPool(urls, health_interval=0, client_factory=StubClient, **kwargs)
+
+
+async def shutdown(pool: RpcPool, servers):
+    await pool.close()
+    for server in servers:
+        await server.stop()
+
+
+def test_reads_follow_the_lowest_latency_endpoint():
+    async def scenario():
+        servers = [StubRpcServer("slow", 0.15), StubRpcServer("fast", 0.005), StubRpcServer("medium", 0.06)]
+        pool = await start_pool(servers)
+        try:
+            # Unmeasured endpoints sort first, so the first calls probe each one
+            results = [await pool.get_slot() for _ in range(23)]
+            assert set(results[:3]) == {"slow", "fast", "medium"}
+            assert results[3:] == ["fast"] * 20
+            assert pool.ranked()[0].url == servers[1].url
+            assert servers[0].calls["getSlot"] == 1
+            assert servers[2].calls["getSlot"] == 1
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_failing_endpoint_is_failed_over_and_scored_down():
+    async def scenario():
+        servers = [StubRpcServer("broken", 0.0, fail=True), StubRpcServer("healthy", 0.03)]
+        pool = await start_pool(servers)
+        try:
+            results = [await pool.get_slot() for _ in range(10)]
+            assert results == ["healthy"] * 10
+            # One failed call pushes it behind the healthy endpoint for good
+            assert servers[0].calls["getSlot"] == 1
+            broken, healthy = pool.endpoints
+            assert broken.score > healthy.score
+            assert broken.errors == 1 and broken.error_rate > 0
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_every_endpoint_failing_raises_the_last_error():
+    async def scenario():
+        servers = [StubRpcServer("a", fail=True), StubRpcServer("b", fail=True)]
+        pool = await start_pool(servers)
+        try:
+            with pytest.raises(RuntimeError, match="HTTP 500"):
+                await pool.get_slot()
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_race_returns_the_first_acceptance():
+    async def scenario():
+        servers = [StubRpcServer("slow", 0.3), StubRpcServer("fast", 0.02)]
+        pool = await start_pool(servers, send_fanout=2)
+        try:
+            start = time.perf_counter()
+            signature = await pool.send_raw_transaction(b"\x01\x02")
+            assert signature == "sig-fast"
+            assert time.perf_counter() - start < 0.2
+            # The slower copy still reaches its endpoint
+            await asyncio.sleep(0.4)
+            assert servers[0].calls["sendTransaction"] == 1
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_race_skips_rejections_and_raises_when_all_reject():
+    async def scenario():
+        servers = [StubRpcServer("rejecting", 0.01, reject_sends=True), StubRpcServer("accepting", 0.1)]
+        pool = await start_pool(servers, send_fanout=2)
+        try:
+            assert await pool.send_raw_transaction(b"\x01") == "sig-accepting"
+            servers[1].reject_sends = True
+            with pytest.raises(RuntimeError, match="rejected"):
+                await pool.send_raw_transaction(b"\x01")
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_race_fans_out_to_the_top_endpoints_only():
+    async def scenario():
+        servers = [StubRpcServer("fast", 0.005), StubRpcServer("medium", 0.02), StubRpcServer("slow", 0.08)]
+        pool = await start_pool(servers, send_fanout=2)
+        try:
+            for _ in range(3):
+                await pool.get_slot()  # Measure every endpoint
+            await pool.send_raw_transaction(b"\x01")
+            await asyncio.sleep(0.1)
+            assert [s.calls["sendTransaction"] for s in servers] == [1, 1, 0]
+        finally:
+            await shutdown(pool, servers)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_losers_are_reaped_quietly():
+    async def scenario():
+        task = asyncio.ensure_future(asyncio.sleep(10))
+        task.add_done_callback(_consume_result)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    errors = []
+    loop = asyncio.new_event_loop()
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert errors == []